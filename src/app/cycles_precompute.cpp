@@ -7,12 +7,16 @@
 #include "util/string.h"
 
 #include "util/array.h"
+#include "util/half.h"
 #include "util/hash.h"
+#include "util/path.h"
 #include "util/tbb.h"
 
 #include "kernel/closure/bsdf_microfacet.h"
 #include "kernel/sample/sobol_burley.h"
 
+#include <OpenImageIO/filesystem.h>
+
 #include <iostream>
 
 CCL_NAMESPACE_BEGIN
@@ -145,7 +149,131 @@ struct PrecomputeTerm {
   std::function<float(float, float, float, float3)> evaluation;
 };
 
-static bool cycles_precompute(std::string name)
+/* Storage format of the printed table. The values are computed as float and converted, with the
+ * error of the conversion reported, to see how much smaller tables would affect precision. */
+struct PrecomputeFormat {
+  const char *type;
+  size_t value_size;
+  /* Store value and load it back, as the kernel would. */
+  std::function<float(float)> quantize;
+  /* Value as printed in the table. */
+  std::function<string(float)> print;
+};
+
+static bool cycles_precompute_format(const std::string &name, PrecomputeFormat &format)
+{
+  if (name == "float") {
+    format = {"float",
+              sizeof(float),
+              [](const float value) { return value; },
+              [](const float value) { return std::to_string(value) + "f"; }};
+    return true;
+  }
+  if (name == "half") {
+    format = {"uint16_t",
+              sizeof(uint16_t),
+              [](const float value) { return half_to_float(float_to_half(value)); },
+              [](const float value) {
+                return string_printf("0x%04x", uint(uint16_t(float_to_half(value))));
+              }};
+    return true;
+  }
+  if (name == "fixed8" || name == "fixed16") {
+    /* Unsigned normalized fixed point, all tables are in the 0..1 range. */
+    const bool is_8bit = (name == "fixed8");
+    const float scale = is_8bit ? 255.0f : 65535.0f;
+    format = {is_8bit ? "uint8_t" : "uint16_t",
+              is_8bit ? sizeof(uint8_t) : sizeof(uint16_t),
+              [scale](const float value) { return roundf(saturatef(value) * scale) / scale; },
+              [scale](const float value) {
+                return std::to_string(int(roundf(saturatef(value) * scale)));
+              }};
+    return true;
+  }
+  return false;
+}
+
+struct PrecomputeOptions {
+  PrecomputeFormat format;
+  /* Stop sampling a cell once the standard error of its mean is below this, instead of always
+   * taking all samples of the term. Zero to disable. */
+  float error = 0.0f;
+  /* File to save finished z-slices to, and to resume from when it exists. */
+  string checkpoint;
+};
+
+/* Minimum number of samples per cell before testing convergence, so that the variance estimate
+ * is reliable. */
+static const int PRECOMPUTE_MIN_SAMPLES = 1 << 12;
+
+/* Checkpoint of finished z-slices. The first line identifies the table and sampling settings, so
+ * that a checkpoint of different settings is not resumed. Each following line holds the z index
+ * and values of one slice. */
+static void precompute_checkpoint_read(const string &filepath,
+                                       const string &header,
+                                       const int nz,
+                                       const int slice_size,
+                                       std::map<int, array<float>> &slices)
+{
+  string text;
+  if (!path_read_text(filepath, text)) {
+    return;
+  }
+
+  vector<string> lines;
+  string_split(lines, text, "\n");
+  if (lines.empty() || lines[0] != header) {
+    std::cerr << "Ignoring checkpoint " << filepath << " of different table or settings"
+              << std::endl;
+    return;
+  }
+
+  for (size_t i = 1; i < lines.size(); i++) {
+    vector<string> tokens;
+    string_split(tokens, lines[i]);
+
+    /* Skip slices that were not completely written. */
+    const int z = (tokens.empty()) ? -1 : atoi(tokens[0].c_str());
+    if (tokens.size() != size_t(slice_size) + 1 || z < 0 || z >= nz) {
+      continue;
+    }
+
+    array<float> data(slice_size);
+    for (int j = 0; j < slice_size; j++) {
+      data[j] = (float)atof(tokens[j + 1].c_str());
+    }
+    slices[z] = std::move(data);
+  }
+}
+
+static bool precompute_checkpoint_write(const string &filepath,
+                                        const string &header,
+                                        const std::map<int, array<float>> &slices)
+{
+  string text = header + "\n";
+  for (const auto &[z, data] : slices) {
+    text += std::to_string(z);
+    for (const float value : data) {
+      /* Enough digits to read back the exact same float. */
+      text += string_printf(" %.9g", value);
+    }
+    text += "\n";
+  }
+
+  /* Write to a temporary file first, so an interrupted write does not lose the checkpoint. */
+  const string tmp_filepath = filepath + ".tmp";
+  string rename_error;
+  if (!path_write_text(tmp_filepath, text) ||
+      !OIIO::Filesystem::rename(tmp_filepath, filepath, rename_error))
+  {
+    std::cerr << "Failed to write checkpoint " << filepath << std::endl;
+    return false;
+  }
+
+  return true;
+}
+
+static bool cycles_precompute(std::string name, const PrecomputeOptions &options)
 {
   std::map<string, PrecomputeTerm> precompute_terms;
   /* Overall albedo of the GGX microfacet BRDF, depending on cosI and roughness. */
@@ -226,20 +354,39 @@ static bool cycles_precompute(std::string name)
 
   const PrecomputeTerm &term = precompute_terms[name];
 
+  const PrecomputeFormat &format = options.format;
   const int samples = term.samples;
   const int nz = term.nz;
   const int ny = term.ny;
   const int nx = term.nx;
 
-  std::cout << "static const float table_" << name << "[" << nz * ny * nx << "] = {" << std::endl;
+  const string checkpoint_header = string_printf(
+      "cycles_precompute %s %d %d %d %d %g", name.c_str(), nx, ny, nz, samples, options.error);
+
+  std::map<int, array<float>> slices;
+  if (!options.checkpoint.empty()) {
+    precompute_checkpoint_read(options.checkpoint, checkpoint_header, nz, nx * ny, slices);
+    if (!slices.empty()) {
+      std::cerr << "Resuming with " << slices.size() << " of " << nz << " slices from "
+                << options.checkpoint << std::endl;
+    }
+  }
+
   for (int z = 0; z < nz; z++) {
+    if (slices.find(z) != slices.end()) {
+      continue;
+    }
+
     array<float> data(nx * ny);
+    array<int> data_samples(nx * ny);
     parallel_for(0, nx * ny, [&](int64_t i) {
       const int y = i / nx;
       const int x = i % nx;
       const uint seed = hash_uint2(x, y);
       double sum = 0.0;
-      for (int sample = 0; sample < samples; sample++) {
+      double sum_squared = 0.0;
+      int sample = 0;
+      while (sample < samples) {
         const float4 rand = sobol_burley_sample_4D(sample, 0, seed, 0xffffffff);
 
         const float rough = (nx == 1) ? 0.0f : clamp(float(x) / float(nx - 1), 1e-4f, 1.0f);
@@ -251,26 +398,69 @@ static bool cycles_precompute(std::string name)
           value = 0.0f;
         }
         sum += (double)value;
+        sum_squared += sqr((double)value);
+        sample++;
+
+        /* Test convergence only at powers of two, where the Sobol sequence is well stratified.
+         * The sample variance overestimates the error of quasi-random samples, so this errs on
+         * the side of taking more samples. */
+        if (options.error > 0.0f && sample >= PRECOMPUTE_MIN_SAMPLES && is_power_of_two(sample)) {
+          const double mean = sum / double(sample);
+          const double variance = max(sum_squared / double(sample) - sqr(mean), 0.0);
+          if (sqrt(variance / double(sample)) < double(options.error)) {
+            break;
+          }
+        }
       }
-      data[y * nx + x] = saturatef(float(sum / double(samples)));
+      data[y * nx + x] = saturatef(float(sum / double(sample)));
+      data_samples[y * nx + x] = sample;
     });
 
+    if (options.error > 0.0f) {
+      double slice_samples = 0.0;
+      for (const int cell_samples : data_samples) {
+        slice_samples += cell_samples;
+      }
+      std::cerr << string_printf("Slice %d of %d: %.1f%% of %d samples per cell",
+                                 z + 1,
+                                 nz,
+                                 100.0 * slice_samples / (double(samples) * nx * ny),
+                                 samples)
+                << std::endl;
+    }
+
+    slices[z] = std::move(data);
+
+    if (!options.checkpoint.empty()) {
+      precompute_checkpoint_write(options.checkpoint, checkpoint_header, slices);
+    }
+  }
+
+  double max_error = 0.0;
+  double squared_error = 0.0;
+
+  std::cout << "static const " << format.type << " table_" << name << "[" << nz * ny * nx
+            << "] = {" << std::endl;
+  for (int z = 0; z < nz; z++) {
+    const array<float> &data = slices[z];
+
     /* Print data formatted as C++ array */
     for (int y = 0; y < ny; y++) {
       std::cout << "  ";
       for (int x = 0; x < nx; x++) {
-        std::cout << std::to_string(data[y * nx + x]);
+        const float value = data[y * nx + x];
+        const double error = std::fabs(double(format.quantize(value)) - double(value));
+        max_error = std::max(max_error, error);
+        squared_error += error * error;
+
+        std::cout << format.print(value);
         if (x + 1 < nx) {
           /* Next number will follow in same line */
-          std::cout << "f, ";
+          std::cout << ", ";
         }
         else if (y + 1 < ny || z + 1 < nz) {
           /* Next number will follow in next line */
-          std::cout << "f,";
-        }
-        else {
-          /* No next number */
-          std::cout << "f";
+          std::cout << ",";
         }
       }
       std::cout << std::endl;
@@ -282,6 +472,19 @@ static bool cycles_precompute(std::string name)
   }
   std::cout << "};" << std::endl;
 
+  /* Report size and error relative to the float table, separate from the table itself. */
+  const int size = nx * ny * nz;
+  std::cerr << string_printf(
+                   "table_%s: %s, %zu bytes (float %zu bytes), max error %.3e, "
+                   "RMS error %.3e",
+                   name.c_str(),
+                   format.type,
+                   size * format.value_size,
+                   size * sizeof(float),
+                   max_error,
+                   sqrt(squared_error / size))
+            << std::endl;
+
   return true;
 }
 
@@ -289,8 +492,30 @@ CCL_NAMESPACE_END
 
 int main(const int argc, const char **argv)
 {
-  if (argc < 2) {
+  ccl::PrecomputeOptions options;
+  ccl::vector<std::string> args;
+
+  for (int i = 1; i < argc; i++) {
+    const std::string arg = argv[i];
+    if (arg == "--error" && i + 1 < argc) {
+      options.error = (float)atof(argv[++i]);
+    }
+    else if (arg == "--checkpoint" && i + 1 < argc) {
+      options.checkpoint = argv[++i];
+    }
+    else {
+      args.push_back(arg);
+    }
+  }
+
+  if (args.empty() || args.size() > 2 ||
+      !ccl::cycles_precompute_format((args.size() > 1) ? args[1] : "float", options.format))
+  {
+    fprintf(stderr,
+            "Usage: cycles_precompute [--error TARGET] [--checkpoint FILE] NAME "
+            "[float|half|fixed16|fixed8]\n");
     return 1;
   }
-  return ccl::cycles_precompute(argv[1]) ? 0 : 1;
+
+  return ccl::cycles_precompute(args[0], options) ? 0 : 1;
 }
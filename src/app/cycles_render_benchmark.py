@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+# SPDX-FileCopyrightText: 2011-2022 Blender Foundation
+#
+# SPDX-License-Identifier: Apache-2.0
+
+# Render benchmark of the cycles standalone executable.
+#
+# Every scene is rendered in the background for each combination of sample
+# count, thread count and tile size. Wall time, scene load time, render time and
+# samples per second as measured by the session, and peak resident memory of the
+# render process are recorded, printed, and can be written as JSON and compared
+# against a previous run to detect regressions.
+#
+# Usage: python3 cycles_render_benchmark.py --cycles ./cycles [--scenes examples/*.xml]
+#            [--samples 16 64] [--threads 0] [--tile-size 0] [--repeat 3]
+#            [--json results.json] [--baseline baseline.json] [--threshold 0.05]
+
+import argparse
+import glob
+import itertools
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+EXAMPLES_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "examples"))
+
+# Metrics compared against the baseline, and whether higher values are better.
+COMPARED_METRICS = {
+    'render_time': False,
+    'samples_per_second': True,
+    'peak_rss': False,
+}
+
+
+def run_process(command):
+    # Run a process and return its wall time and peak resident set size in
+    # bytes, or None where the platform does not report it.
+    start = time.perf_counter()
+    with subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE) as process:
+        if hasattr(os, "wait4"):
+            # Resource usage of this specific child, unlike getrusage(RUSAGE_CHILDREN)
+            # which reports the maximum over all children.
+            stderr = process.stderr.read()
+            _, status, rusage = os.wait4(process.pid, 0)
+            wall_time = time.perf_counter() - start
+            process.returncode = os.waitstatus_to_exitcode(status)
+            peak_rss = rusage.ru_maxrss if sys.platform == "darwin" else rusage.ru_maxrss * 1024
+        else:
+            _, stderr = process.communicate()
+            wall_time = time.perf_counter() - start
+            peak_rss = None
+
+    if process.returncode != 0:
+        raise RuntimeError(stderr.decode(errors="replace").strip() or "exit code %d" % process.returncode)
+
+    return wall_time, peak_rss
+
+
+def render_case(cycles, scene, samples, threads, tile_size, width, height, repeat):
+    with tempfile.TemporaryDirectory() as tmpdir:
+        profile_filepath = os.path.join(tmpdir, "profile.json")
+        command = [
+            cycles, "--background", "--quiet",
+            "--samples", str(samples),
+            "--threads", str(threads),
+            "--tile-size", str(tile_size),
+            "--width", str(width),
+            "--height", str(height),
+            "--profile-file", profile_filepath,
+            scene,
+        ]
+
+        # Keep the run that rendered fastest, with the wall time, load time and
+        # memory usage of that run. The render time is measured by the session
+        # and excludes process startup, scene loading and kernel loading.
+        best = None
+        for _ in range(repeat):
+            wall_time, peak_rss = run_process(command)
+            with open(profile_filepath, encoding="utf-8") as f:
+                profile = json.load(f)
+            load_time = profile["total_time"]
+            render_time = max(profile["render_time"], 1e-9)
+
+            if best is None or render_time < best[0]:
+                best = (render_time, wall_time, load_time, peak_rss)
+
+    render_time, wall_time, load_time, peak_rss = best
+
+    return {
+        'scene': os.path.basename(scene),
+        'samples': samples,
+        'threads': threads,
+        'tile_size': tile_size,
+        'width': width,
+        'height': height,
+        'wall_time': wall_time,
+        'load_time': load_time,
+        'render_time': render_time,
+        'samples_per_second': samples / render_time,
+        'pixel_samples_per_second': samples * width * height / render_time,
+        'peak_rss': peak_rss,
+    }
+
+
+def case_key(case):
+    return (case['scene'], case['samples'], case['threads'], case['tile_size'], case['width'], case['height'])
+
+
+def compare_results(results, baseline, threshold):
+    # Returns descriptions of metrics that got worse by more than the threshold
+    # relative to the baseline.
+    baseline_cases = {case_key(case): case for case in baseline['cases'] if 'error' not in case}
+    regressions = []
+
+    for case in results['cases']:
+        baseline_case = baseline_cases.get(case_key(case))
+        if not baseline_case or 'error' in case:
+            continue
+
+        for metric, higher_is_better in COMPARED_METRICS.items():
+            value = case.get(metric)
+            reference = baseline_case.get(metric)
+            if not value or not reference:
+                continue
+
+            change = value / reference - 1.0
+            if (-change if higher_is_better else change) > threshold:
+                regressions.append("%s samples=%d threads=%d tile_size=%d: %s %.4g -> %.4g (%+.1f%%)" % (
+                    case['scene'], case['samples'], case['threads'], case['tile_size'],
+                    metric, reference, value, change * 100.0))
+
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cycles standalone render benchmark")
+    parser.add_argument("--cycles", required=True, help="Path to cycles standalone executable")
+    parser.add_argument("--scenes", nargs="+", default=sorted(glob.glob(os.path.join(EXAMPLES_DIR, "*.xml"))),
+                        help="Scene files to render, the bundled examples by default")
+    parser.add_argument("--samples", type=int, nargs="+", default=[16, 64], help="Sample counts")
+    parser.add_argument("--threads", type=int, nargs="+", default=[0],
+                        help="Thread counts, 0 uses all available threads")
+    parser.add_argument("--tile-size", type=int, nargs="+", default=[0],
+                        help="Tile sizes in pixels, 0 renders without tiling")
+    parser.add_argument("--width", type=int, default=512, help="Image width in pixels")
+    parser.add_argument("--height", type=int, default=256, help="Image height in pixels")
+    parser.add_argument("--repeat", type=int, default=3, help="Number of runs per case, the fastest is kept")
+    parser.add_argument("--json", help="Write results to this JSON file")
+    parser.add_argument("--baseline", help="JSON file of a previous run to compare against")
+    parser.add_argument("--threshold", type=float, default=0.05,
+                        help="Relative change of a metric for the worse that counts as a regression")
+    args = parser.parse_args()
+
+    version = subprocess.run([args.cycles, "--version"], check=True, stdout=subprocess.PIPE, text=True).stdout
+    results = {
+        'cycles_version': version.strip(),
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+        'cpu_count': os.cpu_count(),
+        'cases': [],
+    }
+
+    print("%-24s %8s %8s %10s %10s %10s %10s %12s %14s" % (
+        "Scene", "Samples", "Threads", "Tile size", "Wall (s)", "Load (s)", "Render (s)", "Samples/s",
+        "Peak RSS (MB)"))
+
+    for scene, samples, threads, tile_size in itertools.product(
+            args.scenes, args.samples, args.threads, args.tile_size):
+        try:
+            case = render_case(args.cycles, scene, samples, threads, tile_size, args.width, args.height, args.repeat)
+        except (RuntimeError, OSError, ValueError, KeyError) as ex:
+            # For example scenes that need OSL, when cycles is built without it.
+            case = {
+                'scene': os.path.basename(scene),
+                'samples': samples,
+                'threads': threads,
+                'tile_size': tile_size,
+                'width': args.width,
+                'height': args.height,
+                'error': str(ex),
+            }
+            print("%-24s %8d %8d %10d   failed: %s" % (case['scene'], samples, threads, tile_size, ex))
+            results['cases'].append(case)
+            continue
+
+        results['cases'].append(case)
+        print("%-24s %8d %8d %10d %10.3f %10.3f %10.3f %12.1f %14s" % (
+            case['scene'], samples, threads, tile_size, case['wall_time'], case['load_time'],
+            case['render_time'], case['samples_per_second'],
+            "%.1f" % (case['peak_rss'] / (1024 * 1024)) if case['peak_rss'] else "-"))
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+        regressions = compare_results(results, baseline, args.threshold)
+        for regression in regressions:
+            print("Regression: " + regression)
+        if regressions:
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,418 @@
+/* SPDX-FileCopyrightText: 2011-2022 Blender Foundation
+ *
+ * SPDX-License-Identifier: Apache-2.0 */
+
+#include <cstdio>
+#include <cstdlib>
+
+#include "app/cycles_server.h"
+#include "app/cycles_xml.h"
+
+#include "scene/camera.h"
+#include "scene/object.h"
+#include "scene/scene.h"
+#include "session/buffers.h"
+#include "session/output_driver.h"
+
+#include "util/path.h"
+#include "util/projection.h"
+#include "util/thread.h"
+#include "util/unique_ptr.h"
+#include "util/vector.h"
+
+#ifndef _WIN32
+#  include <cerrno>
+#  include <csignal>
+#  include <cstring>
+#  include <sys/socket.h>
+#  include <sys/stat.h>
+#  include <sys/un.h>
+#  include <unistd.h>
+#endif
+
+CCL_NAMESPACE_BEGIN
+
+/* Output driver keeping the combined pass of the last finished render in memory. */
+class RenderServerOutputDriver : public OutputDriver {
+ public:
+  void write_render_tile(const Tile &tile) override
+  {
+    /* Only keep the full buffer, no intermediate tiles. */
+    if (!(tile.size == tile.full_size)) {
+      return;
+    }
+
+    const thread_scoped_lock lock(mutex);
+    width = tile.size.x;
+    height = tile.size.y;
+    pixels.resize(size_t(width) * height * 4);
+
+    if (!tile.get_pass_pixels("combined", 4, pixels.data())) {
+      pixels.clear();
+    }
+  }
+
+  thread_mutex mutex;
+  vector<float> pixels;
+  int width = 0;
+  int height = 0;
+};
+
+RenderServer::RenderServer(Session *session,
+                           const SessionParams &session_params,
+                           XMLShaderGraphs *shader_graphs)
+    : session_(session), session_params_(session_params), shader_graphs_(shader_graphs)
+{
+  unique_ptr<RenderServerOutputDriver> output_driver = make_unique<RenderServerOutputDriver>();
+  output_driver_ = output_driver.get();
+  session_->set_output_driver(std::move(output_driver));
+
+  /* With tiled rendering, tiles are written to a file during rendering and combined into the full
+   * image once an image is requested. */
+  session_->full_buffer_written_cb = [this](string_view filepath) {
+    full_buffer_filepaths_.emplace_back(filepath);
+  };
+}
+
+RenderServer::~RenderServer()
+{
+  /* Stop rendering before removing the callback, so it is not called while it is removed. */
+  session_->cancel(true);
+  session_->full_buffer_written_cb = nullptr;
+
+  for (const string &filepath : full_buffer_filepaths_) {
+    path_remove(filepath);
+  }
+}
+
+void RenderServer::process_full_buffers()
+{
+  /* Files of canceled renders come first, the last file is the one of the finished render. */
+  for (const string &filepath : full_buffer_filepaths_) {
+    session_->process_full_buffer_from_disk(filepath);
+    path_remove(filepath);
+  }
+  full_buffer_filepaths_.clear();
+}
+
+/* Transform from 16 matrix values in the tokens starting at first, like the matrix attribute of
+ * transforms in scene files. */
+static bool parse_transform(const vector<string> &tokens, const size_t first, Transform &tfm)
+{
+  if (tokens.size() != first + 16) {
+    return false;
+  }
+
+  ProjectionTransform projection;
+  float *values = (float *)&projection;
+  for (int i = 0; i < 16; i++) {
+    values[i] = (float)atof(tokens[first + i].c_str());
+  }
+
+  tfm = projection_to_transform(projection_transpose(projection));
+  return true;
+}
+
+void RenderServer::restart_render()
+{
+  Scene *scene = session_->scene.get();
+
+  BufferParams buffer_params;
+  buffer_params.width = scene->camera->get_full_width();
+  buffer_params.height = scene->camera->get_full_height();
+  buffer_params.full_width = buffer_params.width;
+  buffer_params.full_height = buffer_params.height;
+
+  /* Stop the current render first, so the render thread can not finish and go idle in between
+   * the reset and start. */
+  session_->cancel(true);
+  session_->progress.reset();
+  session_->reset(session_params_, buffer_params);
+  session_->start();
+
+  need_restart_ = false;
+}
+
+#ifndef _WIN32
+
+static bool send_all(const int fd, const void *data, size_t size)
+{
+  const char *bytes = (const char *)data;
+
+  while (size > 0) {
+    const ssize_t sent = send(fd, bytes, size, 0);
+    if (sent < 0) {
+      if (errno == EINTR) {
+        continue;
+      }
+      return false;
+    }
+
+    bytes += sent;
+    size -= sent;
+  }
+
+  return true;
+}
+
+static bool send_line(const int fd, const string &line)
+{
+  const string data = line + "\n";
+  return send_all(fd, data.data(), data.size());
+}
+
+bool RenderServer::send_image(const int fd)
+{
+  if (need_restart_) {
+    restart_render();
+  }
+
+  session_->wait();
+  process_full_buffers();
+
+  if (session_->progress.get_error()) {
+    return send_line(fd, "error " + session_->progress.get_error_message());
+  }
+
+  const thread_scoped_lock lock(output_driver_->mutex);
+  const int width = output_driver_->width;
+  const int height = output_driver_->height;
+
+  if (output_driver_->pixels.empty()) {
+    return send_line(fd, "error No image rendered");
+  }
+
+  if (!send_line(fd, string_printf("ok %d %d", width, height))) {
+    return false;
+  }
+
+  /* Render buffers are bottom-up, send rows top-down like image files. */
+  const size_t row_size = size_t(width) * 4 * sizeof(float);
+  for (int y = height - 1; y >= 0; y--) {
+    if (!send_all(fd, output_driver_->pixels.data() + size_t(y) * width * 4, row_size)) {
+      return false;
+    }
+  }
+
+  return true;
+}
+
+bool RenderServer::handle_command(const int fd, const string &line, bool &shutdown)
+{
+  vector<string> tokens;
+  string_split(tokens, line);
+
+  const string &command = tokens[0];
+  Scene *scene = session_->scene.get();
+
+  if (command == "quit") {
+    return false;
+  }
+  if (command == "shutdown") {
+    shutdown = true;
+    return false;
+  }
+  if (command == "image") {
+    return send_image(fd);
+  }
+
+  string error;
+
+  if (command == "camera") {
+    Transform tfm;
+    if (parse_transform(tokens, 1, tfm)) {
+      const thread_scoped_lock scene_lock(scene->mutex);
+      scene->camera->set_matrix(tfm);
+      scene->camera->need_flags_update = true;
+      scene->camera->need_device_update = true;
+    }
+    else {
+      error = "Expected 16 matrix values";
+    }
+  }
+  else if (command == "transform") {
+    Transform tfm;
+    if (tokens.size() > 1 && parse_transform(tokens, 2, tfm)) {
+      const thread_scoped_lock scene_lock(scene->mutex);
+      const ustring name(tokens[1]);
+      bool found = false;
+
+      for (Object *object : scene->objects) {
+        if (object->name == name) {
+          object->set_tfm(tfm);
+          object->tag_update(scene);
+          found = true;
+        }
+      }
+
+      if (!found) {
+        error = "Unknown object \"" + tokens[1] + "\"";
+      }
+    }
+    else {
+      error = "Expected object name and 16 matrix values";
+    }
+  }
+  else if (command == "samples") {
+    if (tokens.size() == 2 && atoi(tokens[1].c_str()) > 0) {
+      session_params_.samples = atoi(tokens[1].c_str());
+    }
+    else {
+      error = "Expected a positive number of samples";
+    }
+  }
+  else if (command == "shader") {
+    if (tokens.size() >= 5) {
+      /* Values with multiple components, like colors, are separated by spaces. */
+      string value = tokens[4];
+      for (size_t i = 5; i < tokens.size(); i++) {
+        value += " " + tokens[i];
+      }
+
+      const thread_scoped_lock scene_lock(scene->mutex);
+      shader_graphs_->set_node_value(scene, tokens[1], tokens[2], tokens[3], value, error);
+    }
+    else {
+      error = "Expected shader name, node name, input name and value";
+    }
+  }
+  else {
+    error = "Unknown command \"" + command + "\"";
+  }
+
+  if (!error.empty()) {
+    return send_line(fd, "error " + error);
+  }
+
+  need_restart_ = true;
+  return send_line(fd, "ok");
+}
+
+bool RenderServer::handle_client(const int fd)
+{
+  string buffer;
+  char data[4096];
+  bool connected = true;
+  bool shutdown = false;
+
+  while (connected) {
+    const ssize_t size = recv(fd, data, sizeof(data), 0);
+    if (size < 0 && errno == EINTR) {
+      continue;
+    }
+    if (size <= 0) {
+      break;
+    }
+
+    buffer.append(data, size);
+
+    size_t end;
+    while (connected && (end = buffer.find('\n')) != string::npos) {
+      const string line = string_strip(buffer.substr(0, end));
+      buffer.erase(0, end + 1);
+
+      if (!line.empty()) {
+        connected = handle_command(fd, line, shutdown);
+      }
+    }
+
+    /* Restart rendering once all commands received so far are handled, rather than for every
+     * single edit. */
+    if (need_restart_ && !shutdown) {
+      restart_render();
+    }
+  }
+
+  return !shutdown;
+}
+
+bool RenderServer::run(const string &socket_path)
+{
+  sockaddr_un address;
+  memset(&address, 0, sizeof(address));
+  address.sun_family = AF_UNIX;
+
+  if (socket_path.size() >= sizeof(address.sun_path)) {
+    fprintf(stderr, "Socket path too long: %s\n", socket_path.c_str());
+    return false;
+  }
+  strcpy(address.sun_path, socket_path.c_str());
+
+  const int server_fd = socket(AF_UNIX, SOCK_STREAM, 0);
+  if (server_fd < 0) {
+    fprintf(stderr, "Failed to create socket: %s\n", strerror(errno));
+    return false;
+  }
+
+  /* Remove socket file left behind by a previous server, but no other files. */
+  struct stat st;
+  if (lstat(socket_path.c_str(), &st) == 0 && S_ISSOCK(st.st_mode)) {
+    unlink(socket_path.c_str());
+  }
+
+  /* Clients can read files and shut down the server, so only allow the current user to connect.
+   * Create the socket file without permissions for others, so there is no window where they can
+   * connect before its permissions are set. */
+  const mode_t mask = umask(S_IRWXG | S_IRWXO);
+  const bool bound = bind(server_fd, (const sockaddr *)&address, sizeof(address)) == 0;
+  umask(mask);
+
+  if (!bound || chmod(socket_path.c_str(), S_IRUSR | S_IWUSR) < 0 || listen(server_fd, 1) < 0) {
+    fprintf(stderr, "Failed to listen on %s: %s\n", socket_path.c_str(), strerror(errno));
+    if (bound) {
+      unlink(socket_path.c_str());
+    }
+    close(server_fd);
+    return false;
+  }
+
+  /* Clients closing the connection early should not terminate the server. */
+  signal(SIGPIPE, SIG_IGN);
+
+  bool running = true;
+  while (running) {
+    const int fd = accept(server_fd, nullptr, nullptr);
+    if (fd < 0) {
+      if (errno == EINTR) {
+        continue;
+      }
+      fprintf(stderr, "Failed to accept connection: %s\n", strerror(errno));
+      break;
+    }
+
+    running = handle_client(fd);
+    close(fd);
+  }
+
+  close(server_fd);
+  unlink(socket_path.c_str());
+
+  return true;
+}
+
+#else
+
+bool RenderServer::send_image(const int /*fd*/)
+{
+  return false;
+}
+
+bool RenderServer::handle_command(const int /*fd*/, const string & /*line*/, bool & /*shutdown*/)
+{
+  return false;
+}
+
+bool RenderServer::handle_client(const int /*fd*/)
+{
+  return false;
+}
+
+bool RenderServer::run(const string & /*socket_path*/)
+{
+  fprintf(stderr, "Render server is not supported on this platform\n");
+  return false;
+}
+
+#endif
+
+CCL_NAMESPACE_END
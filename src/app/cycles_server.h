@@ -0,0 +1,58 @@
+/* SPDX-FileCopyrightText: 2011-2022 Blender Foundation
+ *
+ * SPDX-License-Identifier: Apache-2.0 */
+
+#pragma once
+
+#include "session/session.h"
+
+#include "util/string.h"
+#include "util/vector.h"
+
+CCL_NAMESPACE_BEGIN
+
+class XMLShaderGraphs;
+class RenderServerOutputDriver;
+
+/* Render server that keeps a scene loaded and accepts edits from clients on a local socket.
+ *
+ * Clients send commands as lines of text, and get a line starting with "ok" or "error" back.
+ * Edits are applied to the scene nodes and go through the regular scene update of the session,
+ * the render restarts once all commands received so far are handled.
+ *
+ *   camera M00 M01 ... M33              Set the camera matrix, as in the scene file.
+ *   transform OBJECT M00 M01 ... M33    Set the transform of all objects with the name.
+ *   samples N                           Set the number of samples.
+ *   shader SHADER NODE INPUT VALUE      Set a shader node input, value written as in the scene.
+ *   image                               Wait for the render to finish, and reply with
+ *                                       "ok WIDTH HEIGHT" followed by the combined pass as
+ *                                       WIDTH * HEIGHT * 4 floats, rows from top to bottom.
+ *   quit                                Close the connection.
+ *   shutdown                            Close the connection and stop the server. */
+class RenderServer {
+ public:
+  RenderServer(Session *session,
+               const SessionParams &session_params,
+               XMLShaderGraphs *shader_graphs);
+  ~RenderServer();
+
+  /* Listen on a local socket at the file path, and handle clients one at a time until one of
+   * them sends the shutdown command. Returns false if the socket could not be created. */
+  bool run(const string &socket_path);
+
+ protected:
+  bool handle_client(const int fd);
+  bool handle_command(const int fd, const string &line, bool &shutdown);
+  bool send_image(const int fd);
+  void restart_render();
+  void process_full_buffers();
+
+  Session *session_;
+  SessionParams session_params_;
+  XMLShaderGraphs *shader_graphs_;
+  RenderServerOutputDriver *output_driver_;
+  bool need_restart_ = false;
+  vector<string> full_buffer_filepaths_;
+};
+
+CCL_NAMESPACE_END
@@ -5,9 +5,15 @@
 #include <cstdio>
 
 #include "device/device.h"
+#include "scene/background.h"
 #include "scene/camera.h"
+#include "scene/film.h"
+#include "scene/geometry.h"
 #include "scene/integrator.h"
+#include "scene/object.h"
 #include "scene/scene.h"
+#include "scene/shader.h"
+#include "scene/shader_graph.h"
 #include "session/buffers.h"
 #include "session/session.h"
 
@@ -15,6 +21,7 @@
 #include "util/log.h"
 #include "util/path.h"
 #include "util/progress.h"
+#include "util/set.h"
 #include "util/string.h"
 #include "util/system.h"
 #ifdef WITH_CYCLES_STANDALONE_GUI
@@ -28,6 +35,7 @@
 #  include "hydra/file_reader.h"
 #endif
 
+#include "app/cycles_server.h"
 #include "app/cycles_xml.h"
 #include "app/oiio_output_driver.h"
 
@@ -38,10 +46,18 @@
 
 CCL_NAMESPACE_BEGIN
 
+/* Scene file to render, with the number used in output file paths of batch renders. */
+struct RenderJob {
+  string filepath;
+  int number;
+};
+
 struct Options {
   unique_ptr<Session> session;
   Scene *scene;
   string filepath;
+  vector<RenderJob> jobs;
+  size_t job;
   int width, height;
   SceneParams scene_params;
   SessionParams session_params;
@@ -49,6 +65,15 @@ struct Options {
   bool show_help, interactive, pause;
   string output_filepath;
   string output_pass;
+  OIIOOutputDriver *output_driver;
+  vector<string> full_buffer_filepaths;
+  bool profile;
+  string profile_filepath;
+  XMLLoadStats load_stats;
+  string server_socket;
+  unique_ptr<RenderServer> server;
+  XMLShaderGraphs shader_graphs;
+  XMLUnusedShaders unused_shaders;
 } options;
 
 static void session_print(const string &str)
@@ -98,10 +123,122 @@ static BufferParams &session_buffer_params()
   return buffer_params;
 }
 
-static void scene_init()
+/* Replace the last run of # characters in the file path by the zero padded number, like frame
+ * numbers in Blender output paths. Without # characters, the number is appended to the file name
+ * when rendering multiple jobs. */
+static string job_filepath(const string &filepath, const int number)
 {
-  options.scene = options.session->scene.get();
+  const size_t last = filepath.find_last_of('#');
+
+  if (last == string::npos) {
+    if (options.jobs.size() <= 1) {
+      return filepath;
+    }
+
+    const string filename = path_filename(filepath);
+    const size_t dot = filename.find_last_of('.');
+    const size_t split = (dot == string::npos || dot == 0) ?
+                             filepath.size() :
+                             filepath.size() - filename.size() + dot;
+    return filepath.substr(0, split) + string_printf("_%04d", number) + filepath.substr(split);
+  }
+
+  size_t first = last;
+  while (first > 0 && filepath[first - 1] == '#') {
+    first--;
+  }
+
+  return filepath.substr(0, first) + string_printf("%0*d", int(last - first + 1), number) +
+         filepath.substr(last + 1);
+}
+
+/* Write scene loading statistics, and the render time of the session when rendering finished. */
+static void profile_write(const double render_time = -1.0)
+{
+  string report = options.load_stats.json_report();
+  if (render_time >= 0.0) {
+    /* Add the render time as another member of the statistics object. */
+    report.insert(report.size() - 1, string_printf(", \"render_time\": %.9g", render_time));
+  }
+  report += "\n";
+
+  if (options.profile_filepath.empty()) {
+    printf("%s", report.c_str());
+    return;
+  }
+
+  const string filepath = job_filepath(options.profile_filepath, options.jobs[options.job].number);
+  if (!path_write_text(filepath, report)) {
+    fprintf(stderr, "Failed to write profile to %s\n", filepath.c_str());
+  }
+}
+
+/* Remove the nodes of the previous job from the scene, so the next job can be loaded while
+ * keeping the device, shading system and images. */
+static void scene_clear()
+{
+  Scene *scene = options.scene;
+  const thread_scoped_lock scene_lock(scene->mutex);
+
+  set<Object *> objects;
+  for (Object *object : scene->objects) {
+    objects.insert(object);
+  }
+  scene->delete_nodes(objects);
+
+  set<Geometry *> geometry;
+  for (Geometry *geom : scene->geometry) {
+    geometry.insert(geom);
+  }
+  scene->delete_nodes(geometry);
+
+  /* Shaders can not be removed from the scene, clear their graphs instead so they are cheap to
+   * compile, and reuse them for shaders of the next job. Images of the cleared graphs are only
+   * freed on the next scene update, so images the next job uses again stay loaded. Names are
+   * cleared too, so shaders the next job does not reuse are not confused with its own shaders
+   * when looking up shaders by name. */
+  set<Shader *> shaders;
+  options.unused_shaders.clear();
+  for (Shader *shader : scene->shaders) {
+    if (shader == scene->default_surface || shader == scene->default_volume ||
+        shader == scene->default_light || shader == scene->default_empty)
+    {
+      continue;
+    }
+
+    shader->set_graph(make_unique<ShaderGraph>());
+    shader->tag_update(scene);
+
+    if (shader != scene->default_background) {
+      for (const SocketType &socket : shader->type->inputs) {
+        if (!socket.is_array()) {
+          shader->set_default_value(socket);
+        }
+      }
+      options.unused_shaders.add(shader, shader->name);
+      shader->name = ustring();
+      shaders.insert(shader);
+    }
+  }
+  scene->delete_nodes(shaders);
+  options.shader_graphs.clear();
+
+  /* Restore settings the scene file may have changed to their defaults. */
+  Node *settings[] = {scene->camera, scene->film, scene->integrator, scene->background};
+  for (Node *node : settings) {
+    for (const SocketType &socket : node->type->inputs) {
+      if (!socket.is_array()) {
+        node->set_default_value(socket);
+      }
+    }
+    node->tag_modified();
+  }
+  scene->background->tag_update(scene);
+  scene->integrator->tag_update(scene, Integrator::UPDATE_ALL);
+}
 
+static void scene_init()
+{
   /* Read XML or USD */
 #ifdef WITH_USD
   if (!string_endswith(string_to_lower(options.filepath), ".xml")) {
@@ -110,7 +247,30 @@ static void scene_init()
   else
 #endif
   {
-    xml_read_file(options.scene, options.filepath.c_str());
+    /* Keep shader graph XML for edits from render server clients. */
+    XMLShaderGraphs *shader_graphs = (options.server_socket.empty()) ? nullptr :
+                                                                       &options.shader_graphs;
+
+    if (options.profile) {
+      options.load_stats = XMLLoadStats();
+      xml_read_file(options.scene,
+                    options.filepath.c_str(),
+                    &options.load_stats,
+                    shader_graphs,
+                    &options.unused_shaders);
+
+      /* Background renders write statistics once rendering finished, with the render time. */
+      if (!options.session_params.background || !options.server_socket.empty()) {
+        profile_write();
+      }
+    }
+    else {
+      xml_read_file(options.scene,
+                    options.filepath.c_str(),
+                    nullptr,
+                    shader_graphs,
+                    &options.unused_shaders);
+    }
   }
 
   /* Camera width/height override? */
@@ -127,6 +287,63 @@ static void scene_init()
   options.scene->camera->compute_auto_viewplane();
 }
 
+/* With tiled rendering, tiles are written to a file during rendering and combined into the full
+ * image afterwards. */
+static void session_write_full_buffers()
+{
+  for (const string &filepath : options.full_buffer_filepaths) {
+    options.session->process_full_buffer_from_disk(filepath);
+    path_remove(filepath);
+  }
+  options.full_buffer_filepaths.clear();
+}
+
+/* Wait for the render of the current job to finish in background mode. */
+static void session_wait_job()
+{
+  options.session->wait();
+  session_write_full_buffers();
+
+  if (options.profile) {
+    /* Time spent rendering samples, excluding scene and kernel loading. */
+    double total_time, render_time;
+    options.session->progress.get_time(total_time, render_time);
+    profile_write(render_time);
+  }
+}
+
+static void session_start_job(const size_t job)
+{
+  options.job = job;
+  options.filepath = options.jobs[job].filepath;
+
+  if (options.jobs.size() > 1 && !options.quiet) {
+    session_print(string_printf("Rendering %s (%zu/%zu)",
+                                path_filename(options.filepath).c_str(),
+                                job + 1,
+                                options.jobs.size()));
+    printf("\n");
+  }
+
+  /* Images of previous jobs may still be written while this job renders. */
+  if (options.output_driver) {
+    options.output_driver->set_filepath(
+        job_filepath(options.output_filepath, options.jobs[job].number));
+  }
+
+  /* Reuse the session of the previous job, with its device, shading system and images. */
+  if (job > 0) {
+    scene_clear();
+    options.session->progress.reset();
+  }
+
+  /* load scene */
+  scene_init();
+
+  options.session->reset(options.session_params, session_buffer_params());
+  options.session->start();
+}
+
 static void session_init()
 {
   options.output_pass = "combined";
@@ -140,8 +357,21 @@ static void session_init()
 #endif
 
   if (!options.output_filepath.empty()) {
-    options.session->set_output_driver(make_unique<OIIOOutputDriver>(
-        options.output_filepath, options.output_pass, session_print));
+    /* Write images on a writer thread while the next job renders. A single render waits for its
+     * image to be written anyway, a writer thread would only hold the image longer. */
+    unique_ptr<OIIOOutputDriver> output_driver = make_unique<OIIOOutputDriver>(
+        options.output_filepath, options.output_pass, session_print, options.jobs.size() > 1);
+    options.output_driver = output_driver.get();
+    options.session->set_output_driver(std::move(output_driver));
+  }
+
+  options.session->full_buffer_written_cb = [](string_view filepath) {
+    options.full_buffer_filepaths.emplace_back(filepath);
+  };
+
+  if (!options.server_socket.empty()) {
+    options.server = make_unique<RenderServer>(
+        options.session.get(), options.session_params, &options.shader_graphs);
   }
 
   if (options.session_params.background && !options.quiet) {
@@ -153,22 +383,24 @@ static void session_init()
   }
 #endif
 
-  /* load scene */
-  scene_init();
+  options.scene = options.session->scene.get();
 
   /* add pass for output. */
   Pass *pass = options.scene->create_node<Pass>();
   pass->set_name(ustring(options.output_pass.c_str()));
   pass->set_type(PASS_COMBINED);
 
-  options.session->reset(options.session_params, session_buffer_params());
-  options.session->start();
+  session_start_job(0);
 }
 
 static void session_exit()
 {
+  options.server.reset();
+
   if (options.session) {
+    /* Waits for images still being written. */
     options.session.reset();
+    options.output_driver = nullptr;
   }
 
   if (options.session_params.background && !options.quiet) {
@@ -379,7 +611,9 @@ static void options_parse(const int argc, const char **argv)
   options.width = 1024;
   options.height = 512;
   options.filepath = "";
+  options.job = 0;
   options.session = nullptr;
+  options.output_driver = nullptr;
   options.quiet = false;
   options.session_params.use_auto_tile = false;
   options.session_params.tile_size = 0;
@@ -409,8 +643,15 @@ static void options_parse(const int argc, const char **argv)
   bool version = false;
   string log_level;
 
-  ap.usage("cycles [options] file.xml");
-  ap.arg("filename").hidden().action([&](auto argv) { options.filepath = argv[0]; });
+  /* scene files */
+  vector<string> filepaths;
+  string file_list;
+  int frame_start = 0;
+  int frame_end = 0;
+  bool use_frames = false;
+
+  ap.usage("cycles [options] file.xml [file.xml ...]");
+  ap.arg("filename").hidden().action([&](auto argv) { filepaths.push_back(argv[0]); });
   ap.arg("--device %s:DEVICE").help("Devices to use: " + device_names).action([&](auto argv) {
     parse_string(argv, &devicename);
   });
@@ -440,8 +681,30 @@ static void options_parse(const int argc, const char **argv)
   ap.arg("--tile-size %d:TILE_SIZE").help("Tile size in pixels").action([&](auto argv) {
     parse_int(argv, &options.session_params.tile_size);
   });
+  ap.arg("--file-list %s:FILE")
+      .help("Text file with a scene file path per line, to render in sequence")
+      .action([&](auto argv) { parse_string(argv, &file_list); });
+  ap.arg("--frames %d:START %d:END")
+      .help("Render a frame range, replacing # characters in the file path by the frame number")
+      .action([&](auto argv) {
+        assert(argv.size() == 3);
+        frame_start = atoi(argv[1]);
+        frame_end = atoi(argv[2]);
+        use_frames = true;
+      });
+  ap.arg("--server %s:SOCKET")
+      .help(
+          "Keep the scene loaded and accept edits from clients on a local socket at this path. "
+          "Only the current user can connect, an existing socket at the path is replaced")
+      .action([&](auto argv) { parse_string(argv, &options.server_socket); });
   ap.arg("--list-devices", &list).help("List information about all available devices");
-  ap.arg("--profile", &profile).help("Enable profile logging");
+  ap.arg("--profile", &profile)
+      .help("Enable profile logging, and print scene loading statistics and render time as JSON");
+  ap.arg("--profile-file %s:FILE")
+      .help(
+          "File path to write scene loading statistics and render time to, instead of printing "
+          "them")
+      .action([&](auto argv) { parse_string(argv, &options.profile_filepath); });
   ap.arg("--log-level %s:LEVEL")
       .help("Log verbosity: fatal, error, warning, info, stats, debug")
       .action([&](auto argv) { parse_string(argv, &log_level); });
@@ -475,12 +738,50 @@ static void options_parse(const int argc, const char **argv)
     printf("%s\n", CYCLES_VERSION_STRING);
     exit(EXIT_SUCCESS);
   }
-  else if (help || options.filepath.empty()) {
+  else if (help || (filepaths.empty() && file_list.empty())) {
     ap.print_help();
     exit(EXIT_SUCCESS);
   }
 
+  if (!file_list.empty()) {
+    string text;
+    if (!path_read_text(file_list, text)) {
+      fprintf(stderr, "Failed to read file list %s\n", file_list.c_str());
+      exit(EXIT_FAILURE);
+    }
+
+    vector<string> lines;
+    string_split(lines, text, "\r\n");
+    for (const string &line : lines) {
+      const string filepath = string_strip(line);
+      if (!filepath.empty()) {
+        filepaths.push_back(filepath);
+      }
+    }
+  }
+
+  if (use_frames) {
+    if (filepaths.size() != 1 || filepaths[0].find('#') == string::npos) {
+      fprintf(stderr, "Frame range requires a single file path with # for the frame number\n");
+      exit(EXIT_FAILURE);
+    }
+
+    for (int frame = frame_start; frame <= frame_end; frame++) {
+      options.jobs.push_back({job_filepath(filepaths[0], frame), frame});
+    }
+  }
+  else {
+    for (size_t i = 0; i < filepaths.size(); i++) {
+      options.jobs.push_back({filepaths[i], int(i + 1)});
+    }
+  }
+
+  if (!options.jobs.empty()) {
+    options.filepath = options.jobs[0].filepath;
+  }
+
   options.session_params.use_profiling = profile;
+  options.profile = profile || !options.profile_filepath.empty();
 
   if (ssname == "osl") {
     options.scene_params.shadingsystem = SHADINGSYSTEM_OSL;
@@ -493,6 +794,11 @@ static void options_parse(const int argc, const char **argv)
   options.session_params.background = true;
 #endif
 
+  /* The render server restarts renders after edits, finishing each like a background render. */
+  if (!options.server_socket.empty()) {
+    options.session_params.background = true;
+  }
+
   if (options.session_params.tile_size > 0) {
     options.session_params.use_auto_tile = true;
   }
@@ -532,6 +838,16 @@ static void options_parse(const int argc, const char **argv)
     fprintf(stderr, "No file path specified\n");
     exit(EXIT_FAILURE);
   }
+  else if (options.jobs.size() > 1 && !options.session_params.background) {
+    fprintf(stderr, "Rendering multiple files is only supported in background mode\n");
+    exit(EXIT_FAILURE);
+  }
+  else if (!options.server_socket.empty() &&
+           (options.jobs.size() > 1 || !options.output_filepath.empty()))
+  {
+    fprintf(stderr, "Render server supports a single scene file, and no output file\n");
+    exit(EXIT_FAILURE);
+  }
 }
 
 CCL_NAMESPACE_END
@@ -549,7 +865,25 @@ int main(const int argc, const char **argv)
   if (options.session_params.background) {
 #endif
     session_init();
-    options.session->wait();
+
+    if (options.server) {
+      if (!options.quiet) {
+        printf("Listening on %s\n", options.server_socket.c_str());
+      }
+      if (!options.server->run(options.server_socket)) {
+        session_exit();
+        return EXIT_FAILURE;
+      }
+    }
+    else {
+      session_wait_job();
+
+      for (size_t job = 1; job < options.jobs.size(); job++) {
+        session_start_job(job);
+        session_wait_job();
+      }
+    }
+
     session_exit();
 #ifdef WITH_CYCLES_STANDALONE_GUI
   }
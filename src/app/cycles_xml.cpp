@@ -4,6 +4,10 @@
 
 #include <algorithm>
 #include <cstdio>
+#include <cstring>
+#include <deque>
+#include <sstream>
+#include <type_traits>
 
 #include "graph/node_xml.h"
 
@@ -21,10 +25,15 @@
 #include "scene/shader_nodes.h"
 
 #include "util/log.h"
+#include "util/map.h"
 #include "util/path.h"
 #include "util/projection.h"
 #include "util/string.h"
+#include "util/task.h"
+#include "util/thread.h"
+#include "util/time.h"
 #include "util/transform.h"
+#include "util/unique_ptr.h"
 #include "util/xml.h"
 
 #include "app/cycles_xml.h"
@@ -33,6 +42,9 @@ CCL_NAMESPACE_BEGIN
 
 /* XML reading state */
 
+class XMLIncludeLoader;
+class XMLLoadProfiler;
+
 struct XMLReadState : public XMLReader {
   Scene *scene = nullptr;   /* Scene pointer. */
   Transform tfm;            /* Current transform state. */
@@ -42,6 +54,12 @@ struct XMLReadState : public XMLReader {
   float dicing_rate = 1.0f; /* Current dicing rate. */
   Object *object = nullptr; /* Current object. */
 
+  XMLIncludeLoader *loader = nullptr;               /* Loader of included files. */
+  XMLLoadProfiler *profiler = nullptr;              /* Load statistics, when profiling. */
+  XMLShaderGraphs *shader_graphs = nullptr;         /* Shader graph XML, for later edits. */
+  unordered_map<ustring, Mesh *> *meshes = nullptr; /* Named meshes, for objects to reference. */
+  XMLUnusedShaders *unused_shaders = nullptr;       /* Shaders to reuse for new shaders. */
+
   XMLReadState()
   {
     tfm = transform_identity();
@@ -67,11 +85,13 @@ static bool xml_read_int_array(vector<int> &value, const xml_node node, const ch
   const xml_attribute attr = node.attribute(name);
 
   if (attr) {
-    vector<string> tokens;
-    string_split(tokens, attr.value());
+    /* Values are converted directly from the attribute text, without per token strings. */
+    const char *str = attr.value();
+    value.reserve(value.size() + string_count_tokens(str));
 
-    for (const string &token : tokens) {
-      value.push_back(atoi(token.c_str()));
+    int v;
+    while ((str = string_parse_int(str, v))) {
+      value.push_back(v);
     }
 
     return true;
@@ -97,11 +117,12 @@ static bool xml_read_float_array(vector<float> &value, const xml_node node, cons
   const xml_attribute attr = node.attribute(name);
 
   if (attr) {
-    vector<string> tokens;
-    string_split(tokens, attr.value());
+    const char *str = attr.value();
+    value.reserve(value.size() + string_count_tokens(str));
 
-    for (const string &token : tokens) {
-      value.push_back((float)atof(token.c_str()));
+    float v;
+    while ((str = string_parse_float(str, v))) {
+      value.push_back(v);
     }
 
     return true;
@@ -110,11 +131,31 @@ static bool xml_read_float_array(vector<float> &value, const xml_node node, cons
   return false;
 }
 
+/* Read exactly num floats from an attribute. */
+static bool xml_read_floats(float *value, const int num, const xml_node node, const char *name)
+{
+  const xml_attribute attr = node.attribute(name);
+
+  if (!attr) {
+    return false;
+  }
+
+  const char *str = attr.value();
+  for (int i = 0; i < num; i++) {
+    str = string_parse_float(str, value[i]);
+    if (!str) {
+      return false;
+    }
+  }
+
+  return string_count_tokens(str) == 0;
+}
+
 static bool xml_read_float3(float3 *value, const xml_node node, const char *name)
 {
-  vector<float> array;
+  float array[3];
 
-  if (xml_read_float_array(array, node, name) && array.size() == 3) {
+  if (xml_read_floats(array, 3, node, name)) {
     *value = make_float3(array[0], array[1], array[2]);
     return true;
   }
@@ -126,11 +167,17 @@ static bool xml_read_float3_array(vector<packed_float3> &value,
                                   const xml_node node,
                                   const char *name)
 {
-  vector<float> array;
+  const xml_attribute attr = node.attribute(name);
 
-  if (xml_read_float_array(array, node, name)) {
-    for (size_t i = 0; i < array.size(); i += 3) {
-      value.push_back(make_float3(array[i + 0], array[i + 1], array[i + 2]));
+  if (attr) {
+    const char *str = attr.value();
+    value.reserve(value.size() + string_count_tokens(str) / 3);
+
+    float x, y, z;
+    while ((str = string_parse_float(str, x)) && (str = string_parse_float(str, y)) &&
+           (str = string_parse_float(str, z)))
+    {
+      value.push_back(make_float3(x, y, z));
     }
 
     return true;
@@ -141,9 +188,9 @@ static bool xml_read_float3_array(vector<packed_float3> &value,
 
 static bool xml_read_float4(float4 *value, const xml_node node, const char *name)
 {
-  vector<float> array;
+  float array[4];
 
-  if (xml_read_float_array(array, node, name) && array.size() == 4) {
+  if (xml_read_floats(array, 4, node, name)) {
     *value = make_float4(array[0], array[1], array[2], array[3]);
     return true;
   }
@@ -174,6 +221,177 @@ static bool xml_equal_string(const xml_node node, const char *name, const char *
   return false;
 }
 
+/* Array Reading
+ *
+ * Large arrays may be stored in a binary sidecar file instead of ASCII attributes. The file is
+ * referenced by the "data" attribute of the element, and array attributes then contain
+ * "<type> <byte offset> <count>" with type one of float32, int32, uint16 or uint8, and count
+ * the number of scalar values. Values are stored little-endian. */
+
+template<typename T> struct XMLArrayScalar {
+  using type = T;
+};
+
+template<> struct XMLArrayScalar<packed_float3> {
+  using type = float;
+};
+
+template<typename T> struct XMLArray {
+  /* Values owned by the array, unless they are referenced in the mapped file directly. */
+  vector<T> storage;
+  const T *values = nullptr;
+  size_t num = 0;
+
+  void use_storage()
+  {
+    values = storage.data();
+    num = storage.size();
+  }
+
+  const T *data() const
+  {
+    return values;
+  }
+
+  size_t size() const
+  {
+    return num;
+  }
+
+  const T *begin() const
+  {
+    return values;
+  }
+
+  const T *end() const
+  {
+    return values + num;
+  }
+
+  const T &operator[](const size_t i) const
+  {
+    assert(i < num);
+    return values[i];
+  }
+};
+
+template<typename S, typename T>
+static void xml_binary_array(XMLArray<T> &array, const uint8_t *data, const size_t count)
+{
+  using Scalar = typename XMLArrayScalar<T>::type;
+
+  /* Reference values of matching type in place. */
+  if constexpr (std::is_same_v<S, Scalar>) {
+    if (reinterpret_cast<uintptr_t>(data) % alignof(T) == 0) {
+      array.values = reinterpret_cast<const T *>(data);
+      array.num = count * sizeof(Scalar) / sizeof(T);
+      return;
+    }
+  }
+
+  array.storage.resize(count * sizeof(Scalar) / sizeof(T));
+  Scalar *values = reinterpret_cast<Scalar *>(array.storage.data());
+
+  for (size_t i = 0; i < count; i++) {
+    S value;
+    memcpy(&value, data + i * sizeof(S), sizeof(S));
+    values[i] = Scalar(value);
+  }
+
+  array.use_storage();
+}
+
+template<typename T>
+static bool xml_read_binary_array(XMLArray<T> &array,
+                                  const MappedFile &binary,
+                                  const xml_node node,
+                                  const char *name)
+{
+  const xml_attribute attr = node.attribute(name);
+
+  if (!attr) {
+    return false;
+  }
+
+  vector<string> tokens;
+  string_split(tokens, attr.value());
+
+  if (tokens.size() != 3) {
+    LOG_ERROR << "Invalid binary array \"" << attr.value() << "\" for \"" << name << "\"";
+    return false;
+  }
+
+  const string &type = tokens[0];
+  const size_t offset = strtoull(tokens[1].c_str(), nullptr, 10);
+  const size_t count = strtoull(tokens[2].c_str(), nullptr, 10);
+
+  size_t type_size;
+  if (type == "float32" || type == "int32") {
+    type_size = 4;
+  }
+  else if (type == "uint16") {
+    type_size = 2;
+  }
+  else if (type == "uint8") {
+    type_size = 1;
+  }
+  else {
+    LOG_ERROR << "Unknown binary array type \"" << type << "\" for \"" << name << "\"";
+    return false;
+  }
+
+  constexpr size_t num_components = sizeof(T) / sizeof(typename XMLArrayScalar<T>::type);
+
+  if (offset > binary.size() || count > (binary.size() - offset) / type_size ||
+      count % num_components != 0)
+  {
+    LOG_ERROR << "Binary array \"" << name << "\" out of range of data file";
+    return false;
+  }
+
+  const uint8_t *data = binary.data() + offset;
+
+  if (type == "float32") {
+    xml_binary_array<float>(array, data, count);
+  }
+  else if (type == "int32") {
+    xml_binary_array<int>(array, data, count);
+  }
+  else if (type == "uint16") {
+    xml_binary_array<uint16_t>(array, data, count);
+  }
+  else {
+    xml_binary_array<uint8_t>(array, data, count);
+  }
+
+  return true;
+}
+
+template<typename T>
+static bool xml_read_array(XMLArray<T> &array,
+                           const MappedFile &binary,
+                           const xml_node node,
+                           const char *name)
+{
+  if (binary.data()) {
+    return xml_read_binary_array(array, binary, node, name);
+  }
+
+  bool found;
+  if constexpr (std::is_same_v<T, packed_float3>) {
+    found = xml_read_float3_array(array.storage, node, name);
+  }
+  else if constexpr (std::is_same_v<T, float>) {
+    found = xml_read_float_array(array.storage, node, name);
+  }
+  else {
+    found = xml_read_int_array(array.storage, node, name);
+  }
+
+  array.use_storage();
+  return found;
+}
+
 /* Camera */
 
 static void xml_read_camera(XMLReadState &state, const xml_node node)
@@ -353,10 +571,25 @@ static void xml_read_shader_graph(XMLReadState &state, Shader *shader, const xml
   shader->tag_update(state.scene);
 }
 
+static void xml_add_shader_graph(XMLReadState &state, Shader *shader, const xml_node node)
+{
+  if (state.shader_graphs) {
+    std::ostringstream xml;
+    node.print(xml, "", PUGIXML_NAMESPACE::format_raw);
+    state.shader_graphs->add(shader, xml.str(), state.base);
+  }
+}
+
 static void xml_read_shader(XMLReadState &state, const xml_node node)
 {
-  Shader *shader = state.scene->create_node<Shader>();
+  Shader *shader = (state.unused_shaders) ?
+                       state.unused_shaders->take(ustring(node.attribute("name").value())) :
+                       nullptr;
+  if (!shader) {
+    shader = state.scene->create_node<Shader>();
+  }
   xml_read_shader_graph(state, shader, node);
+  xml_add_shader_graph(state, shader, node);
 }
 
 /* Background */
@@ -369,6 +602,7 @@ static void xml_read_background(XMLReadState &state, const xml_node node)
   /* Background Shader */
   Shader *shader = state.scene->default_background;
   xml_read_shader_graph(state, shader, node);
+  xml_add_shader_graph(state, shader, node);
 }
 
 /* Mesh */
@@ -395,8 +629,31 @@ static Mesh *xml_add_mesh(Scene *scene, const Transform &tfm, Object *object)
 
 static void xml_read_mesh(const XMLReadState &state, const xml_node node)
 {
+  /* open binary data file */
+  MappedFile binary;
+  string data_filepath;
+
+  if (xml_read_string(&data_filepath, node, "data")) {
+    data_filepath = path_join(state.base, data_filepath);
+
+    if (!binary.open(data_filepath)) {
+      LOG_ERROR << "Failed to open mesh data file \"" << data_filepath << "\"";
+      return;
+    }
+  }
+
   /* add mesh */
   Mesh *mesh = xml_add_mesh(state.scene, state.tfm, state.object);
+
+  /* name, for objects to reference the mesh */
+  const xml_attribute name_attr = node.attribute("name");
+  if (name_attr) {
+    mesh->name = ustring(name_attr.value());
+    if (state.meshes) {
+      state.meshes->emplace(mesh->name, mesh);
+    }
+  }
+
   array<Node *> used_shaders = mesh->get_used_shaders();
   used_shaders.push_back_slow(state.shader);
   mesh->set_used_shaders(used_shaders);
@@ -406,17 +663,17 @@ static void xml_read_mesh(const XMLReadState &state, const xml_node node)
   const bool smooth = state.smooth;
 
   /* read vertices and polygons */
-  vector<packed_float3> P;
-  vector<packed_float3> VN; /* Vertex normals */
-  vector<float> UV;
-  vector<float> T;  /* UV tangents */
-  vector<float> TS; /* UV tangent signs */
-  vector<int> verts;
-  vector<int> nverts;
-
-  xml_read_float3_array(P, node, "P");
-  xml_read_int_array(verts, node, "verts");
-  xml_read_int_array(nverts, node, "nverts");
+  XMLArray<packed_float3> P;
+  XMLArray<packed_float3> VN; /* Vertex normals */
+  XMLArray<float> UV;
+  XMLArray<float> T;  /* UV tangents */
+  XMLArray<float> TS; /* UV tangent signs */
+  XMLArray<int> verts;
+  XMLArray<int> nverts;
+
+  xml_read_array(P, binary, node, "P");
+  xml_read_array(verts, binary, node, "verts");
+  xml_read_array(nverts, binary, node, "nverts");
 
   if (xml_equal_string(node, "subdivision", "catmull-clark")) {
     mesh->set_subdivision_type(Mesh::SUBDIVISION_CATMULL_CLARK);
@@ -467,7 +724,7 @@ static void xml_read_mesh(const XMLReadState &state, const xml_node node)
     mesh->tag_smooth_modified();
 
     /* Vertex normals */
-    if (xml_read_float3_array(VN, node, Attribute::standard_name(ATTR_STD_VERTEX_NORMAL))) {
+    if (xml_read_array(VN, binary, node, Attribute::standard_name(ATTR_STD_VERTEX_NORMAL))) {
       Attribute *attr = mesh->attributes.add(ATTR_STD_VERTEX_NORMAL);
       packed_normal *fdata = attr->data_for_write<packed_normal>();
 
@@ -479,8 +736,8 @@ static void xml_read_mesh(const XMLReadState &state, const xml_node node)
     }
 
     /* UV map */
-    if (xml_read_float_array(UV, node, "UV") ||
-        xml_read_float_array(UV, node, Attribute::standard_name(ATTR_STD_UV)))
+    if (xml_read_array(UV, binary, node, "UV") ||
+        xml_read_array(UV, binary, node, Attribute::standard_name(ATTR_STD_UV)))
     {
       Attribute *attr = mesh->attributes.add(ATTR_STD_UV);
       float2 *fdata = attr->data_for_write<float2>();
@@ -508,7 +765,7 @@ static void xml_read_mesh(const XMLReadState &state, const xml_node node)
     }
 
     /* Tangents */
-    if (xml_read_float_array(T, node, Attribute::standard_name(ATTR_STD_UV_TANGENT))) {
+    if (xml_read_array(T, binary, node, Attribute::standard_name(ATTR_STD_UV_TANGENT))) {
       Attribute *attr = mesh->attributes.add(ATTR_STD_UV_TANGENT);
       packed_float3 *fdata = attr->data_for_write<packed_float3>();
 
@@ -534,7 +791,7 @@ static void xml_read_mesh(const XMLReadState &state, const xml_node node)
     }
 
     /* Tangent signs */
-    if (xml_read_float_array(TS, node, Attribute::standard_name(ATTR_STD_UV_TANGENT_SIGN))) {
+    if (xml_read_array(TS, binary, node, Attribute::standard_name(ATTR_STD_UV_TANGENT_SIGN))) {
       Attribute *attr = mesh->attributes.add(ATTR_STD_UV_TANGENT_SIGN);
       float *fdata = attr->data_for_write<float>();
 
@@ -605,8 +862,8 @@ static void xml_read_mesh(const XMLReadState &state, const xml_node node)
     mesh->tag_subd_ptex_offset_modified();
 
     /* UV map */
-    if (xml_read_float_array(UV, node, "UV") ||
-        xml_read_float_array(UV, node, Attribute::standard_name(ATTR_STD_UV)))
+    if (xml_read_array(UV, binary, node, "UV") ||
+        xml_read_array(UV, binary, node, Attribute::standard_name(ATTR_STD_UV)))
     {
       Attribute *attr = mesh->subd_attributes.add(ATTR_STD_UV);
       packed_float3 *fdata = attr->data_for_write<packed_float3>();
@@ -769,17 +1026,121 @@ static void xml_read_object(XMLReadState &state, const xml_node node)
 {
   Scene *scene = state.scene;
 
+  /* find existing mesh, so multiple objects can share the same mesh */
+  Geometry *geometry = nullptr;
+  string geometryname;
+
+  if (xml_read_string(&geometryname, node, "geometry")) {
+    if (state.meshes) {
+      auto it = state.meshes->find(ustring(geometryname));
+      if (it != state.meshes->end()) {
+        geometry = it->second;
+      }
+    }
+
+    if (!geometry) {
+      LOG_ERROR << "Unknown geometry \"" << geometryname << "\"";
+    }
+  }
+
   /* create mesh */
-  Mesh *mesh = scene->create_node<Mesh>();
+  if (!geometry) {
+    geometry = scene->create_node<Mesh>();
+  }
 
   /* create object */
   Object *object = scene->create_node<Object>();
-  object->set_geometry(mesh);
+  object->set_geometry(geometry);
   object->set_tfm(state.tfm);
 
   xml_read_node(state, object, node);
 }
 
+/* Load Profiling
+ *
+ * Time is accumulated per element type excluding nested elements, using a stack of the elements
+ * being read. Elements that are not containers of other elements include the time of reading
+ * their child nodes, such as shader nodes. */
+
+static bool xml_is_container(const xml_node node)
+{
+  return string_iequals(node.name(), "transform") || string_iequals(node.name(), "state") ||
+         string_iequals(node.name(), "object") || string_iequals(node.name(), "include");
+}
+
+static size_t xml_node_size(const xml_node node, const bool recursive)
+{
+  size_t size = 0;
+  for (const xml_attribute attr : node.attributes()) {
+    size += strlen(attr.value());
+  }
+  if (recursive) {
+    for (const xml_node child : node.children()) {
+      size += xml_node_size(child, true);
+    }
+  }
+  return size;
+}
+
+class XMLLoadProfiler {
+ public:
+  explicit XMLLoadProfiler(XMLLoadStats &stats) : stats(stats) {}
+
+  void begin(const xml_node node)
+  {
+    string name = node.name();
+    if (string_iequals(name, "mesh") && node.attribute("subdivision")) {
+      name += " (subdivision)";
+    }
+
+    Element &element = elements_[name];
+    element.size += xml_node_size(node, !xml_is_container(node));
+    element.count++;
+
+    stack_.push_back({name, time_dt(), 0.0});
+  }
+
+  void end()
+  {
+    const Scope scope = stack_.back();
+    stack_.pop_back();
+
+    const double time = time_dt() - scope.start_time;
+    elements_[scope.name].time += time - scope.nested_time;
+    if (!stack_.empty()) {
+      stack_.back().nested_time += time;
+    }
+  }
+
+  void finish()
+  {
+    for (const auto &[name, element] : elements_) {
+      stats.element_times.add_entry(NamedTimeEntry(name, element.time));
+      stats.element_sizes.add_entry(NamedSizeEntry(name, element.size));
+      stats.element_counts[name] = element.count;
+    }
+  }
+
+ protected:
+  struct Scope {
+    string name;
+    double start_time;
+    double nested_time;
+  };
+
+  struct Element {
+    double time = 0.0;
+    size_t size = 0;
+    size_t count = 0;
+  };
+
+  vector<Scope> stack_;
+  map<string, Element> elements_;
+
+ public:
+  XMLLoadStats &stats;
+};
+
 /* Scene */
 
 static void xml_read_include(XMLReadState &state, const string &src);
@@ -787,6 +1148,10 @@ static void xml_read_include(XMLReadState &state, const string &src);
 static void xml_read_scene(XMLReadState &state, const xml_node scene_node)
 {
   for (xml_node node = scene_node.first_child(); node; node = node.next_sibling()) {
+    if (state.profiler) {
+      state.profiler->begin(node);
+    }
+
     if (string_iequals(node.name(), "film")) {
       xml_read_node(state, state.scene->film, node);
     }
@@ -836,37 +1201,347 @@ static void xml_read_scene(XMLReadState &state, const xml_node scene_node)
     else {
       LOG_ERROR << "Unknown node \"" << node.name() << "\"";
     }
+
+    if (state.profiler) {
+      state.profiler->end();
+    }
   }
 }
 
-/* Include */
+/* Include
+ *
+ * Included files are read and parsed on loader threads, as soon as the include element is found
+ * in a parsed document. The scene itself is still built on the calling thread in document order,
+ * waiting for each included document when it is reached, so the result is deterministic. */
 
-static void xml_read_include(XMLReadState &state, const string &src)
-{
-  /* open XML document */
+struct XMLIncludeDocument {
+  /* Decompressed file contents, the document is parsed in place in this buffer. */
+  vector<uint8_t> buffer;
   xml_document doc;
   xml_parse_result parse_result;
+  bool read = false;
+  bool done = false;
+  /* Statistics for profiling. */
+  double load_time = 0.0;
+  size_t file_size = 0;
+  bool reported = false;
+  /* Number of times this file is still to be applied by include elements. */
+  int users = 0;
+};
+
+class XMLIncludeLoader {
+ public:
+  explicit XMLIncludeLoader(const int num_threads)
+  {
+    for (int i = 0; i < num_threads; i++) {
+      threads_.push_back(make_unique<thread>([this] { thread_run(); }));
+    }
+  }
+
+  ~XMLIncludeLoader()
+  {
+    {
+      const thread_scoped_lock lock(mutex_);
+      stop_ = true;
+    }
+    queue_cond_.notify_all();
+
+    for (unique_ptr<thread> &loader_thread : threads_) {
+      loader_thread->join();
+    }
+  }
+
+  /* Start loading a file, if it is not loaded or loading already. */
+  void request(const string &path)
+  {
+    {
+      const thread_scoped_lock lock(mutex_);
+      request_locked(path, 1);
+    }
+    queue_cond_.notify_all();
+  }
+
+  /* Wait for a requested file to be loaded. */
+  XMLIncludeDocument &acquire(const string &path)
+  {
+    thread_scoped_lock lock(mutex_);
+    XMLIncludeDocument &document = *documents_[path];
+    done_cond_.wait(lock, [&document] { return document.done; });
+    return document;
+  }
+
+  /* Free the document once all include elements referencing it have been applied. */
+  void release(const string &path)
+  {
+    const thread_scoped_lock lock(mutex_);
+    auto it = documents_.find(path);
+    if (--it->second->users == 0) {
+      documents_.erase(it);
+    }
+  }
+
+ protected:
+  void thread_run()
+  {
+    thread_scoped_lock lock(mutex_);
+
+    while (true) {
+      queue_cond_.wait(lock, [this] { return stop_ || !queue_.empty(); });
+      if (stop_) {
+        return;
+      }
+
+      const string path = queue_.front();
+      queue_.pop_front();
+      XMLIncludeDocument &document = *documents_[path];
+
+      lock.unlock();
+      load(path, document);
+      lock.lock();
+
+      /* Every include element of this file applies the nested includes once more. */
+      request_includes(document, path, document.users);
+      document.done = true;
+      done_cond_.notify_all();
+      queue_cond_.notify_all();
+    }
+  }
+
+  void load(const string &path, XMLIncludeDocument &document)
+  {
+    const scoped_timer timer(&document.load_time);
+    document.file_size = path_file_size(path);
+
+    /* Decompress gzip or zstd compressed files while reading. */
+    document.read = path_read_decompressed_binary(path, document.buffer);
+    if (!document.read) {
+      return;
+    }
+
+    document.parse_result = document.doc.load_buffer_inplace(document.buffer.data(),
+                                                             document.buffer.size());
+  }
+
+  /* Users are counted per include element that will be applied. A document may be applied
+   * multiple times, and each time applies all of its own include elements, so nested includes
+   * get users for every application of the including document. */
+  void request_locked(const string &path, const int users)
+  {
+    unique_ptr<XMLIncludeDocument> &document = documents_[path];
+    if (!document) {
+      document = make_unique<XMLIncludeDocument>();
+      queue_.push_back(path);
+    }
+
+    document->users += users;
+
+    /* Nested includes of documents still loading are requested once loading finished. */
+    if (document->done) {
+      request_includes(*document, path, users);
+    }
+  }
+
+  void request_includes(const XMLIncludeDocument &document, const string &path, const int users)
+  {
+    if (document.read && document.parse_result) {
+      request_includes(document.doc.child("cycles"), path_dirname(path), users);
+    }
+  }
+
+  /* Request include elements in the same nodes that xml_read_scene() reads them from. */
+  void request_includes(const xml_node scene_node, const string &base, const int users)
+  {
+    for (xml_node node = scene_node.first_child(); node; node = node.next_sibling()) {
+      if (string_iequals(node.name(), "include")) {
+        const xml_attribute src = node.attribute("src");
+        if (src) {
+          request_locked(path_join(base, src.value()), users);
+        }
+      }
+      else if (string_iequals(node.name(), "transform") || string_iequals(node.name(), "state") ||
+               string_iequals(node.name(), "object"))
+      {
+        request_includes(node, base, users);
+      }
+    }
+  }
+
+  thread_mutex mutex_;
+  thread_condition_variable queue_cond_;
+  thread_condition_variable done_cond_;
+  std::deque<string> queue_;
+  map<string, unique_ptr<XMLIncludeDocument>> documents_;
+  vector<unique_ptr<thread>> threads_;
+  bool stop_ = false;
+};
 
+static void xml_read_include(XMLReadState &state, const string &src)
+{
+  const double start_time = time_dt();
   const string path = path_join(state.base, src);
-  parse_result = doc.load_file(path.c_str());
+  XMLIncludeDocument &document = state.loader->acquire(path);
+
+  if (state.profiler && !document.reported) {
+    /* Files included multiple times are only loaded once. */
+    XMLLoadStats &stats = state.profiler->stats;
+    stats.include_load_times.add_entry(NamedTimeEntry(path, document.load_time));
+    stats.include_file_sizes.add_entry(NamedSizeEntry(path, document.file_size));
+    stats.include_sizes.add_entry(NamedSizeEntry(path, document.buffer.size()));
+    document.reported = true;
+  }
+
+  if (!document.read) {
+    LOG_ERROR << "\"" << src << "\" read error: failed to read or decompress file";
+    exit(EXIT_FAILURE);
+  }
 
-  if (parse_result) {
+  if (document.parse_result) {
     XMLReadState substate = state;
     substate.base = path_dirname(path);
 
-    const xml_node cycles = doc.child("cycles");
+    const xml_node cycles = document.doc.child("cycles");
     xml_read_scene(substate, cycles);
   }
   else {
-    LOG_ERROR << "\"" << src << "\" read error: " << parse_result.description();
+    LOG_ERROR << "\"" << src << "\" read error: " << document.parse_result.description();
     exit(EXIT_FAILURE);
   }
+
+  state.loader->release(path);
+
+  if (state.profiler) {
+    state.profiler->stats.include_times.add_entry(NamedTimeEntry(path, time_dt() - start_time));
+  }
+}
+
+/* Load Statistics */
+
+string XMLLoadStats::json_report()
+{
+  string counts;
+  for (const auto &[name, count] : element_counts) {
+    counts += string_printf("%s\"%s\": %zu", counts.empty() ? "" : ", ", name.c_str(), count);
+  }
+
+  return string_printf(
+      "{\"total_time\": %.9g, "
+      "\"elements\": {\"time\": %s, \"size\": %s, \"count\": {%s}}, "
+      "\"includes\": {\"time\": %s, \"load_time\": %s, \"file_size\": %s, \"size\": %s}}",
+      total_time,
+      element_times.json_report().c_str(),
+      element_sizes.json_report().c_str(),
+      counts.c_str(),
+      include_times.json_report().c_str(),
+      include_load_times.json_report().c_str(),
+      include_file_sizes.json_report().c_str(),
+      include_sizes.json_report().c_str());
+}
+
+/* Unused Shaders */
+
+void XMLUnusedShaders::add(Shader *shader, const ustring name)
+{
+  shaders_.emplace(name, shader);
+}
+
+Shader *XMLUnusedShaders::take(const ustring name)
+{
+  auto it = shaders_.find(name);
+  if (it == shaders_.end()) {
+    it = shaders_.begin();
+  }
+  if (it == shaders_.end()) {
+    return nullptr;
+  }
+
+  Shader *shader = it->second;
+  shaders_.erase(it);
+  return shader;
+}
+
+void XMLUnusedShaders::clear()
+{
+  shaders_.clear();
+}
+
+/* Shader Graph Edits */
+
+void XMLShaderGraphs::add(Shader *shader, const string &xml, const string &base)
+{
+  graphs_[shader->name.string()] = {shader, xml, base};
+}
+
+void XMLShaderGraphs::clear()
+{
+  graphs_.clear();
+}
+
+bool XMLShaderGraphs::set_node_value(Scene *scene,
+                                     const string &shader_name,
+                                     const string &node_name,
+                                     const string &input_name,
+                                     const string &value,
+                                     string &error)
+{
+  auto it = graphs_.find(shader_name);
+  if (it == graphs_.end()) {
+    error = "Unknown shader \"" + shader_name + "\"";
+    return false;
+  }
+
+  Graph &graph = it->second;
+  xml_document doc;
+  if (!doc.load_string(graph.xml.c_str())) {
+    error = "Failed to parse graph of shader \"" + shader_name + "\"";
+    return false;
+  }
+
+  const xml_node graph_node = doc.first_child();
+  xml_node node = graph_node.find_child_by_attribute("name", node_name.c_str());
+  if (!node || string_iequals(node.name(), "connect")) {
+    error = "Unknown shader node \"" + node_name + "\" in \"" + shader_name + "\"";
+    return false;
+  }
+
+  /* Inputs of OSL nodes depend on the compiled shader, leave those to the graph reader. */
+  if (!string_iequals(node.name(), "osl_shader")) {
+    const NodeType *node_type = NodeType::find(
+        ustring(string_iequals(node.name(), "background") ? "background_shader" : node.name()));
+    if (!node_type || !node_type->find_input(ustring(input_name))) {
+      error = "Unknown input \"" + input_name + "\" on shader node \"" + node_name + "\"";
+      return false;
+    }
+  }
+
+  xml_attribute attr = node.attribute(input_name.c_str());
+  if (!attr) {
+    attr = node.append_attribute(input_name.c_str());
+  }
+  attr.set_value(value.c_str());
+
+  /* Rebuild the graph, the old one may already be finalized and can not be modified. */
+  XMLReadState state;
+  state.scene = scene;
+  state.shader = graph.shader;
+  state.base = graph.base;
+  xml_read_shader_graph(state, graph.shader, graph_node);
+
+  std::ostringstream xml;
+  graph_node.print(xml, "", PUGIXML_NAMESPACE::format_raw);
+  graph.xml = xml.str();
+
+  return true;
 }
 
 /* File */
 
-void xml_read_file(Scene *scene, const char *filepath)
+void xml_read_file(Scene *scene,
+                   const char *filepath,
+                   XMLLoadStats *stats,
+                   XMLShaderGraphs *shader_graphs,
+                   XMLUnusedShaders *unused_shaders)
 {
+  const double start_time = time_dt();
   XMLReadState state;
 
   state.scene = scene;
@@ -875,10 +1550,30 @@ void xml_read_file(Scene *scene, const char *filepath)
   state.smooth = false;
   state.dicing_rate = 1.0f;
   state.base = path_dirname(filepath);
+  state.shader_graphs = shader_graphs;
+  state.unused_shaders = unused_shaders;
+
+  unordered_map<ustring, Mesh *> meshes;
+  state.meshes = &meshes;
+
+  XMLIncludeLoader loader(max(TaskScheduler::max_concurrency(), 1));
+  state.loader = &loader;
+  loader.request(path_join(state.base, path_filename(filepath)));
+
+  unique_ptr<XMLLoadProfiler> profiler;
+  if (stats) {
+    profiler = make_unique<XMLLoadProfiler>(*stats);
+    state.profiler = profiler.get();
+  }
 
   xml_read_include(state, path_filename(filepath));
 
   scene->params.bvh_type = BVH_TYPE_STATIC;
+
+  if (stats) {
+    profiler->finish();
+    stats->total_time = time_dt() - start_time;
+  }
 }
 
 CCL_NAMESPACE_END
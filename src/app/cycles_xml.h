@@ -4,13 +4,89 @@
 
 #pragma once
 
+#include "scene/stats.h"
+
+#include "util/map.h"
 #include "util/math_base.h"
+#include "util/param.h"
 
 CCL_NAMESPACE_BEGIN
 
 class Scene;
+class Shader;
+
+/* Time and size statistics of reading a scene file, for finding load time hotspots. */
+class XMLLoadStats {
+ public:
+  /* Time spent reading each element type, excluding nested elements and includes, and the
+   * size of the XML attribute text read for them. */
+  NamedTimeStats element_times;
+  NamedSizeStats element_sizes;
+  map<string, size_t> element_counts;
+
+  /* Time from reaching each include element until the included file was applied, including
+   * waiting for it to load and nested includes. */
+  NamedTimeStats include_times;
+  /* Time spent reading and parsing each included file on a loader thread, and its size before
+   * and after decompression. */
+  NamedTimeStats include_load_times;
+  NamedSizeStats include_file_sizes;
+  NamedSizeStats include_sizes;
+
+  /* Total time of reading the scene file. */
+  double total_time = 0.0;
+
+  string json_report();
+};
+
+/* XML of the shader graphs in a scene file, to rebuild a single shader graph with changed node
+ * values without reading the scene file again. */
+class XMLShaderGraphs {
+ public:
+  void add(Shader *shader, const string &xml, const string &base);
+  void clear();
+
+  /* Set an input of a named node in a shader graph to a value written as in the scene file, and
+   * rebuild the graph of the shader. Returns false with an error message when the shader, node or
+   * input does not exist. */
+  bool set_node_value(Scene *scene,
+                      const string &shader_name,
+                      const string &node_name,
+                      const string &input_name,
+                      const string &value,
+                      string &error);
+
+ protected:
+  struct Graph {
+    Shader *shader;
+    string xml;
+    string base;
+  };
+
+  map<string, Graph> graphs_;
+};
+
+/* Shaders of previously read scene files that are no longer used. Shaders can not be removed from
+ * a scene, so reading many scene files into the same scene reuses these for shaders of the next
+ * file, instead of adding more shaders to the scene. */
+class XMLUnusedShaders {
+ public:
+  /* Add a shader with an empty graph, with the name it had in the previous file. */
+  void add(Shader *shader, const ustring name);
+  /* Take a shader that had the same name, or any other shader. Returns nullptr if there is none
+   * left. */
+  Shader *take(const ustring name);
+  void clear();
+
+ protected:
+  unordered_multimap<ustring, Shader *> shaders_;
+};
 
-void xml_read_file(Scene *scene, const char *filepath);
+void xml_read_file(Scene *scene,
+                   const char *filepath,
+                   XMLLoadStats *stats = nullptr,
+                   XMLShaderGraphs *shader_graphs = nullptr,
+                   XMLUnusedShaders *unused_shaders = nullptr);
 
 /* macros for importing */
 #define RAD2DEGF(_rad) ((_rad) * (float)(180.0f / M_PI_F))
@@ -0,0 +1,195 @@
+/* SPDX-FileCopyrightText: 2011-2022 Blender Foundation
+ *
+ * SPDX-License-Identifier: Apache-2.0 */
+
+/* Microbenchmark of numeric array parsing in the XML scene reader.
+ *
+ * The array attributes of all meshes in the given files are repeated to a larger size and parsed
+ * with per token strings and atof() as the reader used to, and with the single pass parser the
+ * reader uses now. Throughput is reported in MB/s of attribute text.
+ *
+ * Usage: cycles_xml_parse_benchmark [--scale N] [--repeat N] examples/objects/*.xml */
+
+#include <cstdio>
+#include <cstdlib>
+
+#include "util/path.h"
+#include "util/string.h"
+#include "util/time.h"
+#include "util/vector.h"
+#include "util/xml.h"
+
+CCL_NAMESPACE_BEGIN
+
+struct ParseBenchmarkArray {
+  string name;
+  string text;
+  bool is_int;
+};
+
+static size_t parse_legacy(const ParseBenchmarkArray &array)
+{
+  vector<string> tokens;
+  string_split(tokens, array.text);
+
+  if (array.is_int) {
+    vector<int> values;
+    for (const string &token : tokens) {
+      values.push_back(atoi(token.c_str()));
+    }
+    return values.size();
+  }
+
+  vector<float> values;
+  for (const string &token : tokens) {
+    values.push_back((float)atof(token.c_str()));
+  }
+  return values.size();
+}
+
+static size_t parse_single_pass(const ParseBenchmarkArray &array)
+{
+  const char *str = array.text.c_str();
+
+  if (array.is_int) {
+    vector<int> values;
+    values.reserve(string_count_tokens(str));
+    int v;
+    while ((str = string_parse_int(str, v))) {
+      values.push_back(v);
+    }
+    return values.size();
+  }
+
+  vector<float> values;
+  values.reserve(string_count_tokens(str));
+  float v;
+  while ((str = string_parse_float(str, v))) {
+    values.push_back(v);
+  }
+  return values.size();
+}
+
+template<typename Func>
+static double parse_throughput(const vector<ParseBenchmarkArray> &arrays,
+                               const int repeat,
+                               const Func &parse,
+                               size_t &num_values)
+{
+  size_t num_bytes = 0;
+  double best_time = 0.0;
+
+  for (int i = 0; i < repeat; i++) {
+    num_bytes = 0;
+    num_values = 0;
+
+    const double start_time = time_dt();
+    for (const ParseBenchmarkArray &array : arrays) {
+      num_values += parse(array);
+      num_bytes += array.text.size();
+    }
+    const double time = time_dt() - start_time;
+
+    if (i == 0 || time < best_time) {
+      best_time = time;
+    }
+  }
+
+  return (double)num_bytes / (1024.0 * 1024.0) / best_time;
+}
+
+static bool read_arrays(const string &filepath,
+                        const int scale,
+                        vector<ParseBenchmarkArray> &arrays)
+{
+  static const char *int_attributes[] = {"nverts", "verts", "nverts_creases", "verts_creases"};
+
+  xml_document doc;
+  if (!doc.load_file(filepath.c_str())) {
+    fprintf(stderr, "Failed to read %s\n", filepath.c_str());
+    return false;
+  }
+
+  for (const xml_node node : doc.child("cycles").children("mesh")) {
+    for (const xml_attribute attr : node.attributes()) {
+      const string name = attr.name();
+      if (name == "name" || name == "data") {
+        continue;
+      }
+
+      ParseBenchmarkArray array;
+      array.name = path_filename(filepath) + " " + name;
+      array.is_int = false;
+      for (const char *int_name : int_attributes) {
+        array.is_int |= (name == int_name);
+      }
+
+      const string text = attr.value();
+      array.text.reserve((text.size() + 1) * scale);
+      for (int i = 0; i < scale; i++) {
+        array.text += text;
+        array.text += " ";
+      }
+
+      arrays.push_back(std::move(array));
+    }
+  }
+
+  return true;
+}
+
+static int cycles_xml_parse_benchmark(const int argc, const char **argv)
+{
+  int scale = 100;
+  int repeat = 5;
+  vector<string> filepaths;
+
+  for (int i = 1; i < argc; i++) {
+    const string arg = argv[i];
+    if (arg == "--scale" && i + 1 < argc) {
+      scale = atoi(argv[++i]);
+    }
+    else if (arg == "--repeat" && i + 1 < argc) {
+      repeat = atoi(argv[++i]);
+    }
+    else {
+      filepaths.push_back(arg);
+    }
+  }
+
+  if (filepaths.empty() || scale < 1 || repeat < 1) {
+    fprintf(stderr, "Usage: cycles_xml_parse_benchmark [--scale N] [--repeat N] file.xml [...]\n");
+    return 1;
+  }
+
+  vector<ParseBenchmarkArray> arrays;
+  for (const string &filepath : filepaths) {
+    if (!read_arrays(filepath, scale, arrays)) {
+      return 1;
+    }
+  }
+
+  size_t num_legacy_values;
+  size_t num_values;
+  const double legacy_throughput = parse_throughput(
+      arrays, repeat, parse_legacy, num_legacy_values);
+  const double throughput = parse_throughput(arrays, repeat, parse_single_pass, num_values);
+
+  if (num_values != num_legacy_values) {
+    fprintf(stderr, "Parsed %zu values, expected %zu\n", num_values, num_legacy_values);
+    return 1;
+  }
+
+  printf("Arrays: %zu, values: %zu\n", arrays.size(), num_values);
+  printf("Token strings and atof: %8.1f MB/s\n", legacy_throughput);
+  printf("Single pass:            %8.1f MB/s\n", throughput);
+
+  return 0;
+}
+
+CCL_NAMESPACE_END
+
+int main(const int argc, const char **argv)
+{
+  return ccl::cycles_xml_parse_benchmark(argc, argv);
+}
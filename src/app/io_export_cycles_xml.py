@@ -4,30 +4,736 @@
 
 # XML exporter for generating test files, not intended for end users
 
-import xml.etree.ElementTree as etree
-import xml.dom.minidom as dom
+import gzip
+import hashlib
+import json
+import math
+import os
+import re
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext
+from xml.sax.saxutils import quoteattr
+
+import numpy as np
 
 import bpy
 from bpy_extras.io_utils import ExportHelper
-from bpy.props import PointerProperty, StringProperty
+from bpy.props import BoolProperty, EnumProperty, PointerProperty, StringProperty
+
+# Zstandard is in the standard library from Python 3.14, older versions may have
+# the zstandard package available.
+try:
+    from compression import zstd
+except ImportError:
+    try:
+        import zstandard as zstd
+    except ImportError:
+        zstd = None
+
+# Number of array rows formatted at once when streaming attributes to file.
+ARRAY_CHUNK_ROWS = 1 << 16
+
+# Alignment of arrays in binary data files, so they can be used in place when memory mapped.
+BINARY_ALIGNMENT = 16
+
+# File in the include directory with content hashes of the previous export.
+# The version changes whenever include files are written differently.
+MANIFEST_FILENAME = "manifest.json"
+MANIFEST_VERSION = 2
+
+# Extensions of compressed scene and include files. The standalone loader
+# detects compression from the file contents, the extension is informative.
+COMPRESSION_EXTENSIONS = {
+    'NONE': "",
+    'GZIP': ".gz",
+    'ZSTD': ".zst",
+}
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 3
+
+# Name of the emission shader used by exported lights.
+LIGHT_SHADER = "light_emission"
+
+# Text format and number of columns of mesh arrays.
+ARRAY_FORMATS = {
+    'nverts': ("%d", 1),
+    'verts': ("%d", 1),
+    'P': ("%f", 3),
+    'UV': ("%f", 2),
+    'N': ("%f", 3),
+    'tangent': ("%f", 3),
+    'tangent_sign': ("%g", 1),
+}
+
+BINARY_TYPES = {
+    np.float32: "float32",
+    np.int32: "int32",
+    np.uint16: "uint16",
+    np.uint8: "uint8",
+}
+
+
+def compression_extension(fname):
+    for extension in COMPRESSION_EXTENSIONS.values():
+        if extension and fname.endswith(extension):
+            return extension
+    return ""
+
+
+def file_stem(fname):
+    # Path without compression and .xml extensions, for naming related files.
+    extension = compression_extension(fname)
+    if extension:
+        fname = fname[:-len(extension)]
+    return os.path.splitext(fname)[0]
+
+
+def open_text(fname):
+    # Open a text file for writing, compressed according to its extension.
+    extension = compression_extension(fname)
+    if extension == COMPRESSION_EXTENSIONS['GZIP']:
+        return gzip.open(fname, "wt", encoding="utf-8", compresslevel=GZIP_LEVEL)
+    if extension == COMPRESSION_EXTENSIONS['ZSTD']:
+        if hasattr(zstd, "ZstdCompressor"):
+            return zstd.open(fname, "wt", encoding="utf-8", cctx=zstd.ZstdCompressor(level=ZSTD_LEVEL))
+        return zstd.open(fname, "wt", encoding="utf-8", level=ZSTD_LEVEL)
+    return open(fname, "w", encoding="utf-8")
+
+
+def array_to_string(values, fmt, columns=1):
+    # Format all values with a single % operation instead of growing a string
+    # per element. Rows of multiple columns are separated by a double space,
+    # matching the hand written example files.
+    values = np.asarray(values).reshape(-1)
+    if values.size == 0:
+        return ""
+
+    row = " ".join((fmt,) * columns)
+    rows = values.size // columns
+    separator = "  " if columns > 1 else " "
+    return separator.join((row,) * rows) % tuple(values.tolist())
+
+
+def compact_indices(indices, count):
+    # Narrowest integer type for indices less than count, to shrink binary
+    # files and load buffers.
+    if count <= 1 << 8:
+        return indices.astype(np.uint8)
+    if count <= 1 << 16:
+        return indices.astype(np.uint16)
+    return indices.astype(np.int32, copy=False)
+
+
+def mesh_polygon_arrays(mesh):
+    nverts = np.empty(len(mesh.polygons), dtype=np.int32)
+    mesh.polygons.foreach_get("loop_total", nverts)
+
+    verts = np.empty(len(mesh.loops), dtype=np.int32)
+    mesh.loops.foreach_get("vertex_index", verts)
+
+    arrays = {
+        'nverts': compact_indices(nverts, nverts.max(initial=0) + 1),
+        'verts': compact_indices(verts, len(mesh.vertices)),
+    }
+
+    uv_layer = mesh.uv_layers.active
+    if uv_layer:
+        UV = np.empty(len(mesh.loops) * 2, dtype=np.float32)
+        uv_layer.data.foreach_get("uv", UV)
+        arrays['UV'] = UV
+
+    return arrays
+
+
+def mesh_triangle_arrays(mesh):
+    # Loop triangles with vertex normals and UV tangents, so they do not have to
+    # be computed when loading. Corner attributes are reordered from loops to
+    # triangle corners.
+    mesh.calc_loop_triangles()
+    num_triangles = len(mesh.loop_triangles)
+
+    verts = np.empty(num_triangles * 3, dtype=np.int32)
+    mesh.loop_triangles.foreach_get("vertices", verts)
+
+    loops = np.empty(num_triangles * 3, dtype=np.int32)
+    mesh.loop_triangles.foreach_get("loops", loops)
+
+    N = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+    mesh.vertex_normals.foreach_get("vector", N)
+
+    arrays = {
+        'nverts': np.full(num_triangles, 3, dtype=np.uint8),
+        'verts': compact_indices(verts, len(mesh.vertices)),
+        'N': N,
+    }
+
+    uv_layer = mesh.uv_layers.active
+    if uv_layer:
+        UV = np.empty(len(mesh.loops) * 2, dtype=np.float32)
+        uv_layer.data.foreach_get("uv", UV)
+        arrays['UV'] = UV.reshape(-1, 2)[loops].reshape(-1)
+
+        try:
+            mesh.calc_tangents(uvmap=uv_layer.name)
+        except RuntimeError:
+            # Tangents can not be computed for all meshes, leave them out.
+            return arrays
+
+        tangent = np.empty(len(mesh.loops) * 3, dtype=np.float32)
+        mesh.loops.foreach_get("tangent", tangent)
+        tangent_sign = np.empty(len(mesh.loops), dtype=np.float32)
+        mesh.loops.foreach_get("bitangent_sign", tangent_sign)
+        mesh.free_tangents()
+
+        arrays['tangent'] = tangent.reshape(-1, 3)[loops].reshape(-1)
+        arrays['tangent_sign'] = tangent_sign[loops]
+
+    return arrays
+
+
+def mesh_arrays(mesh, use_triangles=False):
+    # Pull all mesh data out with one foreach_get call per property, in the
+    # layout expected by xml_read_mesh.
+    P = np.empty(len(mesh.vertices) * 3, dtype=np.float32)
+    mesh.vertices.foreach_get("co", P)
 
+    arrays = {'P': P}
+    arrays.update(mesh_triangle_arrays(mesh) if use_triangles else mesh_polygon_arrays(mesh))
+    return arrays
+
+
+class ArrayAttribute:
+    # Array valued attribute, formatted lazily in fixed size chunks so that the
+    # full text of large arrays is never held in memory.
 
-def strip(root):
-    root.text = None
-    root.tail = None
+    def __init__(self, values, fmt, columns=1):
+        self.values = np.asarray(values).reshape(-1, columns)
+        self.fmt = fmt
+        self.columns = columns
+
+    def chunks(self, chunk_rows=ARRAY_CHUNK_ROWS):
+        separator = "  " if self.columns > 1 else " "
+        for i in range(0, len(self.values), chunk_rows):
+            if i:
+                yield separator
+            yield array_to_string(self.values[i:i + chunk_rows], self.fmt, self.columns)
 
-    for elem in root:
-        strip(elem)
 
+class XMLWriter:
+    # Incremental XML writer, elements are written to the file as soon as they
+    # are started so memory usage does not depend on the document size.
 
-def write(node, fname):
-    strip(node)
+    def __init__(self, file, chunk_rows=ARRAY_CHUNK_ROWS):
+        self.file = file
+        self.chunk_rows = chunk_rows
+        self.depth = 0
 
-    s = etree.tostring(node)
-    s = dom.parseString(s).toprettyxml()
+        self.file.write('<?xml version="1.0" ?>\n')
+
+    def _open(self, tag, attrib):
+        write = self.file.write
+        write("\t" * self.depth + "<" + tag)
+
+        for name, value in attrib.items():
+            if isinstance(value, ArrayAttribute):
+                write(" " + name + "=\"")
+                for chunk in value.chunks(self.chunk_rows):
+                    write(chunk)
+                write("\"")
+            else:
+                write(" " + name + "=" + quoteattr(str(value)))
+
+    def element(self, tag, attrib={}):
+        self._open(tag, attrib)
+        self.file.write("/>\n")
+
+    def start(self, tag, attrib={}):
+        self._open(tag, attrib)
+        self.file.write(">\n")
+        self.depth += 1
+
+    def end(self, tag):
+        self.depth -= 1
+        self.file.write("\t" * self.depth + "</" + tag + ">\n")
+
+
+class BinaryWriter:
+    # Writes arrays into a binary data file referenced by the "data" attribute,
+    # instead of formatting them as text. Array attributes then hold the type,
+    # byte offset and number of values in the file.
+
+    def __init__(self, file, name):
+        self.file = file
+        self.name = name
+        self.offset = 0
+
+    def array(self, values):
+        values = np.ascontiguousarray(values).reshape(-1)
+        values = values.astype(values.dtype.newbyteorder("<"), copy=False)
+
+        padding = -self.offset % BINARY_ALIGNMENT
+        if padding:
+            self.file.write(bytes(padding))
+            self.offset += padding
 
-    f = open(fname, "w")
-    f.write(s)
+        reference = "%s %d %d" % (BINARY_TYPES[values.dtype.type], self.offset, values.size)
+        self.file.write(values.data)
+        self.offset += values.nbytes
+
+        return reference
+
+
+def array_attributes(arrays, binary=None):
+    if binary:
+        attrib = {'data': binary.name}
+        for name, values in arrays.items():
+            attrib[name] = binary.array(values)
+        return attrib
+
+    return {name: ArrayAttribute(values, *ARRAY_FORMATS[name]) for name, values in arrays.items()}
+
+
+@contextmanager
+def replaced_file(fname):
+    # Write to a temporary file next to fname, which replaces fname once it is
+    # complete. An interrupted write then never leaves a truncated file behind.
+    tmp_fname = os.path.join(os.path.dirname(fname), ".tmp_" + os.path.basename(fname))
+    try:
+        yield tmp_fname
+        os.replace(tmp_fname, fname)
+    finally:
+        if os.path.exists(tmp_fname):
+            os.remove(tmp_fname)
+
+
+@contextmanager
+def binary_writer(fname, use_binary):
+    if not use_binary:
+        yield None
+        return
+
+    # Binary data is never compressed, so it can be memory mapped when loading.
+    binary_fname = file_stem(fname) + ".bin"
+    with replaced_file(binary_fname) as tmp_fname, open(tmp_fname, "wb") as binary_file:
+        yield BinaryWriter(binary_file, os.path.basename(binary_fname))
+
+
+def mesh_state_attributes(arrays):
+    # The loader only uses vertex normals of smooth meshes, and reads the
+    # interpolation from the enclosing state element.
+    return {'interpolation': "smooth"} if 'N' in arrays else {}
+
+
+def write_mesh_arrays(fname, arrays, name=None, use_binary=False):
+    # Write a file containing a single mesh. This only depends on the arrays and
+    # not on bpy, so it can run on worker threads.
+    with replaced_file(fname) as tmp_fname, open_text(tmp_fname) as f, \
+            binary_writer(fname, use_binary) as binary:
+        attrib = {'name': name} if name else {}
+        attrib.update(array_attributes(arrays, binary))
+        state_attrib = mesh_state_attributes(arrays)
+
+        writer = XMLWriter(f)
+        writer.start('cycles')
+        if state_attrib:
+            writer.start('state', state_attrib)
+        writer.element('mesh', attrib)
+        if state_attrib:
+            writer.end('state')
+        writer.end('cycles')
+
+
+def write_mesh(fname, mesh, use_binary=False, use_triangles=False):
+    write_mesh_arrays(fname, mesh_arrays(mesh, use_triangles), use_binary=use_binary)
+
+
+def worker_pool():
+    # Threads rather than processes: forking the multi-threaded Blender process
+    # can deadlock, and spawned processes would import this module and so bpy.
+    # Binary array conversion, compression and file writing release the GIL and
+    # run in parallel, formatting arrays as text does not.
+    return ThreadPoolExecutor()
+
+
+def matrix_attribute(matrix):
+    # Cycles reads the matrix transposed, so write it column by column.
+    return " ".join("%.9g" % matrix[row][column] for column in range(4) for row in range(4))
+
+
+def unique_name(name, used_names):
+    # Names are also used as include file names, so limit them to safe characters.
+    name = re.sub(r"[^\w.-]", "_", name)
+    unique = name
+    index = 1
+    while unique in used_names:
+        unique = "%s.%d" % (name, index)
+        index += 1
+
+    used_names.add(unique)
+    return unique
+
+
+def mesh_key(object_eval):
+    # Objects without modifiers share the mesh datablock, the evaluated mesh of
+    # objects with modifiers is unique to the object.
+    original = object_eval.original
+    return original if original.modifiers else original.data
+
+
+def arrays_hash(arrays, name, use_binary):
+    # Hash of everything that affects the contents of a mesh include file.
+    h = hashlib.blake2b(repr((MANIFEST_VERSION, name, use_binary)).encode())
+    for key, values in arrays.items():
+        values = np.ascontiguousarray(values)
+        h.update(("%s %s %d" % (key, values.dtype.str, values.size)).encode())
+        h.update(values.data)
+    return h.hexdigest()
+
+
+def read_manifest(include_dir):
+    try:
+        with open(os.path.join(include_dir, MANIFEST_FILENAME), encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+    if manifest.get("version") != MANIFEST_VERSION:
+        return {}
+    return manifest.get("meshes", {})
+
+
+def write_manifest(include_dir, hashes):
+    with replaced_file(os.path.join(include_dir, MANIFEST_FILENAME)) as tmp_fname, \
+            open(tmp_fname, "w", encoding="utf-8") as f:
+        json.dump({"version": MANIFEST_VERSION, "meshes": hashes}, f, indent=1, sort_keys=True)
+
+
+def remove_manifest(include_dir):
+    manifest_fname = os.path.join(include_dir, MANIFEST_FILENAME)
+    if os.path.isfile(manifest_fname):
+        os.remove(manifest_fname)
+
+
+def include_files(include_dir, include_name, use_binary):
+    files = [os.path.join(include_dir, include_name)]
+    if use_binary:
+        files.append(file_stem(files[0]) + ".bin")
+    return files
+
+
+class MeshIncludeWriter:
+    # Writes meshes to separate include files on a pool of workers. A manifest
+    # of content hashes is kept next to the include files, and files of meshes
+    # that did not change since the previous export are reused.
+
+    def __init__(self, fname, use_binary):
+        self.dirname = os.path.basename(file_stem(fname)) + "_meshes"
+        self.extension = ".xml" + compression_extension(fname)
+        self.dir = os.path.join(os.path.dirname(fname), self.dirname)
+        self.use_binary = use_binary
+
+        os.makedirs(self.dir, exist_ok=True)
+        self.previous_hashes = read_manifest(self.dir)
+        # Files are overwritten from here on, so the manifest is only valid again
+        # once it is written after a complete export. An interrupted export then
+        # never has its files reused.
+        remove_manifest(self.dir)
+        self.hashes = {}
+        self.num_reused = 0
+
+        # Bound the number of meshes waiting for a worker, to limit memory usage.
+        self.pending = deque()
+        self.max_pending = 2 * (os.cpu_count() or 1)
+
+    def __enter__(self):
+        self.pool = worker_pool()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        with self.pool:
+            if exc_type:
+                return
+
+            for future in self.pending:
+                future.result()
+
+        # Remove files of meshes that are no longer in the scene.
+        for include_name in self.previous_hashes.keys() - self.hashes.keys():
+            for include_fname in include_files(self.dir, include_name, True):
+                if os.path.isfile(include_fname):
+                    os.remove(include_fname)
+
+        write_manifest(self.dir, self.hashes)
+
+    @property
+    def num_written(self):
+        return len(self.hashes) - self.num_reused
+
+    def write(self, name, arrays, include_name=None, content_hash=None):
+        # Returns the path of the include file relative to the scene file.
+        include_name = (include_name or name) + self.extension
+        src = self.dirname + "/" + include_name
+
+        if include_name in self.hashes:
+            return src
+
+        if content_hash is None:
+            content_hash = arrays_hash(arrays, name, self.use_binary)
+        self.hashes[include_name] = content_hash
+
+        if self.previous_hashes.get(include_name) == content_hash and \
+           all(os.path.isfile(f) for f in include_files(self.dir, include_name, self.use_binary)):
+            self.num_reused += 1
+            return src
+
+        include_fname = os.path.join(self.dir, include_name)
+        self.pending.append(self.pool.submit(write_mesh_arrays, include_fname, arrays, name, self.use_binary))
+
+        while len(self.pending) > self.max_pending:
+            self.pending.popleft().result()
+
+        return src
+
+
+def read_mesh_arrays(object_eval, use_triangles):
+    arrays = mesh_arrays(object_eval.to_mesh(), use_triangles)
+    object_eval.to_mesh_clear()
+    return arrays
+
+
+def camera_matrix(matrix):
+    # Blender cameras look down -Z and Cycles cameras down +Z.
+    return [[row[0], row[1], -row[2], row[3]] for row in matrix]
+
+
+def camera_attributes(scene, camera):
+    render = scene.render
+    width = render.resolution_x * render.resolution_percentage // 100
+    height = render.resolution_y * render.resolution_percentage // 100
+
+    attrib = {
+        'width': width,
+        'height': height,
+        'nearclip': "%.9g" % camera.clip_start,
+        'farclip': "%.9g" % camera.clip_end,
+    }
+
+    if camera.type == 'ORTHO':
+        attrib['camera_type'] = "orthograph"
+    else:
+        # The Cycles field of view is along the shorter image dimension.
+        angle = camera.angle
+        if width > height:
+            angle = 2.0 * math.atan(math.tan(angle * 0.5) * height / width)
+        attrib['camera_type'] = "perspective"
+        attrib['fov'] = "%.9g" % angle
+
+    return attrib
+
+
+def light_attributes(light):
+    strength = [c * light.energy for c in light.color]
+    attrib = {'strength': "%.9g %.9g %.9g" % tuple(strength)}
+
+    if light.type == 'SUN':
+        attrib['light_type'] = "sun"
+        attrib['angle'] = "%.9g" % light.angle
+    elif light.type == 'SPOT':
+        attrib['light_type'] = "spot"
+        attrib['radius'] = "%.9g" % light.shadow_soft_size
+        attrib['angle'] = "%.9g" % light.spot_size
+        attrib['smooth'] = "%.9g" % light.spot_blend
+    elif light.type == 'AREA':
+        rectangular = light.shape in {'RECTANGLE', 'ELLIPSE'}
+        attrib['light_type'] = "area"
+        attrib['sizeu'] = "%.9g" % light.size
+        attrib['sizev'] = "%.9g" % (light.size_y if rectangular else light.size)
+        attrib['ellipse'] = "true" if light.shape in {'DISK', 'ELLIPSE'} else "false"
+    else:
+        attrib['light_type'] = "point"
+        attrib['radius'] = "%.9g" % light.shadow_soft_size
+
+    return attrib
+
+
+def scene_items(depsgraph, scene, mesh_include=None, use_triangles=False):
+    # Yields (name, item, arrays) for the scene camera, lights and mesh object
+    # instances, including ones generated by collection instancing or particles.
+    # Items are (kind, matrix, data) tuples that can be compared between frames.
+    #
+    # For objects the data is the mesh name and the include file returned by
+    # mesh_include, which is called once for every distinct mesh. Without
+    # mesh_include, the mesh arrays are returned along with the first object
+    # using the mesh instead.
+    names = set()
+    meshes = {}
+    used_mesh_names = set()
+
+    if scene.camera:
+        camera_eval = scene.camera.evaluated_get(depsgraph)
+        matrix = matrix_attribute(camera_matrix(camera_eval.matrix_world))
+        attrib = tuple(camera_attributes(scene, camera_eval.data).items())
+        yield unique_name(camera_eval.name, names), ('camera', matrix, attrib), None
+
+    for instance in depsgraph.object_instances:
+        object_eval = instance.object
+
+        if object_eval.type == 'LIGHT':
+            matrix = matrix_attribute(instance.matrix_world)
+            attrib = tuple(light_attributes(object_eval.data).items())
+            yield unique_name(object_eval.name, names), ('light', matrix, attrib), None
+        elif object_eval.type == 'MESH':
+            key = mesh_key(object_eval)
+            arrays = None
+
+            if key not in meshes:
+                mesh_name = unique_name(key.name, used_mesh_names)
+                if mesh_include:
+                    meshes[key] = (mesh_name, mesh_include(object_eval, mesh_name))
+                else:
+                    meshes[key] = (mesh_name, None)
+                    arrays = read_mesh_arrays(object_eval, use_triangles)
+
+            matrix = matrix_attribute(instance.matrix_world)
+            yield unique_name(object_eval.name, names), ('object', matrix, meshes[key]), arrays
+
+
+def write_light_shader(writer):
+    # Lights use the strength of the light, with a plain emission shader.
+    writer.start('shader', {'name': LIGHT_SHADER})
+    writer.element('emission', {'name': "emission", 'color': "1 1 1", 'strength': "1"})
+    writer.element('connect', {'from': "emission emission", 'to': "output surface"})
+    writer.end('shader')
+
+
+def write_item(writer, name, item, defined_meshes, arrays=None, binary=None):
+    # Every mesh is written once per file, inside the first object using it.
+    # Other objects reference it by name with the object geometry attribute.
+    kind, matrix, data = item
+    writer.start('transform', {'matrix': matrix})
+
+    if kind == 'camera':
+        writer.element('camera', dict(data))
+    elif kind == 'light':
+        writer.start('state', {'shader': LIGHT_SHADER})
+        writer.element('light', {'name': name, **dict(data)})
+        writer.end('state')
+    else:
+        mesh_name, src = data
+
+        if mesh_name in defined_meshes:
+            writer.element('object', {'name': name, 'geometry': mesh_name})
+        else:
+            defined_meshes.add(mesh_name)
+
+            writer.element('object', {'name': name})
+            if src:
+                writer.start('state', {'object': name})
+                writer.element('include', {'src': src})
+            else:
+                writer.start('state', {'object': name, **mesh_state_attributes(arrays)})
+                writer.element('mesh', {'name': mesh_name, **array_attributes(arrays, binary)})
+            writer.end('state')
+
+    writer.end('transform')
+
+
+def write_scene(fname, depsgraph, scene, use_binary=False, use_includes=False, use_triangles=False):
+    # With includes, each mesh is written to its own file by a pool of workers,
+    # and the scene file only contains transforms and include references. When
+    # fname has a compression extension, include files are compressed the same.
+    #
+    # Returns the number of reused and written include files.
+    defined_meshes = set()
+
+    with open_text(fname) as f, \
+            binary_writer(fname, use_binary and not use_includes) as binary, \
+            (MeshIncludeWriter(fname, use_binary) if use_includes else nullcontext()) as includes:
+        mesh_include = None
+        if includes:
+            def mesh_include(object_eval, mesh_name):
+                return includes.write(mesh_name, read_mesh_arrays(object_eval, use_triangles))
+
+        writer = XMLWriter(f)
+        writer.start('cycles')
+        write_light_shader(writer)
+
+        for name, item, arrays in scene_items(depsgraph, scene, mesh_include, use_triangles):
+            write_item(writer, name, item, defined_meshes, arrays, binary)
+
+        writer.end('cycles')
+
+    if includes:
+        return includes.num_reused, includes.num_written
+    return 0, 0
+
+
+def write_sequence(fname, context, frame_start, frame_end, use_binary=False, use_triangles=False):
+    # Write one scene file per frame. Items that are identical in all frames go
+    # into a static file included by every frame, so frame files only contain
+    # the camera, lights and object transforms that change. Meshes are hashed
+    # every frame and written to include files once for every distinct shape,
+    # whether it changes through deformation, modifiers, drivers or otherwise.
+    #
+    # Returns the number of reused and written include files, and the number of
+    # static and animated items.
+    scene = context.scene
+    frame_current = scene.frame_current
+    base = file_stem(fname)
+    extension = ".xml" + compression_extension(fname)
+
+    frames = {}
+    mesh_versions = {}
+
+    with MeshIncludeWriter(fname, use_binary) as includes:
+        def mesh_include(object_eval, mesh_name):
+            arrays = read_mesh_arrays(object_eval, use_triangles)
+            content_hash = arrays_hash(arrays, mesh_name, use_binary)
+
+            versions = mesh_versions.setdefault(mesh_name, {})
+            if content_hash not in versions:
+                versions[content_hash] = mesh_name if not versions else "%s_%d" % (mesh_name, len(versions))
+
+            return includes.write(mesh_name, arrays, versions[content_hash], content_hash)
+
+        try:
+            for frame in range(frame_start, frame_end + 1):
+                scene.frame_set(frame)
+                depsgraph = context.evaluated_depsgraph_get()
+                frames[frame] = {name: item for name, item, _ in scene_items(depsgraph, scene, mesh_include)}
+        finally:
+            scene.frame_set(frame_current)
+
+    first = frames[frame_start]
+    static = {name: item for name, item in first.items()
+              if all(items.get(name) == item for items in frames.values())}
+
+    static_fname = base + "_static" + extension
+    static_meshes = set()
+
+    with open_text(static_fname) as f:
+        writer = XMLWriter(f)
+        writer.start('cycles')
+        write_light_shader(writer)
+        for name, item in static.items():
+            write_item(writer, name, item, static_meshes)
+        writer.end('cycles')
+
+    for frame, items in frames.items():
+        defined_meshes = set(static_meshes)
+
+        with open_text("%s_%04d%s" % (base, frame, extension)) as f:
+            writer = XMLWriter(f)
+            writer.start('cycles')
+            writer.element('include', {'src': os.path.basename(static_fname)})
+            for name, item in items.items():
+                if name not in static:
+                    write_item(writer, name, item, defined_meshes)
+            writer.end('cycles')
+
+    num_animated = len({name for items in frames.values() for name in items} - static.keys())
+    return includes.num_reused, includes.num_written, len(static), num_animated
 
 
 class CyclesXMLSettings(bpy.types.PropertyGroup):
@@ -83,70 +789,78 @@ class ExportCyclesXML(bpy.types.Operator, ExportHelper):
 
     filename_ext = ".xml"
 
-    @classmethod
-    def poll(cls, context):
-        return (context.active_object is not None)
+    use_binary: BoolProperty(
+        name="Binary Arrays",
+        description="Write mesh arrays to a binary .bin file next to the .xml file, for faster loading",
+        default=False,
+    )
+    use_includes: BoolProperty(
+        name="Separate Mesh Files",
+        description="Write each mesh to its own include file, writing files in parallel threads",
+        default=False,
+    )
+    use_triangles: BoolProperty(
+        name="Triangles",
+        description="Write loop triangles with vertex normals and UV tangents, instead of polygons",
+        default=False,
+    )
+    compression: EnumProperty(
+        name="Compression",
+        description="Compress the scene and mesh files, binary array files are not compressed",
+        items=(
+            ('NONE', "None", "Uncompressed XML files"),
+            ('GZIP', "Gzip", "Gzip compressed XML files"),
+            ('ZSTD', "Zstandard", "Zstandard compressed XML files, faster to write and read than gzip"),
+        ),
+        default='NONE',
+    )
+    use_sequence: BoolProperty(
+        name="Frame Sequence",
+        description="Write one file per frame of the scene frame range, with items that do not change "
+                    "written once to a shared static file",
+        default=False,
+    )
 
     def execute(self, context):
-        filepath = bpy.path.ensure_ext(self.filepath, ".xml")
+        if self.compression == 'ZSTD' and zstd is None:
+            self.report({'ERROR'}, "Zstandard compression is not available in this Python installation")
+            return {'CANCELLED'}
 
-        # get mesh
+        filepath = bpy.path.ensure_ext(self.filepath, ".xml") + COMPRESSION_EXTENSIONS[self.compression]
         scene = context.scene
-        object = context.active_object
-
-        if not object:
-            raise Exception("No active object")
-
-        mesh = object.to_mesh(scene, True, 'PREVIEW')
-
-        if not mesh:
-            raise Exception("No mesh data in active object")
 
-        # generate mesh node
-        nverts = ""
-        verts = ""
-        uvs = ""
-        P = ""
+        if self.use_sequence:
+            num_reused, num_written, num_static, num_animated = write_sequence(
+                filepath, context, scene.frame_start, scene.frame_end, self.use_binary, self.use_triangles)
+            self.report({'INFO'}, "Cycles XML export: %d static and %d animated items, %d mesh files reused, "
+                        "%d written" % (num_static, num_animated, num_reused, num_written))
+            return {'FINISHED'}
 
-        for v in mesh.vertices:
-            P += "%f %f %f  " % (v.co[0], v.co[1], v.co[2])
+        depsgraph = context.evaluated_depsgraph_get()
+        num_reused, num_written = write_scene(
+            filepath, depsgraph, scene, self.use_binary, self.use_includes, self.use_triangles)
 
-        verts_and_uvs = zip(mesh.tessfaces, mesh.tessface_uv_textures.active.data)
+        if self.use_includes:
+            self.report({'INFO'}, "Cycles XML export: %d mesh files reused, %d written" % (num_reused, num_written))
 
-        for f, uvf in verts_and_uvs:
-            vcount = len(f.vertices)
-            nverts += str(vcount) + " "
-
-            for v in f.vertices:
-                verts += str(v) + " "
-
-            uvs += str(uvf.uv1[0]) + " " + str(uvf.uv1[1]) + " "
-            uvs += str(uvf.uv2[0]) + " " + str(uvf.uv2[1]) + " "
-            uvs += str(uvf.uv3[0]) + " " + str(uvf.uv3[1]) + " "
-            if vcount == 4:
-                uvs += " " + str(uvf.uv4[0]) + " " + str(uvf.uv4[1]) + " "
-
-        node = etree.Element(
-            'mesh',
-            attrib={
-                'nverts': nverts.strip(),
-                'verts': verts.strip(),
-                'P': P,
-                'UV': uvs.strip(),
-            })
+        return {'FINISHED'}
 
-        # write to file
-        write(node, filepath)
 
-        return {'FINISHED'}
+classes = (
+    CyclesXMLSettings,
+    PHYSICS_PT_fluid_export,
+    ExportCyclesXML,
+)
 
 
 def register():
-    bpy.utils.register_module(__name__)
+    for cls in classes:
+        bpy.utils.register_class(cls)
 
 
 def unregister():
-    bpy.utils.unregister_module(__name__)
+    for cls in reversed(classes):
+        bpy.utils.unregister_class(cls)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,330 @@
+#!/usr/bin/env python3
+# SPDX-FileCopyrightText: 2011-2022 Blender Foundation
+#
+# SPDX-License-Identifier: Apache-2.0
+
+# Benchmark of the XML exporter mesh serialization, runnable without Blender.
+# A minimal stand-in for the bpy module is installed before importing the
+# exporter, and synthetic grid meshes are fed through it.
+#
+# Every mesh size and output format runs in its own process, so that the peak
+# resident memory is measured per case. Wall time, peak RSS and output bytes per
+# face are printed, and can be written as JSON and compared against a previous
+# run to detect regressions.
+#
+# When the path to a cycles standalone executable is given, the time to load
+# the exported files is measured as well.
+#
+# Usage: python3 io_export_cycles_xml_benchmark.py [--faces 10000 100000 ...]
+#            [--formats ascii binary ...] [--json results.json]
+#            [--baseline baseline.json] [--threshold 0.2] [--cycles ./cycles]
+
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import types
+
+import numpy as np
+
+
+# Stand-in bpy module
+
+class _Collection:
+    def __init__(self, length, **properties):
+        self.length = length
+        self.properties = properties
+
+    def __len__(self):
+        return self.length
+
+    def foreach_get(self, name, values):
+        values[:] = self.properties[name].reshape(-1)
+
+
+class _UVLayers:
+    def __init__(self, active):
+        self.active = active
+
+
+class StandInMesh:
+    # Quad mesh with the subset of the bpy.types.Mesh API used by the exporter.
+
+    def __init__(self, co, loop_total, vertex_index, uv):
+        self.vertices = _Collection(len(co), co=co)
+        self.vertex_normals = _Collection(len(co), vector=np.tile(np.float32((0, 0, 1)), (len(co), 1)))
+        self.polygons = _Collection(len(loop_total), loop_total=loop_total)
+        self.loops = _Collection(len(vertex_index), vertex_index=vertex_index)
+        self.loop_triangles = _Collection(0)
+        self.uv_layers = _UVLayers(types.SimpleNamespace(name="UVMap", data=_Collection(len(uv), uv=uv)))
+
+    def calc_loop_triangles(self):
+        # Split every quad into two triangles.
+        loops = np.arange(len(self.loops), dtype=np.int32).reshape(-1, 4)
+        loops = loops[:, (0, 1, 2, 0, 2, 3)].reshape(-1, 3)
+        vertices = self.loops.properties["vertex_index"][loops]
+        self.loop_triangles = _Collection(len(loops), loops=loops, vertices=vertices)
+
+    def calc_tangents(self, uvmap=""):
+        self.loops.properties["tangent"] = np.tile(np.float32((1, 0, 0)), (len(self.loops), 1))
+        self.loops.properties["bitangent_sign"] = np.ones(len(self.loops), dtype=np.float32)
+
+    def free_tangents(self):
+        del self.loops.properties["tangent"]
+        del self.loops.properties["bitangent_sign"]
+
+
+def install_bpy_stand_in():
+    def _base(name):
+        return type(name, (), {})
+
+    bpy = types.ModuleType("bpy")
+    bpy.types = types.SimpleNamespace(
+        PropertyGroup=_base("PropertyGroup"),
+        Panel=_base("Panel"),
+        Operator=_base("Operator"),
+        Scene=_base("Scene"),
+    )
+    bpy.props = types.ModuleType("bpy.props")
+    bpy.props.BoolProperty = bpy.props.EnumProperty = bpy.props.PointerProperty = bpy.props.StringProperty = \
+        lambda **kwargs: None
+    bpy.utils = types.SimpleNamespace(register_class=lambda cls: None,
+                                      unregister_class=lambda cls: None)
+
+    bpy_extras = types.ModuleType("bpy_extras")
+    bpy_extras.io_utils = types.ModuleType("bpy_extras.io_utils")
+    bpy_extras.io_utils.ExportHelper = _base("ExportHelper")
+
+    sys.modules["bpy"] = bpy
+    sys.modules["bpy.props"] = bpy.props
+    sys.modules["bpy_extras"] = bpy_extras
+    sys.modules["bpy_extras.io_utils"] = bpy_extras.io_utils
+
+
+def grid_mesh(faces):
+    # Square grid of quads with per loop UVs.
+    size = max(1, int(round(faces ** 0.5)))
+    x, y = np.meshgrid(np.arange(size + 1, dtype=np.float32), np.arange(size + 1, dtype=np.float32))
+    co = np.stack((x.ravel(), y.ravel(), np.zeros(x.size, dtype=np.float32)), axis=1)
+
+    row = np.arange(size, dtype=np.int32)
+    first = (row[None, :] + row[:, None] * (size + 1)).ravel()
+    vertex_index = np.stack((first, first + 1, first + size + 2, first + size + 1), axis=1)
+    loop_total = np.full(size * size, 4, dtype=np.int32)
+    uv = co[vertex_index.ravel(), :2] / size
+
+    return StandInMesh(co, loop_total, vertex_index.ravel(), uv)
+
+
+def legacy_mesh_attributes(mesh):
+    # Per vertex and per face string concatenation, as the exporter did before
+    # switching to bulk array access.
+    co = mesh.vertices.properties["co"].tolist()
+    faces = mesh.loops.properties["vertex_index"].reshape(-1, 4).tolist()
+    uvs = mesh.uv_layers.active.data.properties["uv"].reshape(-1, 4, 2).tolist()
+
+    nverts = ""
+    verts = ""
+    UV = ""
+    P = ""
+
+    for v in co:
+        P += "%f %f %f  " % (v[0], v[1], v[2])
+
+    for f, uvf in zip(faces, uvs):
+        vcount = len(f)
+        nverts += str(vcount) + " "
+
+        for v in f:
+            verts += str(v) + " "
+
+        for uv in uvf:
+            UV += str(uv[0]) + " " + str(uv[1]) + " "
+
+    return nverts, verts, P, UV
+
+
+# Exporter options and file extension for each output format.
+FORMATS = {
+    'ascii': ({}, ".xml"),
+    'binary': ({'use_binary': True}, ".xml"),
+    'triangles': ({'use_triangles': True}, ".xml"),
+    'binary_triangles': ({'use_binary': True, 'use_triangles': True}, ".xml"),
+    'gzip': ({}, ".xml.gz"),
+    'zstd': ({}, ".xml.zst"),
+}
+
+DEFAULT_FACES = (10000, 100000, 1000000, 10000000)
+DEFAULT_FORMATS = ('ascii', 'binary')
+
+# The old exporter builds Python lists of all values, which needs several
+# gigabytes of memory for larger meshes.
+LEGACY_MAX_FACES = 1000000
+
+# Metrics compared against the baseline, lower is better for all of them.
+COMPARED_METRICS = ('export_time', 'peak_rss', 'bytes_per_face')
+
+
+def peak_rss():
+    # Peak resident set size of this process in bytes.
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if sys.platform == "darwin" else rss * 1024
+
+
+def time_cycles_load(cycles, filepath, repeat=3):
+    # Render a single sample of a tiny image, so that the time is dominated by
+    # loading the scene.
+    command = [cycles, "--background", "--quiet", "--samples", "1", "--width", "8", "--height", "8", filepath]
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(command, check=True, stdout=subprocess.DEVNULL)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def output_size(filepath):
+    # Size of the exported file and its binary data file, if any.
+    size = os.path.getsize(filepath)
+    binary_filepath = filepath.split(".xml")[0] + ".bin"
+    if os.path.isfile(binary_filepath):
+        size += os.path.getsize(binary_filepath)
+    return size
+
+
+def run_case(faces, format_name, cycles=None, legacy=False):
+    # Runs in a separate process, see run_case_process().
+    install_bpy_stand_in()
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import io_export_cycles_xml as exporter
+
+    options, extension = FORMATS[format_name]
+
+    mesh = grid_mesh(faces)
+    result = {
+        'faces': len(mesh.polygons),
+        'vertices': len(mesh.vertices),
+        'format': format_name,
+        'mesh_rss': peak_rss(),
+    }
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        filepath = os.path.join(tmpdir, "mesh" + extension)
+        start = time.perf_counter()
+        exporter.write_mesh(filepath, mesh, **options)
+        result['export_time'] = time.perf_counter() - start
+        result['peak_rss'] = peak_rss()
+
+        result['bytes'] = output_size(filepath)
+        result['bytes_per_face'] = result['bytes'] / result['faces']
+
+        if cycles:
+            result['load_time'] = time_cycles_load(cycles, filepath)
+
+    if legacy:
+        start = time.perf_counter()
+        legacy_mesh_attributes(mesh)
+        result['legacy_export_time'] = time.perf_counter() - start
+
+    return result
+
+
+def run_case_process(faces, format_name, cycles=None, legacy=False):
+    command = [sys.executable, os.path.abspath(__file__), "--case", str(faces), format_name]
+    if cycles:
+        command += ["--cycles", cycles]
+    if legacy:
+        command.append("--legacy")
+
+    output = subprocess.run(command, check=True, stdout=subprocess.PIPE, text=True).stdout
+    return json.loads(output)
+
+
+def compare_results(results, baseline, threshold):
+    # Returns descriptions of metrics that got worse by more than the threshold
+    # relative to the baseline.
+    baseline_cases = {(case['faces'], case['format']): case for case in baseline['cases']}
+    regressions = []
+
+    for case in results['cases']:
+        baseline_case = baseline_cases.get((case['faces'], case['format']))
+        if not baseline_case:
+            continue
+
+        for metric in COMPARED_METRICS:
+            value = case[metric]
+            reference = baseline_case.get(metric)
+            if reference and value > reference * (1.0 + threshold):
+                regressions.append("%s %d faces: %s %.4g -> %.4g (%+.1f%%)" % (
+                    case['format'], case['faces'], metric, reference, value, (value / reference - 1.0) * 100.0))
+
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cycles XML exporter benchmark")
+    parser.add_argument("--faces", type=int, nargs="+", default=DEFAULT_FACES,
+                        help="Number of faces in the synthetic meshes")
+    parser.add_argument("--formats", nargs="+", choices=FORMATS.keys(), default=DEFAULT_FORMATS,
+                        help="Output formats to benchmark")
+    parser.add_argument("--legacy", action="store_true",
+                        help="Also time the per element string concatenation of the old exporter, "
+                        "for meshes up to %d faces" % LEGACY_MAX_FACES)
+    parser.add_argument("--cycles", help="Path to cycles standalone executable, to measure load times")
+    parser.add_argument("--json", help="Write results to this JSON file")
+    parser.add_argument("--baseline", help="JSON file of a previous run to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="Relative increase of a metric over the baseline that counts as a regression")
+    parser.add_argument("--case", nargs=2, metavar=("FACES", "FORMAT"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.case:
+        result = run_case(int(args.case[0]), args.case[1], args.cycles, args.legacy)
+        json.dump(result, sys.stdout)
+        return 0
+
+    results = {
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'cases': [],
+    }
+
+    print("%-18s %10s %10s %14s %12s %10s" % ("Format", "Faces", "Time (s)", "Peak RSS (MB)", "Bytes/face", "Load (s)"))
+    for faces in args.faces:
+        for format_name in args.formats:
+            # The old exporter has a single output format, time it once per mesh size.
+            legacy = args.legacy and format_name == args.formats[0] and faces <= LEGACY_MAX_FACES
+            case = run_case_process(faces, format_name, args.cycles, legacy)
+            results['cases'].append(case)
+
+            print("%-18s %10d %10.3f %14.1f %12.1f %10s" % (
+                case['format'], case['faces'], case['export_time'], case['peak_rss'] / (1024 * 1024),
+                case['bytes_per_face'], "%.3f" % case['load_time'] if 'load_time' in case else "-"))
+            if 'legacy_export_time' in case:
+                print("%-18s %10d %10.3f" % ("legacy", case['faces'], case['legacy_export_time']))
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+        regressions = compare_results(results, baseline, args.threshold)
+        for regression in regressions:
+            print("Regression: " + regression)
+        if regressions:
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
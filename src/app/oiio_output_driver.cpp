@@ -6,21 +6,54 @@
 
 #include "util/colorspace.h"
 #include "util/image.h"
-#include "util/unique_ptr.h"
 
 #include <OpenImageIO/imagebuf.h>
 #include <OpenImageIO/imagebufalgo.h>
 
 CCL_NAMESPACE_BEGIN
 
+/* Tile size of tiled image files, and number of rows written at once otherwise. */
+static const int OUTPUT_TILE_SIZE = 64;
+
 OIIOOutputDriver::OIIOOutputDriver(const string_view filepath,
                                    const string_view pass,
-                                   LogFunction log)
+                                   LogFunction log,
+                                   const bool use_writer_thread)
     : filepath_(filepath), pass_(pass), log_(log)
 {
+  if (use_writer_thread) {
+    thread_ = make_unique<thread>([this] { thread_run(); });
+  }
+}
+
+OIIOOutputDriver::~OIIOOutputDriver()
+{
+  if (!thread_) {
+    return;
+  }
+
+  wait();
+
+  {
+    const thread_scoped_lock lock(mutex_);
+    stop_ = true;
+  }
+  queue_cond_.notify_all();
+
+  thread_->join();
+}
+
+void OIIOOutputDriver::set_filepath(const string_view filepath)
+{
+  const thread_scoped_lock lock(mutex_);
+  filepath_ = filepath;
 }
 
-OIIOOutputDriver::~OIIOOutputDriver() = default;
+void OIIOOutputDriver::wait()
+{
+  thread_scoped_lock lock(mutex_);
+  done_cond_.wait(lock, [this] { return !queued_image_ && !writing_; });
+}
 
 void OIIOOutputDriver::write_render_tile(const Tile &tile)
 {
@@ -29,48 +62,125 @@ void OIIOOutputDriver::write_render_tile(const Tile &tile)
     return;
   }
 
-  log_(string_printf("Writing image %s", filepath_.c_str()));
+  /* Wait for the previous image to be written, so no more than one image is held in memory in
+   * addition to the render buffers. */
+  wait();
 
-  unique_ptr<ImageOutput> image_output(ImageOutput::create(filepath_));
-  if (image_output == nullptr) {
-    log_("Failed to create image file");
+  /* Read the pass from the render buffers, which are reused once this returns. */
+  unique_ptr<Image> image = make_unique<Image>();
+  image->width = tile.size.x;
+  image->height = tile.size.y;
+  image->pixels.resize(size_t(image->width) * image->height * 4);
+
+  if (!tile.get_pass_pixels(pass_, 4, image->pixels.data())) {
+    log_("Failed to read render pass pixels");
     return;
   }
 
-  const int width = tile.size.x;
-  const int height = tile.size.y;
+  {
+    const thread_scoped_lock lock(mutex_);
+    image->filepath = filepath_;
+  }
 
-  const ImageSpec spec(width, height, 4, TypeDesc::FLOAT);
-  if (!image_output->open(filepath_, spec)) {
-    log_("Failed to create image file");
+  if (!thread_) {
+    write_image(*image);
     return;
   }
 
-  vector<float> pixels(width * height * 4);
-  if (!tile.get_pass_pixels(pass_, 4, pixels.data())) {
-    log_("Failed to read render pass pixels");
+  /* Hand the pixels over to the writer thread. */
+  {
+    const thread_scoped_lock lock(mutex_);
+    queued_image_ = std::move(image);
+  }
+  queue_cond_.notify_all();
+}
+
+void OIIOOutputDriver::thread_run()
+{
+  while (true) {
+    unique_ptr<Image> image;
+
+    {
+      thread_scoped_lock lock(mutex_);
+      queue_cond_.wait(lock, [this] { return queued_image_ || stop_; });
+
+      if (!queued_image_) {
+        break;
+      }
+
+      image = std::move(queued_image_);
+      writing_ = true;
+    }
+    done_cond_.notify_all();
+
+    write_image(*image);
+    image.reset();
+
+    {
+      const thread_scoped_lock lock(mutex_);
+      writing_ = false;
+    }
+    done_cond_.notify_all();
+  }
+}
+
+void OIIOOutputDriver::write_image(Image &image)
+{
+  log_(string_printf("Writing image %s", image.filepath.c_str()));
+
+  unique_ptr<ImageOutput> image_output(ImageOutput::create(image.filepath));
+  if (image_output == nullptr) {
+    log_("Failed to create image file");
     return;
   }
 
-  /* Manipulate offset and stride to convert from bottom-up to top-down convention. */
-  OIIO::ImageBuf image_buffer(spec,
-                              pixels.data() + (height - 1) * width * 4,
-                              AutoStride,
-                              -width * 4 * sizeof(float),
-                              AutoStride);
+  const int width = image.width;
+  const int height = image.height;
+
+  /* Write tiles where the file format supports it, so the image is encoded and written in parts
+   * rather than converted as a whole. */
+  ImageSpec spec(width, height, 4, TypeDesc::FLOAT);
+  const bool tiled = image_output->supports("tiles");
+  if (tiled) {
+    spec.tile_width = OUTPUT_TILE_SIZE;
+    spec.tile_height = OUTPUT_TILE_SIZE;
+  }
+
+  if (!image_output->open(image.filepath, spec)) {
+    log_("Failed to create image file");
+    return;
+  }
 
   /* Apply gamma correction for (some) non-linear file formats.
    * TODO: use OpenColorIO view transform if available. */
   if (ColorSpaceManager::detect_known_colorspace(
           u_colorspace_auto, "", image_output->format_name(), true) == u_colorspace_srgb)
   {
+    const ImageSpec pixels_spec(width, height, 4, TypeDesc::FLOAT);
+    OIIO::ImageBuf image_buffer(pixels_spec, image.pixels.data());
     const float g = 1.0f / 2.2f;
     OIIO::ImageBufAlgo::pow(image_buffer, image_buffer, {g, g, g, 1.0f});
   }
 
-  /* Write to disk and close */
-  image_buffer.set_write_format(TypeDesc::FLOAT);
-  image_buffer.write(image_output.get());
+  /* Manipulate offset and stride to convert from bottom-up to top-down convention. */
+  const OIIO::stride_t xstride = 4 * sizeof(float);
+  const OIIO::stride_t ystride = -OIIO::stride_t(width) * 4 * sizeof(float);
+
+  for (int y = 0; y < height; y += OUTPUT_TILE_SIZE) {
+    const int y_end = min(y + OUTPUT_TILE_SIZE, height);
+    const float *pixels = image.pixels.data() + size_t(height - 1 - y) * width * 4;
+
+    const bool written =
+        (tiled) ?
+            image_output->write_tiles(
+                0, width, y, y_end, 0, 1, TypeDesc::FLOAT, pixels, xstride, ystride) :
+            image_output->write_scanlines(y, y_end, 0, TypeDesc::FLOAT, pixels, xstride, ystride);
+    if (!written) {
+      log_("Failed to write image file");
+      break;
+    }
+  }
+
   image_output->close();
 }
 
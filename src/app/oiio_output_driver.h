@@ -7,22 +7,62 @@
 #include "session/output_driver.h"
 
 #include "util/string.h"
+#include "util/thread.h"
+#include "util/unique_ptr.h"
+#include "util/vector.h"
 
 CCL_NAMESPACE_BEGIN
 
+/* Writes a single pass of the render result to an image file.
+ *
+ * The session only hands over the full frame once it finished rendering, also with tiled
+ * rendering, so the image is not written while it renders. The file is then written in parts, as
+ * tiles for formats that support it, directly from the pixels read from the render buffers.
+ *
+ * With a writer thread, encoding and writing the file happens in the background so the next
+ * render can start while the image is written. This holds the pixels of one full image in memory
+ * while the next render runs, so it is only used when rendering multiple images. */
 class OIIOOutputDriver : public OutputDriver {
  public:
   using LogFunction = std::function<void(const string &)>;
 
-  OIIOOutputDriver(const string_view filepath, const string_view pass, LogFunction log);
+  OIIOOutputDriver(const string_view filepath,
+                   const string_view pass,
+                   LogFunction log,
+                   const bool use_writer_thread = false);
   ~OIIOOutputDriver() override;
 
   void write_render_tile(const Tile &tile) override;
 
+  /* File path for images of following renders, images already rendered keep their path. */
+  void set_filepath(const string_view filepath);
+
+  /* Wait until all rendered images are written. */
+  void wait();
+
  protected:
+  struct Image {
+    string filepath;
+    int width;
+    int height;
+    /* RGBA pixels, rows from bottom to top. */
+    vector<float> pixels;
+  };
+
+  void thread_run();
+  void write_image(Image &image);
+
   string filepath_;
   string pass_;
   LogFunction log_;
+
+  thread_mutex mutex_;
+  thread_condition_variable queue_cond_;
+  thread_condition_variable done_cond_;
+  unique_ptr<Image> queued_image_;
+  bool writing_ = false;
+  bool stop_ = false;
+  unique_ptr<thread> thread_;
 };
 
 CCL_NAMESPACE_END
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+# SPDX-FileCopyrightText: 2011-2025 Blender Foundation
+#
+# SPDX-License-Identifier: Apache-2.0
+
+# Regenerate the precomputed tables in src/scene/shader.tables.
+#
+# Every term of cycles_precompute and the thin-film table of thin_film_table.py is
+# generated by a separate process, running in parallel. Outputs are cached under a
+# hash of the term, its parameters and the source code it is computed from: the
+# sources cycles_precompute.cpp includes, or thin_film_table.py. So only terms
+# whose code changed are computed again, and keeping the cache directory between
+# runs makes verifying the tables cheap, for example on CI.
+#
+# The regenerated tables are compared against shader.tables, with the exit code
+# indicating whether any differ, and can be written into it with --update.
+#
+# The cache key is computed from the source tree, so the cycles_precompute
+# executable must be built from the same source.
+#
+# Usage: python3 precompute_tables.py --cycles-precompute ./bin/cycles_precompute
+#            [--terms ggx_E ggx_glass_E thin_film_cmf] [--jobs 4] [--error 1e-4]
+#            [--cache-dir DIR] [--tolerance 1e-6] [--update]
+
+import argparse
+import concurrent.futures
+import hashlib
+import os
+import re
+import subprocess
+import sys
+
+SOURCE_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", ".."))
+PRECOMPUTE_SOURCE = os.path.join(SOURCE_DIR, "app", "cycles_precompute.cpp")
+THIN_FILM_SOURCE = os.path.join(SOURCE_DIR, "doc", "precompute", "thin_film_table.py")
+TABLES_FILE = os.path.join(SOURCE_DIR, "scene", "shader.tables")
+
+# Term generated by thin_film_table.py instead of cycles_precompute.
+THIN_FILM_TERM = "thin_film_cmf"
+
+TABLE_RE = re.compile(r"static const \w+ table_(\w+)((?:\[\d+\])+) = \{(.*?)\};", re.DOTALL)
+INCLUDE_RE = re.compile(r'^\s*#\s*include\s+"([^"]+)"', re.MULTILINE)
+NUMBER_RE = re.compile(r"[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?")
+
+
+def precompute_term_names():
+    # Terms as registered in cycles_precompute.cpp.
+    with open(PRECOMPUTE_SOURCE) as f:
+        return re.findall(r'precompute_terms\["(\w+)"\]', f.read())
+
+
+def source_files(filepath, files=None):
+    # The file and all files of the source tree it includes, recursively.
+    if files is None:
+        files = set()
+    if filepath in files:
+        return files
+    files.add(filepath)
+
+    with open(filepath, errors="replace") as f:
+        text = f.read()
+
+    for include in INCLUDE_RE.findall(text):
+        for base in (os.path.dirname(filepath), SOURCE_DIR):
+            include_path = os.path.normpath(os.path.join(base, include))
+            if os.path.isfile(include_path):
+                source_files(include_path, files)
+                break
+
+    return files
+
+
+def source_hash(filepath):
+    hash = hashlib.sha256()
+    for path in sorted(source_files(filepath)):
+        hash.update(os.path.relpath(path, SOURCE_DIR).encode())
+        with open(path, "rb") as f:
+            hash.update(f.read())
+    return hash.hexdigest()
+
+
+def term_command(term, args, checkpoint):
+    if term == THIN_FILM_TERM:
+        return [sys.executable, THIN_FILM_SOURCE]
+
+    command = [args.cycles_precompute, "--checkpoint", checkpoint]
+    if args.error:
+        command += ["--error", str(args.error)]
+    return command + [term]
+
+
+def term_cache_key(term, args, hashes):
+    if term == THIN_FILM_TERM:
+        parameters = ""
+        source = hashes[THIN_FILM_SOURCE]
+    else:
+        parameters = "error=%g" % args.error if args.error else ""
+        source = hashes[PRECOMPUTE_SOURCE]
+    return hashlib.sha256(f"{term}\n{parameters}\n{source}".encode()).hexdigest()[:16]
+
+
+def generate_term(term, args, key):
+    # Run the generator of a term unless its output is cached, and return the output.
+    cache_filepath = os.path.join(args.cache_dir, f"{term}-{key}.txt")
+    if os.path.exists(cache_filepath):
+        with open(cache_filepath) as f:
+            return f.read(), True
+
+    # Partially computed tables are resumed from the checkpoint after an interruption.
+    checkpoint = os.path.join(args.cache_dir, f"{term}-{key}.checkpoint")
+    result = subprocess.run(term_command(term, args, checkpoint), stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.decode(errors="replace").strip() or "exit code %d" % result.returncode)
+
+    output = result.stdout.decode()
+    if not TABLE_RE.search(output):
+        raise RuntimeError("no table in output")
+
+    # Write to a temporary file first, so an interrupted run does not leave a partial output.
+    tmp_filepath = cache_filepath + ".tmp"
+    with open(tmp_filepath, "w") as f:
+        f.write(output)
+    os.replace(tmp_filepath, cache_filepath)
+    if os.path.exists(checkpoint):
+        os.remove(checkpoint)
+
+    return output, False
+
+
+def compare_table(name, generated, current, tolerance):
+    # Return a description of the differences between two tables, or None if they match.
+    if current is None:
+        return "missing in " + os.path.relpath(TABLES_FILE, SOURCE_DIR)
+    if generated.group(2) != current.group(2):
+        return f"size differs, {generated.group(2)} instead of {current.group(2)}"
+
+    generated_values = [float(value) for value in NUMBER_RE.findall(generated.group(3))]
+    current_values = [float(value) for value in NUMBER_RE.findall(current.group(3))]
+    if len(generated_values) != len(current_values):
+        return f"{len(generated_values)} values instead of {len(current_values)}"
+
+    differences = [abs(a - b) for a, b in zip(generated_values, current_values)]
+    num_different = sum(1 for difference in differences if difference > tolerance)
+    if num_different == 0:
+        return None
+    return f"{num_different} of {len(differences)} values differ, max difference {max(differences):.3e}"
+
+
+def main():
+    all_terms = precompute_term_names() + [THIN_FILM_TERM]
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+
+    parser = argparse.ArgumentParser(description="Regenerate Cycles precomputed tables")
+    parser.add_argument("--cycles-precompute", help="Path to cycles_precompute executable")
+    parser.add_argument("--terms", nargs="+", choices=all_terms, default=all_terms, help="Terms to generate")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="Number of terms to run in parallel")
+    parser.add_argument("--error", type=float, default=0.0,
+                        help="Target standard error for adaptive sampling, 0 to take all samples")
+    parser.add_argument("--cache-dir", default=os.path.join(cache_home, "cycles", "precompute"),
+                        help="Directory to cache generated tables in")
+    parser.add_argument("--tolerance", type=float, default=0.0,
+                        help="Maximum difference of values to consider tables equal")
+    parser.add_argument("--update", action="store_true", help="Write regenerated tables into shader.tables")
+    args = parser.parse_args()
+
+    if any(term != THIN_FILM_TERM for term in args.terms) and not args.cycles_precompute:
+        parser.error("--cycles-precompute is required for terms other than " + THIN_FILM_TERM)
+
+    os.makedirs(args.cache_dir, exist_ok=True)
+    hashes = {filepath: source_hash(filepath) for filepath in (PRECOMPUTE_SOURCE, THIN_FILM_SOURCE)}
+
+    outputs = {}
+    failed = False
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max(args.jobs, 1)) as executor:
+        futures = {executor.submit(generate_term, term, args, term_cache_key(term, args, hashes)): term
+                   for term in args.terms}
+        for future in concurrent.futures.as_completed(futures):
+            term = futures[future]
+            try:
+                outputs[term], cached = future.result()
+                print(f"{term}: {'cached' if cached else 'generated'}", file=sys.stderr)
+            except Exception as ex:
+                print(f"{term}: failed, {ex}", file=sys.stderr)
+                failed = True
+
+    with open(TABLES_FILE) as f:
+        tables_text = f.read()
+    current_tables = {match.group(1): match for match in TABLE_RE.finditer(tables_text)}
+
+    num_different = 0
+    num_updated = 0
+    for term in args.terms:
+        if term not in outputs:
+            continue
+
+        generated = TABLE_RE.search(outputs[term])
+        difference = compare_table(term, generated, current_tables.get(term), args.tolerance)
+        print(f"{term}: {difference or 'up to date'}")
+        if difference is None:
+            continue
+
+        num_different += 1
+        if args.update and term in current_tables:
+            tables_text = tables_text.replace(current_tables[term].group(0), generated.group(0))
+            num_updated += 1
+
+    if num_updated:
+        with open(TABLES_FILE, "w") as f:
+            f.write(tables_text)
+        print(f"Updated {num_updated} tables in {TABLES_FILE}")
+
+    if failed or num_different > num_updated:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
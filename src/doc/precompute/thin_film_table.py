@@ -2,7 +2,29 @@
 #
 # SPDX-License-Identifier: Apache-2.0
 
+# Generates the table_thin_film_cmf table in src/scene/shader.tables: the Fourier
+# transform of the CIE color matching functions resampled by frequency, which the
+# kernel looks up by optical path difference (OPD) for thin-film iridescence.
+#
+# The table size and the frequency range it covers can be changed, and --report
+# measures the error of tables of different sizes against the sensitivities
+# integrated from the full CIE spline, for the OPDs of a range of film thicknesses.
+# The kernel lookup in src/kernel/closure/bsdf_util.h and THIN_FILM_TABLE_SIZE in
+# src/kernel/types.h must match the size and range of the table.
+#
+# Values can be stored as half float or fixed point instead of float, to see how
+# much smaller tables affect precision. The error against the float table is
+# printed to stderr.
+#
+# Usage: python3 thin_film_table.py [--size 512] [--range 60] [--format half] > table.h
+#        python3 thin_film_table.py --report [--size 128 256 512] [--range 30 60] [--format float half]
+#            [--thickness 0 1500] [--film-ior 1.33]
+
+import argparse
+import sys
+
 import numpy as np
+from scipy.integrate import simpson
 from scipy.interpolate import CubicSpline
 
 # CIE 1931 2-degree XYZ CMFs
@@ -486,29 +508,159 @@ CIEXYZ = np.array([
 cie_X = CubicSpline(CIEXYZ[:, 0], CIEXYZ[:, 1], extrapolate=False)
 cie_Y = CubicSpline(CIEXYZ[:, 0], CIEXYZ[:, 2], extrapolate=False)
 cie_Z = CubicSpline(CIEXYZ[:, 0], CIEXYZ[:, 3], extrapolate=False)
+cie_XYZ = (cie_X, cie_Y, cie_Z)
+
+# Number of path order differences summed by the kernel, see iridescence_airy_summation_channel.
+ORDERS = 3
 
 
 def resample(func, freq): return np.nan_to_num(func(1000 / freq) / (freq * freq))
 
 
-endfreq = 60  # Cover 0 to 60 um
-N = 1022  # 1022 real datapoints result in 512 Fourier-space complex values.
+def compute_table(size, endfreq):
+    # The table covers phases of 0 to endfreq radians per um^-1 of frequency, which is
+    # an OPD of 0 to endfreq / (2 * pi) um. A real FFT of N datapoints results in
+    # N / 2 + 1 Fourier-space complex values, so 1022 datapoints give 512 values.
+    N = 2 * (size - 1)
+
+    # Resample in frequency space
+    freqs = np.linspace(0, np.pi * (N - 1) / endfreq, N)
+    freqs = np.clip(freqs, a_min=1e-40, a_max=None)
+
+    # Take FFT, rows of X, Y, Z
+    return np.array([np.fft.rfft(resample(cie, freqs)) for cie in cie_XYZ])
+
+
+# Storage formats of the table: C type and size of a value in bytes.
+FORMATS = {
+    'float': ("float", 4),
+    'half': ("uint16_t", 2),
+    'fixed16': ("int16_t", 2),
+    'fixed8': ("int8_t", 1),
+}
+
+
+def quantize_table(table, format):
+    # Values as stored in the given format, the table loaded back from them, and the
+    # scale of each column for fixed point. Fixed point values are signed and
+    # normalized by the largest magnitude in their column.
+    values = np.concatenate([table.real, table.imag])
+    scale = None
+    if format == 'float':
+        loaded = values.astype(np.float32).astype(np.float64)
+    elif format == 'half':
+        values = values.astype(np.float16)
+        loaded = values.astype(np.float64)
+        values = values.view(np.uint16)
+    else:
+        max_int = (1 << (FORMATS[format][1] * 8 - 1)) - 1
+        scale = np.abs(values).max(axis=1).astype(np.float32)
+        scale[scale == 0] = 1
+        values = np.round(values / scale[:, None] * max_int).astype(np.int64)
+        loaded = values * (scale[:, None].astype(np.float64) / max_int)
+    return values, loaded[:3] + 1j * loaded[3:], scale
+
+
+def print_table(table, format):
+    values, loaded, scale = quantize_table(table, format)
+    print(f"static const {FORMATS[format][0]} table_thin_film_cmf[{table.shape[1]}][6] = {{")
+    for i in range(table.shape[1]):
+        if format == 'float':
+            vals = [f"{val: .7e}f" for val in values[:, i]]
+        elif format == 'half':
+            vals = [f" 0x{val:04x}" for val in values[:, i]]
+        else:
+            vals = [f"{val: d}" for val in values[:, i]]
+        print("  {" + ", ".join(vals) + " },")
+    print("};")
+    if scale is not None:
+        print(f"static const float table_thin_film_cmf_scale[6] = {{ "
+              + ", ".join(f"{val:.7e}f" for val in scale) + " };")
+
+    # Report size and error relative to the float table, separate from the table itself.
+    # Errors are relative to the DC term of each channel, which the table is normalized by.
+    reference = table.astype(np.complex64).astype(np.complex128)
+    dc = reference[:, :1].real
+    error = np.abs(np.concatenate([(loaded.real - reference.real) / dc, (loaded.imag - reference.imag) / dc]))
+    size = table.size * 2
+    print(f"table_thin_film_cmf: {FORMATS[format][0]}, {size * FORMATS[format][1]} bytes "
+          f"(float {size * 4} bytes), max error {error.max():.3e}, RMS error {np.sqrt(np.mean(error * error)):.3e}",
+          file=sys.stderr)
+
+
+def lookup_table(table, endfreq, opd):
+    # Normalized sensitivities as looked up by the kernel, with linear interpolation
+    # and the OPD clamped to the range of the table.
+    table = table / table[:, :1].real
+    x = np.clip(2 * np.pi * opd / (1000 * endfreq), 0, 1) * (table.shape[1] - 1)
+    index = np.minimum(x.astype(int), table.shape[1] - 1)
+    nindex = np.minimum(index + 1, table.shape[1] - 1)
+    t = x - index
+    return (1 - t) * table[:, index] + t * table[:, nindex]
+
+
+def reference_sensitivity(opd, chunk=256):
+    # Normalized sensitivities integrated directly from the CIE spline over wavelength.
+    wavelengths = np.linspace(CIEXYZ[0, 0], CIEXYZ[-1, 0], 4721)
+    cmf = np.array([np.nan_to_num(cie(wavelengths)) for cie in cie_XYZ])
+    result = np.empty((3, len(opd)), dtype=complex)
+    for start in range(0, len(opd), chunk):
+        phase = np.exp(-2j * np.pi * np.outer(opd[start:start + chunk], 1 / wavelengths))
+        result[:, start:start + chunk] = simpson(cmf[:, None, :] * phase[None], x=wavelengths, axis=-1)
+    return result / simpson(cmf, x=wavelengths, axis=-1)[:, None]
+
+
+def print_report(sizes, endfreqs, formats, thickness, film_ior, samples):
+    # OPD at normal incidence, where it is largest, for every order summed by the kernel.
+    thicknesses = np.linspace(thickness[0], thickness[1], samples)
+    opd = np.concatenate([2 * film_ior * thicknesses * m for m in range(1, ORDERS + 1)])
+    reference = reference_sensitivity(opd)
+
+    print(f"Film thickness {thickness[0]:g} to {thickness[1]:g} nm, film IOR {film_ior:g}, "
+          f"OPD up to {opd.max():g} nm for {ORDERS} orders")
+    print("Error of normalized XYZ sensitivities against the CIE spline, maximum over channels")
+    print()
+    print(f"{'Size':>6} {'Range':>6} {'Max OPD':>9} {'Format':>8} {'Bytes':>8} "
+          f"{'Max error':>11} {'RMS error':>11} {'At thickness':>13}")
+    for endfreq in endfreqs:
+        for size in sizes:
+            table = compute_table(size, endfreq)
+            for format in formats:
+                _, loaded, _ = quantize_table(table, format)
+                error = np.abs(lookup_table(loaded, endfreq, opd) - reference)
+                worst = np.unravel_index(np.argmax(error), error.shape)[1]
+                rms = np.sqrt(np.mean(error * error, axis=1)).max()
+                max_opd = 1000 * endfreq / (2 * np.pi)
+                print(f"{size:>6} {endfreq:>6g} {max_opd:>9.0f} {format:>8} {size * 6 * FORMATS[format][1]:>8} "
+                      f"{error.max():>11.3e} {rms:>11.3e} {thicknesses[worst % samples]:>10.1f} nm")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate the thin-film color matching function table")
+    parser.add_argument("--size", type=int, nargs="+", default=[512],
+                        help="Number of complex values in the table, multiple sizes for the report")
+    parser.add_argument("--range", type=float, nargs="+", default=[60],
+                        help="Range of the table in radians per um^-1, covering an OPD of 0 to "
+                        "RANGE / (2 * pi) um, multiple ranges for the report")
+    parser.add_argument("--format", nargs="+", choices=FORMATS.keys(), default=['float'],
+                        help="Storage format of the table values, multiple formats for the report")
+    parser.add_argument("--report", action="store_true", help="Print an error and size report instead of the table")
+    parser.add_argument("--thickness", type=float, nargs=2, default=[0, 1500], metavar=("MIN", "MAX"),
+                        help="Film thickness range in nm for the report")
+    parser.add_argument("--film-ior", type=float, default=1.33, help="Film IOR for the report")
+    parser.add_argument("--samples", type=int, default=1000, help="Number of film thicknesses in the report")
+    args = parser.parse_args()
+
+    if min(args.size) < 2:
+        parser.error("table size must be at least 2")
 
-# Resample in frequency space
-freqs = np.linspace(0, np.pi * (N - 1) / endfreq, N)
-freqs = np.clip(freqs, a_min=1e-40, a_max=None)
-Sx = resample(cie_X, freqs)
-Sy = resample(cie_Y, freqs)
-Sz = resample(cie_Z, freqs)
+    if args.report:
+        print_report(args.size, args.range, args.format, args.thickness, args.film_ior, args.samples)
+    elif len(args.size) == 1 and len(args.range) == 1 and len(args.format) == 1:
+        print_table(compute_table(args.size[0], args.range[0]), args.format[0])
+    else:
+        parser.error("multiple sizes, ranges or formats are only supported with --report")
 
-# Take FFT
-Sp_x = np.fft.rfft(Sx)
-Sp_y = np.fft.rfft(Sy)
-Sp_z = np.fft.rfft(Sz)
 
-# Print table
-print(f"static const float table_thin_film_cmf[{Sp_x.shape[0]}][6] = {{")
-for i in range(Sp_x.shape[0]):
-    vals = [Sp_x[i].real, Sp_y[i].real, Sp_z[i].real, Sp_x[i].imag, Sp_y[i].imag, Sp_z[i].imag]
-    print("  {" + ", ".join(f"{val: .7e}f" for val in vals) + " },")
-print("};")
+if __name__ == "__main__":
+    main()
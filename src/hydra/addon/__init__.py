@@ -4,7 +4,7 @@
 
 # Basic add-on for the Cycles Hydra render delegate. This is very incomplete
 # and intended for developer testing only. The most obvious limitation is that
-# materials and render settings are not supported.
+# materials are not supported.
 
 import bpy
 
@@ -19,6 +19,110 @@ bl_info = {
 }
 
 
+def _threads(scene):
+    return scene.render.threads if scene.render.threads_mode == 'FIXED' else 0
+
+
+def _enum(name, values):
+    return lambda scene: values[getattr(scene.cycles, name)]
+
+
+_denoisers = {
+    'AUTO': "openimagedenoise",
+    'OPENIMAGEDENOISE': "openimagedenoise",
+    'OPTIX': "optix",
+}
+_denoiser_prefilters = {
+    'NONE': "none",
+    'FAST': "fast",
+    'ACCURATE': "accurate",
+}
+_denoiser_qualities = {
+    'HIGH': "high",
+    'BALANCED': "balanced",
+    'FAST': "fast",
+}
+
+# Render settings of the delegate, with the scene.cycles property or function of
+# the scene they are set from for final and viewport renders. None when the
+# setting is not used for that type of render.
+RENDER_SETTINGS = (
+    ('cycles:threads', _threads, _threads),
+    ('cycles:samples', 'samples', 'preview_samples'),
+    ('cycles:time_limit', 'time_limit', None),
+    # Start viewport renders at a lower resolution and refine progressively, like
+    # the regular Cycles viewport.
+    ('cycles:use_resolution_divider', lambda scene: False, lambda scene: True),
+    # Store viewport color in half floats, which is enough for display.
+    ('cycles:use_half_float_color', lambda scene: False, lambda scene: True),
+
+    ('cycles:integrator:use_adaptive_sampling', 'use_adaptive_sampling', 'use_preview_adaptive_sampling'),
+    ('cycles:integrator:adaptive_threshold', 'adaptive_threshold', 'preview_adaptive_threshold'),
+    ('cycles:integrator:adaptive_min_samples', 'adaptive_min_samples', 'preview_adaptive_min_samples'),
+
+    ('cycles:integrator:use_denoise', 'use_denoising', 'use_preview_denoising'),
+    ('cycles:integrator:denoiser_type',
+     _enum('denoiser', _denoisers), _enum('preview_denoiser', _denoisers)),
+    ('cycles:integrator:denoiser_prefilter',
+     _enum('denoising_prefilter', _denoiser_prefilters), _enum('preview_denoising_prefilter', _denoiser_prefilters)),
+    ('cycles:integrator:denoiser_quality',
+     _enum('denoising_quality', _denoiser_qualities), _enum('preview_denoising_quality', _denoiser_qualities)),
+    ('cycles:integrator:denoise_start_sample', None, 'preview_denoising_start_sample'),
+
+    ('cycles:integrator:use_light_tree', 'use_light_tree', 'use_light_tree'),
+    ('cycles:integrator:light_sampling_threshold', 'light_sampling_threshold', 'light_sampling_threshold'),
+
+    ('cycles:integrator:min_bounce', 'min_light_bounces', 'min_light_bounces'),
+    ('cycles:integrator:max_bounce', 'max_bounces', 'max_bounces'),
+    ('cycles:integrator:max_diffuse_bounce', 'diffuse_bounces', 'diffuse_bounces'),
+    ('cycles:integrator:max_glossy_bounce', 'glossy_bounces', 'glossy_bounces'),
+    ('cycles:integrator:max_transmission_bounce', 'transmission_bounces', 'transmission_bounces'),
+    ('cycles:integrator:max_volume_bounce', 'volume_bounces', 'volume_bounces'),
+    ('cycles:integrator:transparent_min_bounce', 'min_transparent_bounces', 'min_transparent_bounces'),
+    ('cycles:integrator:transparent_max_bounce', 'transparent_max_bounces', 'transparent_max_bounces'),
+
+    ('cycles:integrator:caustics_reflective', 'caustics_reflective', 'caustics_reflective'),
+    ('cycles:integrator:caustics_refractive', 'caustics_refractive', 'caustics_refractive'),
+    ('cycles:integrator:filter_glossy', 'blur_glossy', 'blur_glossy'),
+    ('cycles:integrator:sample_clamp_direct', 'sample_clamp_direct', 'sample_clamp_direct'),
+    ('cycles:integrator:sample_clamp_indirect', 'sample_clamp_indirect', 'sample_clamp_indirect'),
+    ('cycles:integrator:seed', 'seed', 'seed'),
+)
+
+
+def render_settings(scene, engine_type):
+    result = {}
+    for setting, render_value, viewport_value in RENDER_SETTINGS:
+        value = viewport_value if engine_type == 'VIEWPORT' else render_value
+        if value is None:
+            continue
+        result[setting] = value(scene) if callable(value) else getattr(scene.cycles, value)
+    return result
+
+
+_plugin_registered = False
+
+
+def _register_plugin():
+    global _plugin_registered
+    if _plugin_registered:
+        return
+    _plugin_registered = True
+
+    bpy.utils.expose_bundled_modules()
+
+    import os
+    plugin_dir = os.path.normpath(
+        os.path.join(os.path.dirname(__file__), "..", "cycles", "hydra")
+    )
+    if not os.path.isfile(os.path.join(plugin_dir, "plugInfo.json")):
+        print("Hydra Cycles: plugInfo.json not found at", plugin_dir)
+        return
+
+    import pxr.Plug
+    pxr.Plug.Registry().RegisterPlugins([plugin_dir])
+
+
 class CyclesHydraRenderEngine(bpy.types.HydraRenderEngine):
     bl_idname = 'HYDRA_CYCLES'
     bl_label = "Hydra Cycles"
@@ -30,25 +134,14 @@ class CyclesHydraRenderEngine(bpy.types.HydraRenderEngine):
 
     bl_delegate_id = 'HdCyclesPlugin'
 
-    @classmethod
-    def register(cls):
-        bpy.utils.expose_bundled_modules()
-
-        import os
-        plugin_dir = os.path.normpath(
-            os.path.join(os.path.dirname(__file__), "..", "cycles", "hydra")
-        )
-        if not os.path.isfile(os.path.join(plugin_dir, "plugInfo.json")):
-            print("Hydra Cycles: plugInfo.json not found at", plugin_dir)
-            return
-
-        import pxr.Plug
-        pxr.Plug.Registry().RegisterPlugins([plugin_dir])
+    def __init__(self, *args, **kwargs):
+        # Register the Hydra plugin when the engine is first used rather than on add-on
+        # registration, so Blender startup does not pay for importing pxr.
+        _register_plugin()
+        super().__init__(*args, **kwargs)
 
     def get_render_settings(self, engine_type):
-        cscene = bpy.context.scene.cycles
-        samples = cscene.preview_samples if engine_type == 'VIEWPORT' else cscene.samples
-        result = {'cycles:samples': samples}
+        result = render_settings(bpy.context.scene, engine_type)
         if engine_type != 'VIEWPORT':
             result |= {
                 'aovToken:Combined': "color",
@@ -63,6 +156,10 @@ class CyclesHydraRenderEngine(bpy.types.HydraRenderEngine):
             self.register_pass(scene, render_layer, 'Depth', 1, 'Z', 'VALUE')
 
 
+# Panels shared with regular Cycles, found once on registration.
+_panels = []
+
+
 def _shared_panels():
     # Use all the same panels as regular Cycles, even if most options are
     # currently not supported. But for the ones that are supported it's not
@@ -76,12 +173,14 @@ def _shared_panels():
 def register():
     bpy.utils.register_class(CyclesHydraRenderEngine)
 
-    for panel in _shared_panels():
+    _panels[:] = _shared_panels()
+    for panel in _panels:
         panel.COMPAT_ENGINES.add(CyclesHydraRenderEngine.bl_idname)
 
 
 def unregister():
-    for panel in _shared_panels():
+    for panel in _panels:
         panel.COMPAT_ENGINES.discard(CyclesHydraRenderEngine.bl_idname)
+    _panels.clear()
 
     bpy.utils.unregister_class(CyclesHydraRenderEngine)
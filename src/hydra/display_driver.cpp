@@ -35,6 +35,10 @@ HdCyclesDisplayDriver::~HdCyclesDisplayDriver()
     glDeleteBuffers(1, &gl_pbo_id_);
   }
 
+  if (gl_scaled_texture_id_) {
+    glDeleteTextures(1, &gl_scaled_texture_id_);
+  }
+
   gl_context_dispose();
 }
 
@@ -120,8 +124,8 @@ void HdCyclesDisplayDriver::gl_context_dispose()
 void HdCyclesDisplayDriver::next_tile_begin() {}
 
 bool HdCyclesDisplayDriver::update_begin(const Params &params,
-                                         int /*texture_width*/,
-                                         int /*texture_height*/)
+                                         int texture_width,
+                                         int texture_height)
 {
   if (!gl_context_enable()) {
     return false;
@@ -143,6 +147,7 @@ bool HdCyclesDisplayDriver::update_begin(const Params &params,
     graphics_interop_buffer_.clear();
   }
 
+  texture_size_ = make_int2(texture_width, texture_height);
   need_update_ = true;
 
   return true;
@@ -276,12 +281,17 @@ void HdCyclesDisplayDriver::draw(const Params &params)
     glWaitSync((GLsync)gl_upload_sync_, 0, GL_TIMEOUT_IGNORED);
   }
 
-  glBindTexture(GL_TEXTURE_2D, texture->GetTextureId());
-  glBindBuffer(GL_PIXEL_UNPACK_BUFFER, gl_pbo_id_);
-  glTexSubImage2D(
-      GL_TEXTURE_2D, 0, 0, 0, pbo_size_.x, pbo_size_.y, GL_RGBA, GL_HALF_FLOAT, nullptr);
-  glBindTexture(GL_TEXTURE_2D, 0);
-  glBindBuffer(GL_PIXEL_UNPACK_BUFFER, 0);
+  if (texture_size_ == pbo_size_) {
+    glBindTexture(GL_TEXTURE_2D, texture->GetTextureId());
+    glBindBuffer(GL_PIXEL_UNPACK_BUFFER, gl_pbo_id_);
+    glTexSubImage2D(
+        GL_TEXTURE_2D, 0, 0, 0, pbo_size_.x, pbo_size_.y, GL_RGBA, GL_HALF_FLOAT, nullptr);
+    glBindTexture(GL_TEXTURE_2D, 0);
+    glBindBuffer(GL_PIXEL_UNPACK_BUFFER, 0);
+  }
+  else {
+    gl_draw_scaled(texture->GetTextureId());
+  }
 
   gl_render_sync_ = glFenceSync(GL_SYNC_GPU_COMMANDS_COMPLETE, 0);
   glFlush();
@@ -289,4 +299,64 @@ void HdCyclesDisplayDriver::draw(const Params &params)
   need_update_ = false;
 }
 
+void HdCyclesDisplayDriver::gl_draw_scaled(const unsigned int textureId)
+{
+  // Upload the lower resolution pixels into a texture of their size
+  if (!gl_scaled_texture_id_) {
+    glGenTextures(1, &gl_scaled_texture_id_);
+  }
+
+  glBindTexture(GL_TEXTURE_2D, gl_scaled_texture_id_);
+  if (!(scaled_texture_size_ == texture_size_)) {
+    glTexImage2D(GL_TEXTURE_2D,
+                 0,
+                 GL_RGBA16F,
+                 texture_size_.x,
+                 texture_size_.y,
+                 0,
+                 GL_RGBA,
+                 GL_HALF_FLOAT,
+                 nullptr);
+    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_NEAREST);
+    glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_NEAREST);
+    scaled_texture_size_ = texture_size_;
+  }
+
+  glBindBuffer(GL_PIXEL_UNPACK_BUFFER, gl_pbo_id_);
+  glTexSubImage2D(
+      GL_TEXTURE_2D, 0, 0, 0, texture_size_.x, texture_size_.y, GL_RGBA, GL_HALF_FLOAT, nullptr);
+  glBindBuffer(GL_PIXEL_UNPACK_BUFFER, 0);
+  glBindTexture(GL_TEXTURE_2D, 0);
+
+  // Scale it up into the render buffer texture, framebuffers are not shared between contexts so
+  // create them in the current one
+  GLint readFramebuffer = 0;
+  GLint drawFramebuffer = 0;
+  glGetIntegerv(GL_READ_FRAMEBUFFER_BINDING, &readFramebuffer);
+  glGetIntegerv(GL_DRAW_FRAMEBUFFER_BINDING, &drawFramebuffer);
+
+  GLuint framebuffers[2];
+  glGenFramebuffers(2, framebuffers);
+  glBindFramebuffer(GL_READ_FRAMEBUFFER, framebuffers[0]);
+  glFramebufferTexture2D(
+      GL_READ_FRAMEBUFFER, GL_COLOR_ATTACHMENT0, GL_TEXTURE_2D, gl_scaled_texture_id_, 0);
+  glBindFramebuffer(GL_DRAW_FRAMEBUFFER, framebuffers[1]);
+  glFramebufferTexture2D(GL_DRAW_FRAMEBUFFER, GL_COLOR_ATTACHMENT0, GL_TEXTURE_2D, textureId, 0);
+
+  glBlitFramebuffer(0,
+                    0,
+                    texture_size_.x,
+                    texture_size_.y,
+                    0,
+                    0,
+                    pbo_size_.x,
+                    pbo_size_.y,
+                    GL_COLOR_BUFFER_BIT,
+                    GL_NEAREST);
+
+  glBindFramebuffer(GL_READ_FRAMEBUFFER, readFramebuffer);
+  glBindFramebuffer(GL_DRAW_FRAMEBUFFER, drawFramebuffer);
+  glDeleteFramebuffers(2, framebuffers);
+}
+
 HDCYCLES_NAMESPACE_CLOSE_SCOPE
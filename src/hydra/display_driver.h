@@ -42,6 +42,9 @@ class HdCyclesDisplayDriver final : public CCL_NS::DisplayDriver {
 
   void draw(const Params &params) override;
 
+  // Upload pixels rendered at a lower resolution and scale them up into the texture.
+  void gl_draw_scaled(const unsigned int textureId);
+
   void gl_context_create();
   bool gl_context_enable();
   void gl_context_disable();
@@ -59,6 +62,11 @@ class HdCyclesDisplayDriver final : public CCL_NS::DisplayDriver {
   PXR_NS::HgiTextureHandle texture_;
   unsigned int gl_pbo_id_ = 0;
   CCL_NS::int2 pbo_size_ = CCL_NS::make_int2(0, 0);
+  // Size of the pixels in the pixel buffer, smaller than its size while rendering at a lower
+  // resolution. These are uploaded to a texture of this size first and then scaled up.
+  CCL_NS::int2 texture_size_ = CCL_NS::make_int2(0, 0);
+  unsigned int gl_scaled_texture_id_ = 0;
+  CCL_NS::int2 scaled_texture_size_ = CCL_NS::make_int2(0, 0);
   bool need_update_ = false;
   std::atomic_bool need_zero_ = false;
   std::atomic_bool need_recreate_interop_ = false;
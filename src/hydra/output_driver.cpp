@@ -28,8 +28,6 @@ void HdCyclesOutputDriver::write_render_tile(const Tile &tile)
 
 bool HdCyclesOutputDriver::update_render_tile(const Tile &tile)
 {
-  std::vector<float> pixels;
-
   for (const HdRenderPassAovBinding &aovBinding : _renderParam->GetAovBindings()) {
     if (auto *const renderBuffer = static_cast<HdCyclesRenderBuffer *>(aovBinding.renderBuffer)) {
       if (aovBinding == _renderParam->GetDisplayAovBinding() && renderBuffer->IsResourceUsed()) {
@@ -42,23 +40,33 @@ bool HdCyclesOutputDriver::update_render_tile(const Tile &tile)
       }
 
       const size_t channels = HdGetComponentCount(format);
+      const bool isFullTile = tile.offset.x == 0 && tile.offset.y == 0 &&
+                              tile.size.x == renderBuffer->GetWidth() &&
+                              tile.size.y == renderBuffer->GetHeight();
       // Avoid extra copy by mapping render buffer directly when dimensions/format match the tile
-      if (tile.offset.x == 0 && tile.offset.y == 0 && tile.size.x == renderBuffer->GetWidth() &&
-          tile.size.y == renderBuffer->GetHeight() &&
-          (format >= HdFormatFloat32 && format <= HdFormatFloat32Vec4))
-      {
+      if (isFullTile && (format >= HdFormatFloat32 && format <= HdFormatFloat32Vec4)) {
         float *const data = static_cast<float *>(renderBuffer->Map());
         TF_VERIFY(tile.get_pass_pixels(aovBinding.aovName.GetString(), channels, data));
         renderBuffer->Unmap();
       }
+      // Half float color can be written directly too, it is clamped the same way as for display
+      else if (isFullTile && format == HdFormatFloat16Vec4 &&
+               aovBinding.aovName == HdAovTokens->color)
+      {
+        // Mapping fails while the display driver texture is set as resource
+        if (half4 *const data = static_cast<half4 *>(renderBuffer->Map())) {
+          TF_VERIFY(tile.get_pass_pixels_half_rgba(aovBinding.aovName.GetString(), data));
+          renderBuffer->Unmap();
+        }
+      }
       else {
-        pixels.resize(channels * tile.size.x * tile.size.y);
-        if (tile.get_pass_pixels(aovBinding.aovName.GetString(), channels, pixels.data())) {
+        _pixels.resize(channels * tile.size.x * tile.size.y);
+        if (tile.get_pass_pixels(aovBinding.aovName.GetString(), channels, _pixels.data())) {
           const bool isId = aovBinding.aovName == HdAovTokens->primId ||
                             aovBinding.aovName == HdAovTokens->elementId ||
                             aovBinding.aovName == HdAovTokens->instanceId;
           renderBuffer->Map();
-          renderBuffer->WritePixels(pixels.data(),
+          renderBuffer->WritePixels(_pixels.data(),
                                     GfVec2i(tile.offset.x, tile.offset.y),
                                     GfVec2i(tile.size.x, tile.size.y),
                                     channels,
@@ -19,6 +19,9 @@ class HdCyclesOutputDriver final : public CCL_NS::OutputDriver {
   bool update_render_tile(const Tile &tile) override;
 
   HdCyclesSession *const _renderParam;
+
+  // Pixels of AOVs that need conversion, kept between updates to avoid reallocating them
+  std::vector<float> _pixels;
 };
 
 HDCYCLES_NAMESPACE_CLOSE_SCOPE
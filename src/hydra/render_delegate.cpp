@@ -349,6 +349,10 @@ HdAovDescriptor HdCyclesDelegate::GetDefaultAovDescriptor(const TfToken &name) c
       // Can use Cycles 'DisplayDriver' in OpenGL, but it only supports 'half4' format
       colorFormat = HdFormatFloat16Vec4;
     }
+    else if (_useHalfFloatColor) {
+      // Half the memory of float color, which Cycles writes into render buffers directly too
+      colorFormat = HdFormatFloat16Vec4;
+    }
 
     return HdAovDescriptor(colorFormat, false, VtValue(GfVec4f(0.0f)));
   }
@@ -388,6 +392,16 @@ HdRenderSettingDescriptorList HdCyclesDelegate::GetRenderSettingDescriptors() co
       HdCyclesRenderSettingsTokens->sampleOffset,
       VtValue(0),
   });
+  descriptors.push_back({
+      "Progressive Resolution",
+      HdCyclesRenderSettingsTokens->useResolutionDivider,
+      VtValue(false),
+  });
+  descriptors.push_back({
+      "Half Float Color",
+      HdCyclesRenderSettingsTokens->useHalfFloatColor,
+      VtValue(false),
+  });
 
   for (const SocketType &socket : scene->integrator->type->inputs) {
     descriptors.push_back({socket.ui_name.string(),
@@ -418,19 +432,42 @@ void HdCyclesDelegate::SetRenderSetting(const PXR_NS::TfToken &key, const PXR_NS
     session->set_samples(samples);
   }
   else if (key == HdCyclesRenderSettingsTokens->sampleOffset) {
-    session->params.sample_subset_offset = VtValue::Cast<int>(value).GetWithDefault(
+    const int sampleOffset = VtValue::Cast<int>(value).GetWithDefault(
         session->params.sample_subset_offset);
-    session->params.sample_subset_length = Integrator::MAX_SAMPLES;
-    session->params.use_sample_subset = session->params.sample_subset_offset > 0;
-    ++_settingsVersion;
+    // Settings are set again on every sync, only reset the render when they actually changed
+    if (sampleOffset != session->params.sample_subset_offset ||
+        session->params.use_sample_subset != (sampleOffset > 0))
+    {
+      session->params.sample_subset_offset = sampleOffset;
+      session->params.sample_subset_length = Integrator::MAX_SAMPLES;
+      session->params.use_sample_subset = sampleOffset > 0;
+      ++_settingsVersion;
+    }
+  }
+  else if (key == HdCyclesRenderSettingsTokens->useResolutionDivider) {
+    // Start rendering at a lower resolution after a reset and refine it progressively, which
+    // gives faster feedback while navigating in the viewport
+    const bool useResolutionDivider = VtValue::Cast<bool>(value).GetWithDefault(
+        session->params.use_resolution_divider);
+    if (useResolutionDivider != session->params.use_resolution_divider) {
+      session->params.use_resolution_divider = useResolutionDivider;
+      ++_settingsVersion;
+    }
+  }
+  else if (key == HdCyclesRenderSettingsTokens->useHalfFloatColor) {
+    // Only affects the format of color AOVs created afterwards
+    _useHalfFloatColor = VtValue::Cast<bool>(value).GetWithDefault(_useHalfFloatColor);
   }
   else {
     const std::string &keyString = key.GetString();
     if (keyString.rfind("cycles:integrator:", 0) == 0) {
       const ustring socketName(keyString, sizeof("cycles:integrator:") - 1);
       if (const SocketType *socket = scene->integrator->type->find_input(socketName)) {
+        const VtValue previousValue = GetNodeValue(scene->integrator, *socket);
         SetNodeValue(scene->integrator, *socket, value);
-        ++_settingsVersion;
+        if (GetNodeValue(scene->integrator, *socket) != previousValue) {
+          ++_settingsVersion;
+        }
       }
     }
   }
@@ -459,6 +496,12 @@ VtValue HdCyclesDelegate::GetRenderSetting(const TfToken &key) const
   if (key == HdCyclesRenderSettingsTokens->sampleOffset) {
     return VtValue((session->params.use_sample_subset) ? session->params.sample_subset_offset : 0);
   }
+  if (key == HdCyclesRenderSettingsTokens->useResolutionDivider) {
+    return VtValue(session->params.use_resolution_divider);
+  }
+  if (key == HdCyclesRenderSettingsTokens->useHalfFloatColor) {
+    return VtValue(_useHalfFloatColor);
+  }
 
   const std::string &keyString = key.GetString();
   if (keyString.rfind("cycles:integrator:", 0) == 0) {
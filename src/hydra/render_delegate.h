@@ -19,7 +19,9 @@ HDCYCLES_NAMESPACE_OPEN_SCOPE
     ((threads, "cycles:threads")) \
     ((timeLimit, "cycles:time_limit")) \
     ((samples, "cycles:samples")) \
-    ((sampleOffset, "cycles:sample_offset"))
+    ((sampleOffset, "cycles:sample_offset")) \
+    ((useResolutionDivider, "cycles:use_resolution_divider")) \
+    ((useHalfFloatColor, "cycles:use_half_float_color"))
 // clang-format on
 
 TF_DECLARE_PUBLIC_TOKENS(HdCyclesRenderSettingsTokens, HD_CYCLES_RENDER_SETTINGS_TOKENS);
@@ -93,6 +95,7 @@ class HdCyclesDelegate final : public PXR_NS::HdRenderDelegate {
  private:
   PXR_NS::Hgi *_hgi = nullptr;
   std::unique_ptr<HdCyclesSession> _renderParam;
+  bool _useHalfFloatColor = false;
 };
 
 HDCYCLES_NAMESPACE_CLOSE_SCOPE
@@ -1158,6 +1158,29 @@ int PathTrace::get_num_render_tile_samples() const
   return render_scheduler_.get_num_rendered_samples();
 }
 
+/* Scale pixels up to the destination size using nearest neighbor filtering. */
+template<typename T>
+static void scale_up_render_tile_pixels(const T *pixels,
+                                        const int2 size,
+                                        const int num_components,
+                                        T *destination,
+                                        const int2 destination_size,
+                                        const int64_t pixel_stride,
+                                        const int64_t row_stride)
+{
+  parallel_for(0, destination_size.y, [&](int64_t y) {
+    const int64_t src_y = min(int(y * size.y / destination_size.y), size.y - 1);
+    for (int64_t x = 0; x < destination_size.x; x++) {
+      const int64_t src_x = min(int(x * size.x / destination_size.x), size.x - 1);
+      const T *src_pixel = pixels + (src_y * size.x + src_x) * num_components;
+      T *pixel = destination + y * row_stride + x * pixel_stride;
+      for (int i = 0; i < num_components; i++) {
+        pixel[i] = src_pixel[i];
+      }
+    }
+  });
+}
+
 bool PathTrace::get_render_tile_pixels(const PassAccessor &pass_accessor,
                                        const PassAccessor::Destination &destination)
 {
@@ -1165,6 +1188,69 @@ bool PathTrace::get_render_tile_pixels(const PassAccessor &pass_accessor,
     return pass_accessor.get_render_tile_pixels(full_frame_state_.render_buffers, destination);
   }
 
+  const BufferParams &effective_params = (pass_accessor.get_pass_access_info().mode ==
+                                          PassMode::DENOISED) ?
+                                             render_state_.effective_denoised_big_tile_params :
+                                             render_state_.effective_big_tile_params;
+  const int2 size = make_int2(effective_params.window_width, effective_params.window_height);
+  const int2 tile_size = get_render_tile_size();
+
+  if (size.x == 0 || size.y == 0 || size == tile_size) {
+    return get_effective_render_tile_pixels(pass_accessor, destination);
+  }
+
+  /* The render buffers have a lower resolution than the tile when there is a resolution divider
+   * involved, for example during viewport navigation. Scale the pixels up, so that the
+   * destination always receives the entire tile. */
+  const int64_t num_pixels = int64_t(size.x) * size.y;
+
+  if (destination.pixels) {
+    const int num_components = destination.num_components;
+    const int pixel_stride = destination.pixel_stride ? destination.pixel_stride : num_components;
+
+    vector<float> pixels(num_pixels * num_components);
+    const PassAccessor::Destination effective_destination(pixels.data(), num_components);
+    if (!get_effective_render_tile_pixels(pass_accessor, effective_destination)) {
+      return false;
+    }
+
+    scale_up_render_tile_pixels(pixels.data(),
+                                size,
+                                num_components,
+                                destination.pixels + destination.pixel_offset +
+                                    int64_t(destination.offset) * pixel_stride,
+                                tile_size,
+                                pixel_stride,
+                                int64_t(tile_size.x) * pixel_stride);
+    return true;
+  }
+
+  if (destination.pixels_half_rgba) {
+    vector<half4> pixels(num_pixels);
+    PassAccessor::Destination effective_destination = destination;
+    effective_destination.pixels_half_rgba = pixels.data();
+    effective_destination.offset = 0;
+    effective_destination.stride = 0;
+    if (!get_effective_render_tile_pixels(pass_accessor, effective_destination)) {
+      return false;
+    }
+
+    scale_up_render_tile_pixels(pixels.data(),
+                                size,
+                                1,
+                                destination.pixels_half_rgba + destination.offset,
+                                tile_size,
+                                1,
+                                destination.stride ? destination.stride : tile_size.x);
+    return true;
+  }
+
+  return get_effective_render_tile_pixels(pass_accessor, destination);
+}
+
+bool PathTrace::get_effective_render_tile_pixels(const PassAccessor &pass_accessor,
+                                                 const PassAccessor::Destination &destination)
+{
   if (big_tile_denoise_work_ && render_state_.has_denoised_result) {
     /* Only use the big tile denoised buffer to access the denoised passes.
      * The guiding passes are allowed to be modified in-place for the needs of the denoiser,
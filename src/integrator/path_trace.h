@@ -148,6 +148,9 @@ class PathTrace {
    *
    * NOTE: Expects buffers to be copied to the host using `copy_render_tile_from_device()`.
    *
+   * When the render buffers have a lower resolution than the tile due to a resolution divider, the
+   * pixels are scaled up to the tile size.
+   *
    * Returns false if any of the accessor's `get_render_tile_pixels()` returned false. */
   bool get_render_tile_pixels(const PassAccessor &pass_accessor,
                               const PassAccessor::Destination &destination);
@@ -232,6 +235,10 @@ class PathTrace {
   /* Get number of samples in the current state of the render buffers. */
   int get_num_samples_in_buffer();
 
+  /* Get pass data of the entire big tile at the effective resolution of the render buffers. */
+  bool get_effective_render_tile_pixels(const PassAccessor &pass_accessor,
+                                        const PassAccessor::Destination &destination);
+
   /* Check whether user requested to cancel rendering, so that path tracing is to be finished as
    * soon as possible. */
   bool is_cancel_requested();
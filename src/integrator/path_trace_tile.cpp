@@ -25,6 +25,21 @@ PathTraceTile::PathTraceTile(PathTrace &path_trace)
 bool PathTraceTile::get_pass_pixels(const string_view pass_name,
                                     const int num_channels,
                                     float *pixels) const
+{
+  const PassAccessor::Destination destination(pixels, num_channels);
+  return get_pass_pixels(pass_name, destination);
+}
+
+bool PathTraceTile::get_pass_pixels_half_rgba(const string_view pass_name, half4 *pixels) const
+{
+  PassAccessor::Destination destination;
+  destination.pixels_half_rgba = pixels;
+  destination.num_components = 4;
+  return get_pass_pixels(pass_name, destination);
+}
+
+bool PathTraceTile::get_pass_pixels(const string_view pass_name,
+                                    const PassAccessor::Destination &destination) const
 {
   /* NOTE: The code relies on a fact that session is fully update and no scene/buffer modification
    * is happening while this function runs. */
@@ -68,7 +83,6 @@ bool PathTraceTile::get_pass_pixels(const string_view pass_name,
       pass_access_info.use_approximate_shadow_catcher && !buffer_params.use_transparent_background;
 
   const PassAccessorCPU pass_accessor(pass_access_info, exposure, num_samples);
-  const PassAccessor::Destination destination(pixels, num_channels);
 
   return path_trace_.get_render_tile_pixels(pass_accessor, destination);
 }
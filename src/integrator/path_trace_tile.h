@@ -4,6 +4,8 @@
 
 #pragma once
 
+#include "integrator/pass_accessor.h"
+
 #include "session/output_driver.h"
 
 CCL_NAMESPACE_BEGIN
@@ -21,11 +23,15 @@ class PathTraceTile : public OutputDriver::Tile {
   bool get_pass_pixels(const string_view pass_name,
                        const int num_channels,
                        float *pixels) const override;
+  bool get_pass_pixels_half_rgba(const string_view pass_name, half4 *pixels) const override;
   bool set_pass_pixels(const string_view pass_name,
                        const int num_channels,
                        const float *pixels) const override;
 
  private:
+  bool get_pass_pixels(const string_view pass_name,
+                       const PassAccessor::Destination &destination) const;
+
   PathTrace &path_trace_;
   mutable bool copied_from_device_;
 };
@@ -134,14 +134,24 @@ void PathTraceWork::copy_from_denoised_render_buffers(const RenderBuffers *rende
 bool PathTraceWork::get_render_tile_pixels(const PassAccessor &pass_accessor,
                                            const PassAccessor::Destination &destination)
 {
-  const int offset_y = (effective_buffer_params_.full_y + effective_buffer_params_.window_y) -
-                       (effective_big_tile_params_.full_y + effective_big_tile_params_.window_y);
-  const int width = effective_buffer_params_.width;
+  /* Use the effective parameters, the render buffers have fewer pixels than allocated when there
+   * is a resolution divider involved. */
+  const bool is_denoised = pass_accessor.get_pass_access_info().mode == PassMode::DENOISED;
+  const BufferParams &effective_buffer_params = is_denoised ? effective_denoised_buffer_params_ :
+                                                              effective_buffer_params_;
+  const BufferParams &effective_big_tile_params = is_denoised ?
+                                                      effective_denoised_big_tile_params_ :
+                                                      effective_big_tile_params_;
+
+  const int offset_y = (effective_buffer_params.full_y + effective_buffer_params.window_y) -
+                       (effective_big_tile_params.full_y + effective_big_tile_params.window_y);
+  const int width = effective_buffer_params.width;
 
   PassAccessor::Destination slice_destination = destination;
   slice_destination.offset += offset_y * width;
 
-  return pass_accessor.get_render_tile_pixels(buffers_.get(), slice_destination);
+  return pass_accessor.get_render_tile_pixels(
+      buffers_.get(), effective_buffer_params, slice_destination);
 }
 
 bool PathTraceWork::set_render_tile_pixels(PassAccessor &pass_accessor,
@@ -43,6 +43,19 @@ bool RenderScheduler::is_background() const
   return background_;
 }
 
+void RenderScheduler::set_use_resolution_divider(bool use_resolution_divider)
+{
+  const int default_start_resolution_divider = use_resolution_divider ? pixel_size_ * 8 : 0;
+  if (default_start_resolution_divider == default_start_resolution_divider_) {
+    return;
+  }
+
+  default_start_resolution_divider_ = default_start_resolution_divider;
+
+  /* Calculate the start resolution divider again, starting from the new default. */
+  start_resolution_divider_ = 0;
+}
+
 void RenderScheduler::set_denoiser_params(const DenoiseParams &params)
 {
   denoiser_params_ = params;
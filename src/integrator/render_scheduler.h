@@ -104,6 +104,10 @@ class RenderScheduler {
 
   bool is_background() const;
 
+  /* Specify whether to start rendering at a lower resolution after reset, progressively refining
+   * it to the full resolution. Takes effect on the next reset. */
+  void set_use_resolution_divider(bool use_resolution_divider);
+
   void set_denoiser_params(const DenoiseParams &params);
   bool is_denoiser_gpu_used() const;
 
@@ -41,6 +41,24 @@ bool namedSampleCountPairComparator(const NamedSampleCountPair &a, const NamedSa
   return a.samples > b.samples;
 }
 
+string json_string(const string &str)
+{
+  string result = "\"";
+  for (const char ch : str) {
+    if (ch == '"' || ch == '\\') {
+      result += '\\';
+      result += ch;
+    }
+    else if ((unsigned char)ch < 0x20) {
+      result += string_printf("\\u%04x", ch);
+    }
+    else {
+      result += ch;
+    }
+  }
+  return result + "\"";
+}
+
 }  // namespace
 
 NamedSizeEntry::NamedSizeEntry() : size(0) {}
@@ -95,6 +113,32 @@ string NamedTimeStats::full_report(const int indent_level)
   return result;
 }
 
+string NamedSizeStats::json_report()
+{
+  string result = string_printf("{\"total_size\": %zu, \"entries\": [", total_size);
+  sort(entries.begin(), entries.end(), namedSizeEntryComparator);
+  for (size_t i = 0; i < entries.size(); i++) {
+    result += string_printf("%s{\"name\": %s, \"size\": %zu}",
+                            (i == 0) ? "" : ", ",
+                            json_string(entries[i].name).c_str(),
+                            entries[i].size);
+  }
+  return result + "]}";
+}
+
+string NamedTimeStats::json_report()
+{
+  string result = string_printf("{\"total_time\": %.9g, \"entries\": [", total_time);
+  sort(entries.begin(), entries.end(), namedTimeEntryComparator);
+  for (size_t i = 0; i < entries.size(); i++) {
+    result += string_printf("%s{\"name\": %s, \"time\": %.9g}",
+                            (i == 0) ? "" : ", ",
+                            json_string(entries[i].name).c_str(),
+                            entries[i].time);
+  }
+  return result + "]}";
+}
+
 /* Named time sample statistics. */
 
 NamedNestedSampleStats::NamedNestedSampleStats() : self_samples(0), sum_samples(0) {}
@@ -50,6 +50,9 @@ class NamedSizeStats {
   /* Generate full human-readable report. */
   string full_report(const int indent_level = 0);
 
+  /* Generate report as a JSON object with total size and entries. */
+  string json_report();
+
   /* Total size of all entries. */
   size_t total_size;
 
@@ -73,6 +76,9 @@ class NamedTimeStats {
   /* Generate full human-readable report. */
   string full_report(const int indent_level = 0);
 
+  /* Generate report as a JSON object with total time and entries. */
+  string json_report();
+
   /* Total time of all entries. */
   double total_time;
 
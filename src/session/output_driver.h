@@ -4,6 +4,7 @@
 
 #pragma once
 
+#include "util/half.h"
 #include "util/math.h"
 #include "util/string.h"
 #include "util/types.h"
@@ -43,6 +44,9 @@ class OutputDriver {
     virtual bool get_pass_pixels(const string_view pass_name,
                                  const int num_channels,
                                  float *pixels) const = 0;
+    /* Get pixels of a pass as half float RGBA, clamped to the range of half floats the same way
+     * as pixels for display. Avoids a conversion from float pixels for half float outputs. */
+    virtual bool get_pass_pixels_half_rgba(const string_view pass_name, half4 *pixels) const = 0;
     virtual bool set_pass_pixels(const string_view pass_name,
                                  const int num_channels,
                                  const float *pixels) const = 0;
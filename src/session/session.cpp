@@ -553,6 +553,9 @@ bool Session::delayed_reset_buffer_params()
 
 void Session::update_buffers_for_params()
 {
+  /* Hosts that check SessionParams::modified() create a new session when this changes, but Hydra
+   * changes the parameters of its running session. */
+  render_scheduler_.set_use_resolution_divider(params.use_resolution_divider);
   render_scheduler_.set_sample_params(params.samples,
                                       params.use_sample_subset,
                                       params.sample_subset_offset,
@@ -0,0 +1,79 @@
+# SPDX-FileCopyrightText: 2011-2026 Blender Foundation
+#
+# SPDX-License-Identifier: Apache-2.0
+
+# Tests of rendering multiple scene files in one standalone Cycles process, where
+# the scene of each job replaces the scene of the previous job.
+#
+# Usage: python3 app_batch_test.py /path/to/cycles
+
+import os
+import struct
+import subprocess
+import sys
+import tempfile
+import unittest
+
+CYCLES = None
+
+SCENE = """<cycles>
+<camera width="8" height="8" />
+<camera type="perspective" />
+
+<shader name="material">
+	<emission name="emit" color="{color}" strength="1.0" />
+	<connect from="emit emission" to="output surface" />
+</shader>
+
+<state shader="material">
+	<mesh P="-50 -50 5  50 -50 5  50 50 5  -50 50 5" nverts="4" verts="0 1 2 3" />
+</state>
+</cycles>
+"""
+
+
+def read_tga_first_pixel(filepath):
+    # Uncompressed true color image, as written by OpenImageIO by default.
+    with open(filepath, "rb") as f:
+        data = f.read()
+    id_length, colormap_type, image_type = data[0], data[1], data[2]
+    assert colormap_type == 0 and image_type == 2, "unexpected TGA image type"
+    bits_per_pixel = data[16]
+    offset = 18 + id_length
+    b, g, r = struct.unpack_from("BBB", data, offset)
+    assert bits_per_pixel in {24, 32}
+    return r, g, b
+
+
+class AppBatchTest(unittest.TestCase):
+    def render(self, directory, colors):
+        filepaths = []
+        for i, color in enumerate(colors):
+            filepath = os.path.join(directory, "scene_{:d}.xml".format(i + 1))
+            with open(filepath, "w") as f:
+                f.write(SCENE.format(color=color))
+            filepaths.append(filepath)
+
+        output = os.path.join(directory, "image_####.tga")
+        subprocess.run([CYCLES, "--background", "--quiet", "--samples", "1", "--output", output] + filepaths,
+                       check=True, stdout=subprocess.DEVNULL)
+        return [read_tga_first_pixel(os.path.join(directory, "image_{:04d}.tga".format(i + 1)))
+                for i in range(len(colors))]
+
+    def test_jobs_use_own_shaders(self):
+        # Both scenes name their shader the same, the second job must not bind the shader of the first.
+        with tempfile.TemporaryDirectory() as directory:
+            first, second = self.render(directory, ["1.0, 0.0, 0.0", "0.0, 1.0, 0.0"])
+
+        self.assertGreater(first[0], 200)
+        self.assertLess(first[1], 50)
+        self.assertLess(second[0], 50)
+        self.assertGreater(second[1], 200)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: {:s} /path/to/cycles [unittest arguments]".format(sys.argv[0]))
+        sys.exit(1)
+    CYCLES = sys.argv.pop(1)
+    unittest.main()
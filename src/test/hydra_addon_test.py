@@ -0,0 +1,188 @@
+# SPDX-FileCopyrightText: 2011-2026 Blender Foundation
+#
+# SPDX-License-Identifier: Apache-2.0
+
+# Tests of the Hydra Cycles add-on render settings and registration, against a
+# stub of the bpy module so they run without Blender.
+#
+# With --timing, measure the time add-on import and registration take instead,
+# and the time of the first use of the engine that registers the Hydra plugin.
+
+import contextlib
+import importlib.util
+import io
+import os
+import re
+import sys
+import time
+import types
+import unittest
+
+SOURCE_DIR = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+
+def stub_bpy():
+    bpy = types.ModuleType("bpy")
+    bpy.types = types.SimpleNamespace(HydraRenderEngine=type("HydraRenderEngine", (), {}),
+                                      Panel=type("Panel", (), {}))
+    bpy.utils = types.SimpleNamespace(register_class=lambda cls: None, unregister_class=lambda cls: None)
+    bpy.context = types.SimpleNamespace(scene=None)
+
+    def expose_bundled_modules():
+        bpy.num_expose_bundled_modules += 1
+
+    bpy.num_expose_bundled_modules = 0
+    bpy.utils.expose_bundled_modules = expose_bundled_modules
+    return bpy
+
+
+def load_addon():
+    sys.modules["bpy"] = stub_bpy()
+    spec = importlib.util.spec_from_file_location(
+        "hydra_cycles", os.path.join(SOURCE_DIR, "hydra", "addon", "__init__.py"))
+    addon = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(addon)
+    return addon
+
+
+def stub_scene():
+    cycles = types.SimpleNamespace(
+        samples=128, preview_samples=16, time_limit=30.0,
+        use_adaptive_sampling=True, use_preview_adaptive_sampling=False,
+        adaptive_threshold=0.01, preview_adaptive_threshold=0.1,
+        adaptive_min_samples=0, preview_adaptive_min_samples=4,
+        use_denoising=True, use_preview_denoising=False,
+        denoiser='OPTIX', preview_denoiser='AUTO',
+        denoising_prefilter='ACCURATE', preview_denoising_prefilter='FAST',
+        denoising_quality='HIGH', preview_denoising_quality='BALANCED',
+        preview_denoising_start_sample=1,
+        use_light_tree=True, light_sampling_threshold=0.01,
+        min_light_bounces=0, max_bounces=12, diffuse_bounces=4, glossy_bounces=4,
+        transmission_bounces=12, volume_bounces=0, min_transparent_bounces=0, transparent_max_bounces=8,
+        caustics_reflective=True, caustics_refractive=False, blur_glossy=1.0,
+        sample_clamp_direct=0.0, sample_clamp_indirect=10.0, seed=3)
+    render = types.SimpleNamespace(threads_mode='FIXED', threads=6)
+    return types.SimpleNamespace(cycles=cycles, render=render)
+
+
+class HydraAddonRenderSettingsTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.addon = load_addon()
+
+    def test_final_render_settings(self):
+        settings = self.addon.render_settings(stub_scene(), 'FINAL')
+
+        self.assertEqual(settings['cycles:samples'], 128)
+        self.assertEqual(settings['cycles:time_limit'], 30.0)
+        self.assertEqual(settings['cycles:threads'], 6)
+        self.assertEqual(settings['cycles:use_resolution_divider'], False)
+        self.assertEqual(settings['cycles:use_half_float_color'], False)
+        self.assertEqual(settings['cycles:integrator:adaptive_threshold'], 0.01)
+        self.assertEqual(settings['cycles:integrator:use_denoise'], True)
+        self.assertEqual(settings['cycles:integrator:denoiser_type'], "optix")
+        self.assertEqual(settings['cycles:integrator:denoiser_prefilter'], "accurate")
+        self.assertEqual(settings['cycles:integrator:max_bounce'], 12)
+        self.assertEqual(settings['cycles:integrator:filter_glossy'], 1.0)
+        self.assertNotIn('cycles:integrator:denoise_start_sample', settings)
+
+    def test_viewport_render_settings(self):
+        scene = stub_scene()
+        scene.render.threads_mode = 'AUTO'
+        settings = self.addon.render_settings(scene, 'VIEWPORT')
+
+        self.assertEqual(settings['cycles:samples'], 16)
+        self.assertEqual(settings['cycles:threads'], 0)
+        self.assertEqual(settings['cycles:use_resolution_divider'], True)
+        self.assertEqual(settings['cycles:use_half_float_color'], True)
+        self.assertEqual(settings['cycles:integrator:use_adaptive_sampling'], False)
+        self.assertEqual(settings['cycles:integrator:adaptive_min_samples'], 4)
+        self.assertEqual(settings['cycles:integrator:denoiser_type'], "openimagedenoise")
+        self.assertEqual(settings['cycles:integrator:denoiser_quality'], "balanced")
+        self.assertEqual(settings['cycles:integrator:denoise_start_sample'], 1)
+        self.assertNotIn('cycles:time_limit', settings)
+
+    def test_aov_tokens(self):
+        self.addon.bpy.context.scene = stub_scene()
+        with contextlib.redirect_stdout(io.StringIO()):
+            engine = self.addon.CyclesHydraRenderEngine()
+
+        self.assertEqual(engine.get_render_settings('FINAL')['aovToken:Combined'], "color")
+        self.assertNotIn('aovToken:Combined', engine.get_render_settings('VIEWPORT'))
+
+    def test_settings_known_to_delegate(self):
+        # Every setting must be a render setting token of the delegate or an integrator socket,
+        # and enum values must be names of the socket enum.
+        with open(os.path.join(SOURCE_DIR, "hydra", "render_delegate.h")) as f:
+            delegate_tokens = set(re.findall(r'\(\(\w+, "([^"]+)"\)\)', f.read()))
+        with open(os.path.join(SOURCE_DIR, "scene", "integrator.cpp")) as f:
+            integrator = f.read()
+        sockets = set(re.findall(r"SOCKET_\w+\((\w+),", integrator))
+        enum_values = set(re.findall(r'_enum\.insert\("(\w+)"', integrator))
+
+        for engine_type in ('FINAL', 'VIEWPORT'):
+            for setting, value in self.addon.render_settings(stub_scene(), engine_type).items():
+                if setting.startswith("cycles:integrator:"):
+                    self.assertIn(setting[len("cycles:integrator:"):], sockets)
+                    if isinstance(value, str):
+                        self.assertIn(value, enum_values)
+                else:
+                    self.assertIn(setting, delegate_tokens)
+
+
+class HydraAddonRegisterTest(unittest.TestCase):
+    def setUp(self):
+        self.addon = load_addon()
+        self.bpy = sys.modules["bpy"]
+
+    def test_plugin_registered_on_first_use(self):
+        self.addon.register()
+        self.assertEqual(self.bpy.num_expose_bundled_modules, 0)
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.addon.CyclesHydraRenderEngine()
+            self.addon.CyclesHydraRenderEngine()
+        self.assertEqual(self.bpy.num_expose_bundled_modules, 1)
+
+        self.addon.unregister()
+
+    def test_shared_panels(self):
+        panel = type("CYCLES_PT_test", (self.bpy.types.Panel,), {'COMPAT_ENGINES': {'CYCLES'}})
+        other_panel = type("OTHER_PT_test", (self.bpy.types.Panel,), {'COMPAT_ENGINES': {'OTHER'}})
+
+        self.addon.register()
+        self.assertEqual(panel.COMPAT_ENGINES, {'CYCLES', 'HYDRA_CYCLES'})
+        self.assertEqual(other_panel.COMPAT_ENGINES, {'OTHER'})
+
+        # Panels registered later are not touched on unregister.
+        late_panel = type("CYCLES_PT_late", (self.bpy.types.Panel,), {'COMPAT_ENGINES': {'CYCLES'}})
+        self.addon.unregister()
+        self.assertEqual(panel.COMPAT_ENGINES, {'CYCLES'})
+        self.assertEqual(late_panel.COMPAT_ENGINES, {'CYCLES'})
+
+
+def print_timing(num_runs=100):
+    register_time = 0.0
+    first_use_time = 0.0
+    for _ in range(num_runs):
+        start = time.perf_counter()
+        addon = load_addon()
+        addon.register()
+        register_time += time.perf_counter() - start
+
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            addon.CyclesHydraRenderEngine()
+        first_use_time += time.perf_counter() - start
+
+        addon.unregister()
+
+    print(f"Import and register: {register_time / num_runs * 1000.0:.3f} ms")
+    print(f"First engine use:    {first_use_time / num_runs * 1000.0:.3f} ms")
+
+
+if __name__ == "__main__":
+    if "--timing" in sys.argv:
+        print_timing()
+    else:
+        unittest.main()
@@ -5,6 +5,8 @@
 #include <gtest/gtest.h>
 
 #include "integrator/render_scheduler.h"
+#include "session/session.h"
+#include "session/tile.h"
 
 CCL_NAMESPACE_BEGIN
 
@@ -22,4 +24,30 @@ TEST(IntegratorRenderScheduler, calculate_resolution_for_divider)
   EXPECT_EQ(calculate_resolution_for_divider(1920, 1080, 4), 360);
 }
 
+TEST(IntegratorRenderScheduler, set_use_resolution_divider)
+{
+  TileManager tile_manager;
+  SessionParams params;
+  params.use_resolution_divider = false;
+
+  RenderScheduler scheduler(tile_manager, params);
+  scheduler.set_sample_params(16, false, 0, 16);
+
+  BufferParams buffer_params;
+  buffer_params.width = 1920;
+  buffer_params.height = 1080;
+
+  scheduler.reset(buffer_params);
+  EXPECT_EQ(scheduler.get_render_work().resolution_divider, 1);
+
+  /* Start at a lower resolution after the next reset. */
+  scheduler.set_use_resolution_divider(true);
+  scheduler.reset(buffer_params);
+  EXPECT_EQ(scheduler.get_render_work().resolution_divider, 8);
+
+  scheduler.set_use_resolution_divider(false);
+  scheduler.reset(buffer_params);
+  EXPECT_EQ(scheduler.get_render_work().resolution_divider, 1);
+}
+
 CCL_NAMESPACE_END
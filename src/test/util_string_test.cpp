@@ -320,4 +320,80 @@ TEST(string_endswith, basic)
   EXPECT_FALSE(string_endswith("Hello", "WorldHello"));
 }
 
+/* ******** Tests for string_parse_int() and string_parse_float() ******** */
+
+TEST(string_parse_int, basic)
+{
+  const char *str = " 12\t-3\n+4  5abc 6.7 ";
+  int values[5];
+  for (int i = 0; i < 5; i++) {
+    str = string_parse_int(str, values[i]);
+    ASSERT_NE(str, nullptr);
+  }
+
+  EXPECT_EQ(values[0], 12);
+  EXPECT_EQ(values[1], -3);
+  EXPECT_EQ(values[2], 4);
+  EXPECT_EQ(values[3], 5);
+  EXPECT_EQ(values[4], 6);
+
+  int value;
+  EXPECT_EQ(string_parse_int(str, value), nullptr);
+  EXPECT_EQ(string_parse_int("  ", value), nullptr);
+  EXPECT_EQ(string_parse_int("", value), nullptr);
+}
+
+TEST(string_parse_float, same_as_atof)
+{
+  const char *tokens[] = {"0",
+                          "-0",
+                          "1",
+                          "1.5",
+                          "-2.25e-3",
+                          "0.000000",
+                          "0.123456",
+                          "-54.321000",
+                          "3.4028235e38",
+                          "1e-45",
+                          "1e39",
+                          "1e23",
+                          "9007199254740993",
+                          "123456789012345678901234",
+                          ".5",
+                          "5.",
+                          "1E5",
+                          "1e+5",
+                          "inf",
+                          "0x1p3",
+                          "1,2"};
+
+  for (const char *token : tokens) {
+    float value;
+    const char *end = string_parse_float(token, value);
+    EXPECT_EQ(end, token + strlen(token)) << token;
+    EXPECT_EQ(value, (float)atof(token)) << token;
+  }
+}
+
+TEST(string_parse_float, array)
+{
+  const char *str = "1.000000 2.500000  -3e2\t4";
+  EXPECT_EQ(string_count_tokens(str), 4);
+
+  float values[4];
+  for (int i = 0; i < 4; i++) {
+    str = string_parse_float(str, values[i]);
+    ASSERT_NE(str, nullptr);
+  }
+
+  EXPECT_EQ(values[0], 1.0f);
+  EXPECT_EQ(values[1], 2.5f);
+  EXPECT_EQ(values[2], -300.0f);
+  EXPECT_EQ(values[3], 4.0f);
+
+  float value;
+  EXPECT_EQ(string_parse_float(str, value), nullptr);
+  EXPECT_EQ(string_count_tokens(" \t "), 0);
+}
+
 CCL_NAMESPACE_END
@@ -14,11 +14,13 @@
 #include <OpenImageIO/strutil.h>
 #include <OpenImageIO/sysutil.h>
 
+#include <climits>
 #include <cstdio>
 #include <filesystem>
 
 #include <sys/stat.h>
 
+#include <zlib.h>
 #include <zstd.h>
 
 #if defined(_WIN32)
@@ -28,7 +30,9 @@
 #else
 #  define DIR_SEP '/'
 #  include <dirent.h>
+#  include <fcntl.h>
 #  include <pwd.h>
+#  include <sys/mman.h>
 #  include <sys/types.h>
 #  include <unistd.h>
 #endif
@@ -813,6 +817,158 @@ bool path_read_compressed_text(const string &path, string &text)
   return true;
 }
 
+/* Decompression of files in chunks. The output buffer grows geometrically, starting from an
+ * estimate based on the compressed file size. */
+
+static const size_t decompress_chunk_size = 1 << 18;
+
+static bool path_read_gzip(FILE *f, const size_t file_size, vector<uint8_t> &binary)
+{
+  z_stream stream = {};
+  /* Automatic zlib or gzip header detection. */
+  if (inflateInit2(&stream, 15 + 32) != Z_OK) {
+    return false;
+  }
+
+  vector<uint8_t> chunk(decompress_chunk_size);
+  binary.resize(std::max(file_size * 4, decompress_chunk_size));
+  size_t size = 0;
+  bool output_full = false;
+  bool finished = false;
+
+  while (true) {
+    /* Only read more input once all pending output has been flushed. */
+    if (stream.avail_in == 0 && !output_full) {
+      stream.avail_in = (uInt)fread(chunk.data(), 1, chunk.size(), f);
+      stream.next_in = chunk.data();
+      if (stream.avail_in == 0) {
+        break;
+      }
+    }
+
+    if (size == binary.size()) {
+      binary.resize(binary.size() * 2);
+    }
+
+    stream.next_out = binary.data() + size;
+    stream.avail_out = (uInt)std::min(binary.size() - size, (size_t)UINT_MAX);
+    const uInt avail_out = stream.avail_out;
+
+    const int ret = inflate(&stream, Z_NO_FLUSH);
+    size += avail_out - stream.avail_out;
+    output_full = ret != Z_STREAM_END && stream.avail_out == 0;
+
+    if (ret == Z_STREAM_END) {
+      /* Concatenated gzip members are decompressed as one file. */
+      finished = inflateReset(&stream) == Z_OK;
+      if (!finished) {
+        break;
+      }
+    }
+    else if (ret == Z_OK || ret == Z_BUF_ERROR) {
+      finished = false;
+    }
+    else {
+      finished = false;
+      break;
+    }
+  }
+
+  inflateEnd(&stream);
+  binary.resize(size);
+
+  return finished && !ferror(f);
+}
+
+static bool path_read_zstd(FILE *f, const size_t file_size, vector<uint8_t> &binary)
+{
+  ZSTD_DCtx *dctx = ZSTD_createDCtx();
+  if (!dctx) {
+    return false;
+  }
+
+  vector<uint8_t> chunk(ZSTD_DStreamInSize());
+  ZSTD_inBuffer input = {chunk.data(), 0, 0};
+  size_t size = 0;
+  bool output_full = false;
+  bool finished = false;
+
+  while (true) {
+    /* Only read more input once all pending output has been flushed. */
+    if (input.pos == input.size && !output_full) {
+      input.size = fread(chunk.data(), 1, chunk.size(), f);
+      input.pos = 0;
+      if (input.size == 0) {
+        break;
+      }
+
+      if (binary.empty()) {
+        /* Use the content size from the frame header if present. */
+        const unsigned long long content_size = ZSTD_getFrameContentSize(input.src, input.size);
+        binary.resize(
+            (content_size != ZSTD_CONTENTSIZE_ERROR && content_size != ZSTD_CONTENTSIZE_UNKNOWN) ?
+                std::max((size_t)content_size, (size_t)1) :
+                std::max(file_size * 4, decompress_chunk_size));
+      }
+    }
+
+    if (size == binary.size()) {
+      binary.resize(binary.size() * 2);
+    }
+
+    ZSTD_outBuffer output = {binary.data(), binary.size(), size};
+    const size_t ret = ZSTD_decompressStream(dctx, &output, &input);
+    size = output.pos;
+
+    if (ZSTD_isError(ret)) {
+      finished = false;
+      break;
+    }
+    /* Zero means a frame was fully decoded and flushed. */
+    finished = ret == 0;
+    output_full = !finished && output.pos == output.size;
+  }
+
+  ZSTD_freeDCtx(dctx);
+  binary.resize(size);
+
+  return finished && !ferror(f);
+}
+
+bool path_read_decompressed_binary(const string &path, vector<uint8_t> &binary)
+{
+  binary.clear();
+
+  FILE *f = path_fopen(path, "rb");
+  if (!f) {
+    return false;
+  }
+
+  uint8_t magic[4] = {0};
+  const size_t magic_size = fread(magic, 1, sizeof(magic), f);
+  rewind(f);
+
+  const size_t file_size = path_file_size(path);
+  bool ok;
+
+  if (magic_size >= 2 && magic[0] == 0x1f && magic[1] == 0x8b) {
+    ok = path_read_gzip(f, file_size, binary);
+  }
+  else if (magic_size == 4 && magic[0] == 0x28 && magic[1] == 0xb5 && magic[2] == 0x2f &&
+           magic[3] == 0xfd)
+  {
+    ok = path_read_zstd(f, file_size, binary);
+  }
+  else {
+    binary.resize(file_size);
+    ok = binary.empty() || fread(binary.data(), 1, binary.size(), f) == binary.size();
+  }
+
+  fclose(f);
+
+  return ok;
+}
+
 uint64_t path_modified_time(const string &path)
 {
   path_stat_t st;
@@ -827,6 +983,89 @@ bool path_remove(const string &path)
   return remove(path.c_str()) == 0;
 }
 
+MappedFile::~MappedFile()
+{
+  close();
+}
+
+bool MappedFile::open(const string &path)
+{
+  close();
+
+  const size_t size = path_file_size(path);
+  if (size == size_t(-1)) {
+    return false;
+  }
+  if (size == 0) {
+    /* Empty files can not be mapped, but are valid files without any data. */
+    return true;
+  }
+
+#ifdef _WIN32
+  const wstring path_wc = string_to_wstring(path);
+  HANDLE file = CreateFileW(path_wc.c_str(),
+                            GENERIC_READ,
+                            FILE_SHARE_READ,
+                            nullptr,
+                            OPEN_EXISTING,
+                            FILE_ATTRIBUTE_NORMAL,
+                            nullptr);
+  if (file == INVALID_HANDLE_VALUE) {
+    return false;
+  }
+
+  /* The mapping keeps a reference to the file, so the handle can be closed right away. */
+  HANDLE mapping = CreateFileMappingW(file, nullptr, PAGE_READONLY, 0, 0, nullptr);
+  CloseHandle(file);
+  if (mapping == nullptr) {
+    return false;
+  }
+
+  void *data = MapViewOfFile(mapping, FILE_MAP_READ, 0, 0, 0);
+  if (data == nullptr) {
+    CloseHandle(mapping);
+    return false;
+  }
+
+  mapping_ = mapping;
+#else
+  const int fd = ::open(path.c_str(), O_RDONLY);
+  if (fd == -1) {
+    return false;
+  }
+
+  /* The mapping stays valid after closing the file descriptor. */
+  void *data = mmap(nullptr, size, PROT_READ, MAP_PRIVATE, fd, 0);
+  ::close(fd);
+  if (data == MAP_FAILED) {
+    return false;
+  }
+#endif
+
+  data_ = static_cast<const uint8_t *>(data);
+  size_ = size;
+
+  return true;
+}
+
+void MappedFile::close()
+{
+  if (data_ == nullptr) {
+    return;
+  }
+
+#ifdef _WIN32
+  UnmapViewOfFile(data_);
+  CloseHandle(mapping_);
+  mapping_ = nullptr;
+#else
+  munmap(const_cast<uint8_t *>(data_), size_);
+#endif
+
+  data_ = nullptr;
+  size_ = 0;
+}
+
 struct SourceReplaceState {
   using ProcessedMapping = map<string, string>;
   /* Base director for all relative include headers. */
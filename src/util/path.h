@@ -53,9 +53,44 @@ bool path_read_text(const string &path, string &text);
 bool path_read_compressed_binary(const string &path, vector<uint8_t> &binary);
 bool path_read_compressed_text(const string &path, string &text);
 
+/* Read a file that may be gzip or zstd compressed, detected from its contents. Compressed
+ * files are decompressed in chunks while reading, without reading the whole compressed
+ * file into memory first. */
+bool path_read_decompressed_binary(const string &path, vector<uint8_t> &binary);
+
 /* File manipulation. */
 bool path_remove(const string &path);
 
+/* Read-only memory mapping of an entire file, empty files open with no data. */
+class MappedFile {
+ public:
+  MappedFile() = default;
+  ~MappedFile();
+
+  MappedFile(const MappedFile &) = delete;
+  MappedFile &operator=(const MappedFile &) = delete;
+
+  bool open(const string &path);
+  void close();
+
+  const uint8_t *data() const
+  {
+    return data_;
+  }
+
+  size_t size() const
+  {
+    return size_;
+  }
+
+ protected:
+  const uint8_t *data_ = nullptr;
+  size_t size_ = 0;
+#ifdef _WIN32
+  void *mapping_ = nullptr;
+#endif
+};
+
 /* source code utility */
 string path_source_replace_includes(const string &source, const string &path);
 
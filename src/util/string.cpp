@@ -4,6 +4,7 @@
 
 #include <cstdarg>
 #include <cstdio>
+#include <cstdlib>
 
 #include <algorithm>
 #include <cctype>
@@ -101,6 +102,173 @@ void string_split(vector<string> &tokens,
   }
 }
 
+static inline bool string_is_space(const char ch)
+{
+  return ch == ' ' || ch == '\t' || ch == '\n' || ch == '\r';
+}
+
+static inline bool string_is_digit(const char ch)
+{
+  return ch >= '0' && ch <= '9';
+}
+
+static const char *string_skip_space(const char *str)
+{
+  while (string_is_space(*str)) {
+    str++;
+  }
+  return str;
+}
+
+static const char *string_skip_token(const char *str)
+{
+  while (*str && !string_is_space(*str)) {
+    str++;
+  }
+  return str;
+}
+
+size_t string_count_tokens(const char *str)
+{
+  size_t num = 0;
+  for (str = string_skip_space(str); *str; str = string_skip_space(str)) {
+    str = string_skip_token(str);
+    num++;
+  }
+  return num;
+}
+
+const char *string_parse_int(const char *str, int &value)
+{
+  str = string_skip_space(str);
+  if (*str == '\0') {
+    return nullptr;
+  }
+
+  const char *p = str;
+  const bool negative = (*p == '-');
+  if (*p == '-' || *p == '+') {
+    p++;
+  }
+
+  unsigned int result = 0;
+  for (; string_is_digit(*p); p++) {
+    result = result * 10 + (unsigned int)(*p - '0');
+  }
+
+  value = (int)(negative ? 0u - result : result);
+  return string_skip_token(p);
+}
+
+/* Decimal numbers with up to 19 significant digits and a small power of ten are converted
+ * exactly with Clinger's fast path, giving the same correctly rounded double as strtod(). Other
+ * numbers, including inf and nan, fall back to strtod(). */
+static bool string_parse_float_fast(const char *str, const char **end, double &value)
+{
+  /* Powers of ten that are exactly representable as double. */
+  static const double powers_of_ten[] = {1e0,  1e1,  1e2,  1e3,  1e4,  1e5,  1e6,  1e7,
+                                         1e8,  1e9,  1e10, 1e11, 1e12, 1e13, 1e14, 1e15,
+                                         1e16, 1e17, 1e18, 1e19, 1e20, 1e21, 1e22};
+  const uint64_t max_exact_mantissa = uint64_t(1) << 53;
+
+  const char *p = str;
+  const bool negative = (*p == '-');
+  if (*p == '-' || *p == '+') {
+    p++;
+  }
+
+  uint64_t mantissa = 0;
+  int num_digits = 0;
+  int exponent = 0;
+  bool has_digits = false;
+
+  for (; string_is_digit(*p); p++) {
+    has_digits = true;
+    if (mantissa == 0 && *p == '0') {
+      continue;
+    }
+    if (++num_digits > 19) {
+      return false;
+    }
+    mantissa = mantissa * 10 + uint64_t(*p - '0');
+  }
+
+  if (*p == '.') {
+    for (p++; string_is_digit(*p); p++) {
+      has_digits = true;
+      exponent--;
+      if (mantissa == 0 && *p == '0') {
+        continue;
+      }
+      if (++num_digits > 19) {
+        return false;
+      }
+      mantissa = mantissa * 10 + uint64_t(*p - '0');
+    }
+  }
+
+  if (!has_digits) {
+    return false;
+  }
+
+  if (*p == 'e' || *p == 'E') {
+    const char *e = p + 1;
+    const bool negative_exponent = (*e == '-');
+    if (*e == '-' || *e == '+') {
+      e++;
+    }
+    if (!string_is_digit(*e)) {
+      return false;
+    }
+    int exponent_value = 0;
+    for (; string_is_digit(*e); e++) {
+      if (exponent_value < 10000) {
+        exponent_value = exponent_value * 10 + (*e - '0');
+      }
+    }
+    exponent += negative_exponent ? -exponent_value : exponent_value;
+    p = e;
+  }
+
+  if (*p && !string_is_space(*p)) {
+    return false;
+  }
+  if (mantissa > max_exact_mantissa || exponent < -22 || exponent > 22) {
+    return false;
+  }
+
+  double result = double(mantissa);
+  if (exponent < 0) {
+    result /= powers_of_ten[-exponent];
+  }
+  else {
+    result *= powers_of_ten[exponent];
+  }
+
+  value = negative ? -result : result;
+  *end = p;
+  return true;
+}
+
+const char *string_parse_float(const char *str, float &value)
+{
+  str = string_skip_space(str);
+  if (*str == '\0') {
+    return nullptr;
+  }
+
+  const char *end;
+  double result;
+  if (!string_parse_float_fast(str, &end, result)) {
+    char *strtod_end;
+    result = strtod(str, &strtod_end);
+    end = string_skip_token(strtod_end);
+  }
+
+  value = (float)result;
+  return end;
+}
+
 bool string_startswith(const string_view s, const string_view start)
 {
   const size_t len = start.size();
@@ -65,6 +65,15 @@ string string_from_wstring(const wstring &path);
 string string_to_ansi(const string &str);
 #endif
 
+/* Parse the first white space separated token of a string as a number, with the same result as
+ * atoi() and atof() on the token. Returns a pointer past the token, or nullptr when there are
+ * only white space characters left. Common decimal numbers are converted without allocation or
+ * locale lookup, so these are suitable for parsing large arrays in a single pass. */
+const char *string_parse_int(const char *str, int &value);
+const char *string_parse_float(const char *str, float &value);
+/* Number of white space separated tokens in a string. */
+size_t string_count_tokens(const char *str);
+
 /* Make a string from a size in bytes in human readable form. */
 string string_human_readable_size(const size_t size);
 /* Make a string from a unit-less quantity in human readable form. */